@@ -0,0 +1,233 @@
+import asyncio
+from typing import TYPE_CHECKING, Any, Callable, Iterable
+
+from src.planetae_db.exceptions import OnlineSchemaChangePlanetaeBaseException
+
+if TYPE_CHECKING:
+    from src.planetae_db.database import SQLDatabase
+
+
+ALGORITHMS = ("INSTANT", "INPLACE", "COPY")
+
+
+class AlterTable:
+    """
+    Collects column, index and key changes of a table and applies them with a single ``ALTER TABLE``, so the
+    table is rebuilt at most once.
+
+    When every change supports it, the statement asks for ``ALGORITHM=INSTANT``, or ``ALGORITHM=INPLACE`` with
+    ``LOCK=NONE``. If the server refuses the hints, the statement is run again without them.
+
+    Use it as an async context manager, whose changes are applied when the block exits without errors, or call
+    ``execute``.
+    """
+
+    database: "SQLDatabase"
+    table_name: str
+
+    def __init__(self, database: "SQLDatabase", table_name: str):
+        self.database = database
+        self.table_name = table_name
+        self._clauses: list[tuple[str, str]] = []
+        self._renames: dict[str, str] = {}
+        self._algorithm: str | None = None
+        self._lock: str | None = None
+
+    def __len__(self) -> int:
+        return len(self._clauses)
+
+    async def __aenter__(self) -> "AlterTable":
+        return self
+
+    async def __aexit__(self, exc_type, exc, traceback) -> None:
+        if exc_type is None and self._clauses:
+            await self.execute()
+
+    @staticmethod
+    def _get_column_definition(signature: dict[str, str]) -> str:
+        if len(signature) != 1:
+            raise ValueError("The signature of a column must have exactly one key.")
+        return " ".join(next(iter(signature.items())))
+
+    def _add(self, clause: str, algorithm: str) -> "AlterTable":
+        self._clauses.append((clause, algorithm))
+        return self
+
+    def add_column(
+        self, signature: dict[str, str], after: str | None = None, default: str | None = None, first: bool = False
+    ) -> "AlterTable":
+        clause = "ADD COLUMN " + self._get_column_definition(signature)
+        if default:
+            clause += f" DEFAULT {default}"
+        if after is not None:
+            clause += f" AFTER {after}"
+        elif first:
+            clause += " FIRST"
+        return self._add(clause, "INPLACE" if after is not None or first else "INSTANT")
+
+    def drop_column(self, key: str) -> "AlterTable":
+        return self._add(f"DROP COLUMN {key}", "INSTANT")
+
+    def modify_column(self, signature: dict[str, str]) -> "AlterTable":
+        return self._add("MODIFY " + self._get_column_definition(signature), "COPY")
+
+    def rename_column(self, old_name: str, signature: dict[str, str]) -> "AlterTable":
+        self._renames[old_name] = next(iter(signature))
+        return self._add(f"CHANGE {old_name} " + self._get_column_definition(signature), "INPLACE")
+
+    def add_primary_key(self, key: str | Iterable[str]) -> "AlterTable":
+        columns = key if isinstance(key, str) else ", ".join(key)
+        return self._add(f"ADD PRIMARY KEY ({columns})", "INPLACE")
+
+    def drop_primary_key(self) -> "AlterTable":
+        return self._add("DROP PRIMARY KEY", "COPY")
+
+    def add_index(self, key: str | Iterable[str], name: str | None = None, unique: bool = False) -> "AlterTable":
+        columns = [key] if isinstance(key, str) else list(key)
+        name = name or "_".join(columns)
+        kind = "UNIQUE INDEX" if unique else "INDEX"
+        return self._add(f"ADD {kind} {name} ({', '.join(columns)})", "INPLACE")
+
+    def drop_index(self, name: str) -> "AlterTable":
+        return self._add(f"DROP INDEX {name}", "INSTANT")
+
+    def algorithm(self, algorithm: str) -> "AlterTable":
+        self._algorithm = algorithm.upper()
+        return self
+
+    def lock(self, lock: str) -> "AlterTable":
+        self._lock = lock.upper()
+        return self
+
+    def _get_hints(self) -> list[str]:
+        if self._algorithm is not None or self._lock is not None:
+            hints = [f"ALGORITHM={self._algorithm}"] if self._algorithm else []
+            return hints + ([f"LOCK={self._lock}"] if self._lock else [])
+        algorithm = max((algorithm for _, algorithm in self._clauses), key=ALGORITHMS.index)
+        if algorithm == "INSTANT":
+            return ["ALGORITHM=INSTANT"]
+        if algorithm == "INPLACE":
+            return ["ALGORITHM=INPLACE", "LOCK=NONE"]
+        return []
+
+    def get_query(self, hints: bool = True, table_name: str | None = None) -> str:
+        clauses = [clause for clause, _ in self._clauses]
+        if hints:
+            clauses += self._get_hints()
+        return f"ALTER TABLE {table_name or self.table_name} " + ", ".join(clauses) + ";"
+
+    async def execute(self) -> bool:
+        if not self._clauses:
+            return True
+        self.database._forget_table(self.table_name)
+        query = self.get_query()
+        string = f"Altered table {self.table_name} with {len(self._clauses)} changes."
+        executed = await self.database._execute(query=query, string=string)
+        if not executed and self._get_hints():
+            executed = await self.database._execute(query=self.get_query(hints=False), string=string)
+        self._clauses = []
+        self._renames = {}
+        return executed
+
+    async def _run(self, query: str, string: str, values: tuple | None = None) -> None:
+        if not await self.database._execute(query=query, string=string, values=values):
+            raise OnlineSchemaChangePlanetaeBaseException(f"Could not run {query}")
+
+    def _get_triggers(self, shadow: str, key: str, columns: dict[str, str]) -> dict[str, str]:
+        targets = ", ".join(columns.values())
+        new_values = ", ".join(f"NEW.{column}" for column in columns)
+        replace = f"REPLACE INTO {shadow} ({targets}) VALUES ({new_values});"
+        delete = f"DELETE FROM {shadow} WHERE {columns[key]} = OLD.{key};"
+        return {
+            f"_{self.table_name}_osc_insert": f"AFTER INSERT ON {self.table_name} FOR EACH ROW {replace}",
+            f"_{self.table_name}_osc_update": (
+                f"AFTER UPDATE ON {self.table_name} FOR EACH ROW BEGIN {delete} {replace} END"
+            ),
+            f"_{self.table_name}_osc_delete": f"AFTER DELETE ON {self.table_name} FOR EACH ROW {delete}",
+        }
+
+    async def execute_online(
+        self,
+        chunk_size: int = 1000,
+        throttle: float = 0,
+        progress: Callable[[int, int], Any] | None = None,
+        keep_old_table: bool = False,
+    ) -> bool:
+        """
+        Applies the changes without locking the table, copying it to a shadow table that has the new definition.
+
+        The rows are copied in chunks of ``chunk_size`` rows, ordered by the primary key, sleeping ``throttle``
+        seconds between chunks, while triggers replay on the shadow table the writes made to the table during the
+        copy. Then both tables are swapped with an atomic ``RENAME TABLE`` and the old table is dropped, unless
+        ``keep_old_table`` is set. The table must have a single column primary key.
+
+        :param progress: Called after each chunk with the number of copied rows and the number of rows the table \
+            had when the copy started
+        :type progress: Callable[[int, int], Any] | None
+        """
+        if not self._clauses:
+            return True
+        table, shadow, old = self.table_name, f"_{self.table_name}_new", f"_{self.table_name}_old"
+        primary_key = (await self.database.get_table_indexes(table_name=table)).get("PRIMARY", ())
+        if len(primary_key) != 1:
+            raise OnlineSchemaChangePlanetaeBaseException(f"Table {table} needs a single column primary key.")
+        key = primary_key[0]
+
+        await self._run(f"DROP TABLE IF EXISTS {shadow};", string=f"Dropped leftover shadow table {shadow}.")
+        await self._run(f"CREATE TABLE {shadow} LIKE {table};", string=f"Created shadow table {shadow}.")
+        triggers: dict[str, str] = {}
+        try:
+            await self._run(self.get_query(hints=False, table_name=shadow), string=f"Altered {shadow}.")
+            new_columns = set(await self.database.get_table_description(table_name=shadow))
+            columns = {
+                column: self._renames.get(column, column)
+                for column in await self.database.get_table_description(table_name=table)
+                if self._renames.get(column, column) in new_columns
+            }
+            if key not in columns:
+                raise OnlineSchemaChangePlanetaeBaseException(f"The primary key {key} can not be dropped online.")
+            triggers = self._get_triggers(shadow, key, columns)
+            for name, trigger in triggers.items():
+                await self._run(f"CREATE TRIGGER {name} {trigger};", string=f"Created trigger {name}.")
+
+            total = await self.database.count_documents(table_name=table)
+            sources, targets = ", ".join(columns), ", ".join(columns.values())
+            copied, last = 0, None
+            while True:
+                where, values = (f" WHERE {key} > %s", (last,)) if last is not None else ("", ())
+                await self._run(
+                    f"SELECT {key} FROM {table}{where} ORDER BY {key} LIMIT {chunk_size};",
+                    string=f"Fetched the next chunk of {table}.",
+                    values=values,
+                )
+                keys = [line[0] for line in self.database.cursor.fetchall() or []]
+                if not keys:
+                    break
+                where = f"{key} >= %s AND {key} <= %s"
+                await self._run(
+                    f"INSERT IGNORE INTO {shadow} ({targets}) SELECT {sources} FROM {table} WHERE {where};",
+                    string=f"Copied {len(keys)} rows of {table} to {shadow}.",
+                    values=(keys[0], keys[-1]),
+                )
+                copied, last = copied + len(keys), keys[-1]
+                if progress is not None:
+                    progress(copied, total)
+                if throttle:
+                    await asyncio.sleep(throttle)
+
+            self.database._forget_table(table)
+            if not await self.database.rename_tables({table: old, shadow: table}):
+                raise OnlineSchemaChangePlanetaeBaseException(f"Could not swap {shadow} with {table}.")
+            for name in triggers:
+                await self._run(f"DROP TRIGGER IF EXISTS {name};", string=f"Dropped trigger {name}.")
+            triggers = {}
+            if not keep_old_table:
+                await self._run(f"DROP TABLE {old};", string=f"Dropped table {old}.")
+        except BaseException:
+            for name in triggers:
+                await self.database._execute(query=f"DROP TRIGGER IF EXISTS {name};", string=f"Dropped {name}.")
+            await self.database._execute(query=f"DROP TABLE IF EXISTS {shadow};", string=f"Dropped {shadow}.")
+            raise
+        self._clauses = []
+        self._renames = {}
+        return True
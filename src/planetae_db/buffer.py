@@ -0,0 +1,109 @@
+import asyncio
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from src.planetae_db.database import Database
+
+
+@dataclass
+class BufferedInsert:
+    document: dict[str, Any]
+    future: asyncio.Future = field(default_factory=lambda: asyncio.get_running_loop().create_future())
+
+
+class WriteBuffer:
+    """
+    Coalesces the inserts of many concurrent callers into multi-row inserts.
+
+    Inserts are grouped by table and by the keys of their documents. A group is flushed with ``insert_documents``,
+    in a single transaction, once it has ``max_rows`` documents or ``max_delay`` seconds after its first document
+    was buffered. Each caller awaits its own result: if the batch fails, its documents are inserted one by one, so
+    only the callers whose documents fail get the error.
+
+    At most ``max_pending`` documents wait in the buffer; further inserts wait for a flush to make room.
+    """
+
+    def __init__(self, database: "Database", max_rows: int = 500, max_delay: float = 0.005, max_pending: int = 10000):
+        if max_pending < max_rows:
+            raise ValueError("max_pending must be at least max_rows.")
+        self.database = database
+        self.max_rows = max_rows
+        self.max_delay = max_delay
+        self._groups: dict[tuple[str, tuple], list[BufferedInsert]] = {}
+        self._timers: dict[tuple[str, tuple], asyncio.TimerHandle] = {}
+        self._tasks: set[asyncio.Task] = set()
+        self._room = asyncio.Semaphore(max_pending)
+        self._lock = asyncio.Lock()
+
+    def __len__(self) -> int:
+        return sum(len(group) for group in self._groups.values())
+
+    async def __aenter__(self) -> "WriteBuffer":
+        return self
+
+    async def __aexit__(self, exc_type, exc, traceback) -> None:
+        await self.close()
+
+    async def insert_document(self, table_name: str, document: dict[str, Any]) -> bool:
+        await self._room.acquire()
+        insert = BufferedInsert(document=document)
+        insert.future.add_done_callback(lambda _: self._room.release())
+        key = (table_name, tuple(document.keys()))
+        group = self._groups.setdefault(key, [])
+        group.append(insert)
+        if len(group) >= self.max_rows:
+            self._schedule(key)
+        elif len(group) == 1:
+            self._timers[key] = asyncio.get_running_loop().call_later(self.max_delay, self._schedule, key)
+        return await insert.future
+
+    def _schedule(self, key: tuple[str, tuple]) -> None:
+        timer = self._timers.pop(key, None)
+        if timer is not None:
+            timer.cancel()
+        inserts = self._groups.pop(key, [])
+        if not inserts:
+            return
+        task = asyncio.create_task(self._flush_group(key[0], inserts))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _flush_group(self, table_name: str, inserts: list[BufferedInsert]) -> None:
+        async with self._lock:
+            try:
+                await self.database.insert_documents(
+                    table_name=table_name, documents=[insert.document for insert in inserts], chunk_size=self.max_rows
+                )
+            except Exception:
+                await self._insert_one_by_one(table_name, inserts)
+                return
+        for insert in inserts:
+            if not insert.future.done():
+                insert.future.set_result(True)
+
+    async def _insert_one_by_one(self, table_name: str, inserts: list[BufferedInsert]) -> None:
+        for insert in inserts:
+            if insert.future.done():
+                continue
+            try:
+                async with self.database.transaction():  # type: ignore
+                    await self.database.insert_document(table_name=table_name, document=insert.document)
+            except Exception as e:
+                insert.future.set_exception(e)
+            else:
+                insert.future.set_result(True)
+
+    async def flush(self) -> None:
+        """
+        Flushes every buffered document and waits for the pending flushes.
+        """
+        for key in list(self._groups):
+            self._schedule(key)
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    async def close(self) -> None:
+        await self.flush()
+        if getattr(self.database, "_write_buffer", None) is self:
+            self.database._write_buffer = None
@@ -0,0 +1,162 @@
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable
+
+from src.planetae_db.documents import loads
+
+OPERATIONS = ("insert", "update", "delete")
+
+
+@dataclass
+class ChangeEvent:
+    """
+    An insert, update or delete of a document, read from the change feed of its table.
+
+    ``token`` increases with every change of the table, give it as ``after`` to ``watch`` to resume right after
+    this change. ``key`` holds the primary key of the document and ``document`` its new values, ``None`` for
+    deletions.
+    """
+
+    token: int
+    table_name: str
+    operation: str
+    key: dict[str, Any]
+    document: dict[str, Any] | None
+    changed_at: Any = None
+
+
+def get_outbox_name(table_name: str) -> str:
+    return f"_{table_name}_changes"
+
+
+def get_outbox_signature() -> dict[str, str]:
+    return {
+        "id": "BIGINT NOT NULL AUTO_INCREMENT PRIMARY KEY",
+        "operation": "VARCHAR(6) NOT NULL",
+        "row_key": "LONGTEXT NOT NULL",
+        "document": "LONGTEXT NULL",
+        "changed_at": "TIMESTAMP(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6)",
+    }
+
+
+def _json_object(row: str, columns: Iterable[str]) -> str:
+    return "JSON_OBJECT(" + ", ".join(f"'{column}', {row}.{column}" for column in columns) + ")"
+
+
+def get_triggers(table_name: str, primary_key: Iterable[str], columns: Iterable[str]) -> dict[str, str]:
+    """
+    Returns, by name, the triggers that append the inserts, updates and deletes of the table to its outbox table.
+    """
+    primary_key, columns = tuple(primary_key), tuple(columns)
+    triggers = {}
+    for operation in OPERATIONS:
+        row = "OLD" if operation == "delete" else "NEW"
+        document = "NULL" if operation == "delete" else _json_object(row, columns)
+        triggers[f"_{table_name}_feed_{operation}"] = (
+            f"AFTER {operation.upper()} ON {table_name} FOR EACH ROW "
+            f"INSERT INTO {get_outbox_name(table_name)} (operation, row_key, document) "
+            f"VALUES ('{operation}', {_json_object(row, primary_key)}, {document})"
+        )
+    return triggers
+
+
+class ChangeCursor:
+    """
+    Turns the rows read from an outbox table into events, in token order, without skipping uncommitted ones.
+
+    Tokens come from an auto increment column, so a transaction can commit a change after a later token was
+    already read. When a token is missing, the cursor stops before it and waits for up to ``gap_timeout`` seconds
+    for it to show up. Then it moves on, but keeps the missing tokens for ``late_timeout`` more seconds, during
+    which ``recover`` emits, out of token order, the changes of transactions that were still open. Tokens missing
+    after that are given up, as rolled back. At most ``max_skipped`` ranges of missing tokens are kept, the oldest
+    ones being given up first.
+    """
+
+    def __init__(
+        self,
+        table_name: str,
+        after: int,
+        gap_timeout: float = 10.0,
+        late_timeout: float = 600.0,
+        max_skipped: int = 1000,
+        log: Callable[[str], Any] | None = None,
+    ):
+        self.table_name = table_name
+        self.after = after
+        self.gap_timeout = gap_timeout
+        self.late_timeout = late_timeout
+        self.max_skipped = max_skipped
+        self.skipped: list[tuple[int, int, float]] = []
+        self._log = log
+        self._gap_since: float | None = None
+
+    def _event(self, row: tuple) -> ChangeEvent:
+        token, operation, key, document, changed_at = row
+        return ChangeEvent(
+            token=token,
+            table_name=self.table_name,
+            operation=operation,
+            key=loads(key),
+            document=loads(document) if document is not None else None,
+            changed_at=changed_at,
+        )
+
+    def _give_up(self, first: int, last: int, reason: str) -> None:
+        if self._log is not None:
+            self._log(f"Gave up the changes {first} to {last} of table {self.table_name}, {reason}.")
+
+    def advance(self, rows: Iterable[tuple]) -> list[ChangeEvent]:
+        """
+        Returns the events of the ``(id, operation, row_key, document, changed_at)`` rows, read after the current
+        token in token order, that can be emitted, and moves the token past them.
+        """
+        events = []
+        for row in rows:
+            token = row[0]
+            if token != self.after + 1:
+                if self._gap_since is None:
+                    self._gap_since = time.monotonic()
+                if time.monotonic() - self._gap_since < self.gap_timeout:
+                    break
+                self.skipped.append((self.after + 1, token - 1, time.monotonic()))
+                if self._log is not None:
+                    self._log(
+                        f"Skipped the missing changes {self.after + 1} to {token - 1} of table {self.table_name}."
+                    )
+                if len(self.skipped) > self.max_skipped:
+                    first, last, _ = self.skipped.pop(0)
+                    self._give_up(first, last, "too many missing changes")
+            self._gap_since = None
+            self.after = token
+            events.append(self._event(row))
+        return events
+
+    def get_skipped(self) -> list[tuple[int, int]]:
+        """
+        Returns the ranges of missing tokens to read again, giving up the ones kept for ``late_timeout`` seconds.
+        """
+        now = time.monotonic()
+        for first, last, skipped_at in self.skipped:
+            if now - skipped_at >= self.late_timeout:
+                self._give_up(first, last, "their transaction was rolled back or is still open")
+        self.skipped = [item for item in self.skipped if now - item[2] < self.late_timeout]
+        return [(first, last) for first, last, _ in self.skipped]
+
+    def recover(self, rows: Iterable[tuple]) -> list[ChangeEvent]:
+        """
+        Returns the events of the rows, read again from the missing tokens, that were not emitted yet.
+        """
+        events = []
+        for row in rows:
+            token = row[0]
+            for index, (first, last, skipped_at) in enumerate(self.skipped):
+                if first <= token <= last:
+                    ranges = [(first, token - 1, skipped_at), (token + 1, last, skipped_at)]
+                    self.skipped[index : index + 1] = [item for item in ranges if item[0] <= item[1]]
+                    events.append(self._event(row))
+                    break
+        return events
+
+    @property
+    def waiting(self) -> bool:
+        return self._gap_since is not None
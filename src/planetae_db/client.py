@@ -1,11 +1,18 @@
 from abc import ABC, abstractmethod
 import asyncio
+import fnmatch
+import functools
 import mysql.connector
 import aiomysql
 import pymysql
-from src.planetae_db.database import Database
+from pymysql.constants import CLIENT
+from src.planetae_db.database import Database, SQLDatabase
+from src.planetae_db.exceptions import QueryTimeoutPlanetaeBaseException
+from src.planetae_db.pipeline import Pipeline, PipelinedStatement
+from src.planetae_db.pool import ConnectionPool
+from src.planetae_db.tracing import Tracer, trace
 import mariadb
-from typing import Any, AsyncGenerator
+from typing import Any, AsyncGenerator, Awaitable, Callable, Iterable
 from planetae_logger import Logger
 
 
@@ -14,13 +21,15 @@ class Client(ABC):
     connection: Any
     host: str | None = None
     port: int | None = None
-    _databases: set[str] | None = None
+    _discovery: AsyncGenerator[Database | None, None] | None = None
+    discovery_concurrency: int = 10
     username: str | None = None
     password: str | None = None
     connection_string: str | None = None
     logger_file: str | None = None
     _logger: Logger | None = None
     _automatically_create_database: bool = False
+    tracer: Tracer | None = None
 
     def __init__(
         self,
@@ -31,8 +40,12 @@ class Client(ABC):
         connection_string: str | None = None,
         logger_file: str | None = None,
         automatically_create_database: bool = False,
+        discovery_concurrency: int = 10,
     ):
-        self._databases = None
+        self._discovery = None
+        self.discovery_concurrency = discovery_concurrency
+        self._fan_out_databases: dict[str, Database] = {}
+        self._fan_out_locks: dict[str, asyncio.Lock] = {}
         self.host = host
         self.port = port
         self.username = username
@@ -56,13 +69,13 @@ class Client(ABC):
         return self
 
     async def __anext__(self) -> Database | None:
-        if self._databases is None:
-            self._databases = await self.get_databases_names()
+        if self._discovery is None:
+            self._discovery = self.get_databases()
         try:
-            database = self._databases.pop()
-            return await self.get_database(database)
-        except KeyError:
-            raise StopAsyncIteration
+            return await anext(self._discovery)
+        except StopAsyncIteration:
+            self._discovery = None
+            raise
 
     @abstractmethod
     def __getitem__(self, item: str) -> Database:
@@ -72,14 +85,122 @@ class Client(ABC):
     async def create_database(self, name: str, exist_ok: bool = True) -> bool:
         pass
 
-    @abstractmethod
-    async def get_databases(self) -> AsyncGenerator[Database | None, None]:
-        yield
+    async def get_databases(
+        self, pattern: str | None = None, concurrency: int | None = None
+    ) -> AsyncGenerator[Database | None, None]:
+        """
+        Yields the databases of the client as soon as each one is ready.
+
+        At most ``concurrency`` databases (``discovery_concurrency`` by default) are resolved at the same time,
+        so the order of the databases is the order in which they become ready.
+
+        :param pattern: A shell-style pattern, such as ``tenant_*``, that filters the names of the databases \
+            before any database is resolved
+        :type pattern: str | None
+        """
+        names = await self.get_databases_names(pattern=pattern)
+        semaphore = asyncio.Semaphore(concurrency or self.discovery_concurrency)
+
+        async def resolve(name: str) -> Database | None:
+            async with semaphore:
+                return await self.get_database(name)
+
+        tasks = [asyncio.ensure_future(resolve(name)) for name in names]
+        try:
+            for task in asyncio.as_completed(tasks):
+                yield await task
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def fan_out(
+        self,
+        operation: str | Callable[..., Awaitable[Any]],
+        *args: Any,
+        databases: Iterable[str] | None = None,
+        pattern: str | None = None,
+        concurrency: int | None = None,
+        **kwargs: Any,
+    ) -> AsyncGenerator[tuple[str, Any], None]:
+        """
+        Runs the same operation on many databases concurrently and yields ``(database_name, result)`` couples as
+        soon as each database answers.
+
+        A failure in one database does not stop the others: the exception raised by the operation is yielded as
+        the result of that database. The handle of each database is opened once and reused by the next calls,
+        one operation at a time, until the client is closed. On SQL clients, each handle sends its statements from
+        its own worker thread, so the queries of different databases overlap while the operations themselves stay
+        on the caller's event loop.
+
+        :param operation: The name of a ``Database`` method, such as ``get_documents``, or a coroutine function \
+            that receives the database as its first argument. The remaining arguments are passed to it.
+        :type operation: str | Callable[..., Awaitable[Any]]
+        :param databases: The names of the databases. Every database of the client by default.
+        :type databases: Iterable[str] | None
+        :param pattern: A shell-style pattern that filters the names of the databases
+        :type pattern: str | None
+        :param concurrency: How many databases are queried at the same time, ``discovery_concurrency`` by default
+        :type concurrency: int | None
+        """
+        if databases is None:
+            names = await self.get_databases_names(pattern=pattern)
+        else:
+            names = self._filter_databases_names(databases, pattern)
+        semaphore = asyncio.Semaphore(concurrency or self.discovery_concurrency)
+
+        async def run(name: str) -> tuple[str, Any]:
+            async with semaphore:
+                try:
+                    if name not in self._fan_out_locks:
+                        self._fan_out_locks[name] = asyncio.Lock()
+                    async with self._fan_out_locks[name]:
+                        database = await self._get_fan_out_database(name)
+                        if isinstance(operation, str):
+                            call = functools.partial(getattr(database, operation), *args, **kwargs)
+                        else:
+                            call = functools.partial(operation, database, *args, **kwargs)
+                        return name, await call()
+                except Exception as e:
+                    if self._logger:
+                        self._logger.debug(f"Operation failed on database {name}: {e}")
+                    return name, e
+
+        tasks = [asyncio.ensure_future(run(name)) for name in names]
+        try:
+            for task in asyncio.as_completed(tasks):
+                yield await task
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _get_fan_out_database(self, name: str) -> Database:
+        """
+        Returns the handle of the database used by ``fan_out``, opened on the first call and reused by the next
+        ones until the client is closed.
+        """
+        if name not in self._fan_out_databases:
+            database = await self.get_database(name)
+            if database is None:
+                raise KeyError(f"Database {name} does not exist.")
+            self._fan_out_databases[name] = database
+        return self._fan_out_databases[name]
+
+    async def _close_fan_out_databases(self) -> None:
+        databases, self._fan_out_databases = self._fan_out_databases, {}
+        self._fan_out_locks = {}
+        for database in databases.values():
+            await database.close()
 
     @abstractmethod
-    async def get_databases_names(self) -> set:
+    async def get_databases_names(self, pattern: str | None = None) -> set:
         pass
 
+    @staticmethod
+    def _filter_databases_names(names: Iterable[str], pattern: str | None = None) -> set[str]:
+        if pattern is None:
+            return set(names)
+        return {name for name in names if fnmatch.fnmatchcase(name, pattern)}
+
     @abstractmethod
     async def get_database(self, name: str) -> Database | None:
         pass
@@ -97,7 +218,17 @@ class Client(ABC):
 
         return getattr(import_module("src.planetae_db.database"), get_database_class_name(cls=cls))
 
+    def pipeline(self) -> Pipeline:
+        """
+        Returns a pipeline that sends the statements queued on it in a single round trip when it is flushed.
+        """
+        return Pipeline(self._run_pipeline)
+
+    async def _run_pipeline(self, statements: list[PipelinedStatement]) -> list[Any]:
+        raise NotImplementedError("Pipelines are not supported by this client.")
+
     async def close(self):
+        await self._close_fan_out_databases()
         if self.connection is None:
             return True
         self.connection.close()
@@ -111,17 +242,48 @@ class SQLClient(Client):
     _sync_cursor: Any
 
     @abstractmethod
-    async def _execute(self, query: str, values: tuple | None = None, log: Any = None) -> bool:
+    async def _execute(
+        self, query: str, values: tuple | None = None, log: Any = None, timeout: float | None = None
+    ) -> bool:
         return self._execute_sync(query, values, log)
 
     @abstractmethod
-    async def _fetchone(self, query: str, values: tuple | None = None, log: Any = None) -> tuple:
+    async def _fetchone(
+        self, query: str, values: tuple | None = None, log: Any = None, timeout: float | None = None
+    ) -> tuple:
         pass
 
     @abstractmethod
-    async def _fetchall(self, query: str, values: tuple | None = None, log: Any = None) -> list[tuple]:
+    async def _fetchall(
+        self, query: str, values: tuple | None = None, log: Any = None, timeout: float | None = None
+    ) -> list[tuple]:
         pass
 
+    async def _run_pipeline(self, statements: list[PipelinedStatement]) -> list[Any]:
+        results: list[Any] = []
+        for statement in statements:
+            try:
+                if statement.fetch == "one":
+                    results.append(await self._fetchone(statement.query, statement.values))
+                elif statement.fetch == "all":
+                    results.append(await self._fetchall(statement.query, statement.values))
+                else:
+                    results.append(await self._execute(statement.query, statement.values))
+            except Exception as e:
+                results.append(e)
+        return results
+
+    async def _get_fan_out_database(self, name: str) -> Database:
+        """
+        Returns the handle of the database used by ``fan_out``. Its statements run in a worker thread, since the SQL
+        databases send them with a synchronous connector that would otherwise block the loop and serialize the
+        databases.
+        """
+        database = await super()._get_fan_out_database(name)
+        if isinstance(database, SQLDatabase):
+            database.use_worker_thread()
+        return database
+
     def _execute_sync(self, query: str, values: tuple | None = None, log: Any = None) -> bool:
         if log and self._logger:
             self._logger.info(log)
@@ -137,8 +299,9 @@ class SQLClient(Client):
 
     def __getitem__(self, item: str) -> Database:
         try:
-            database = self._get_database_class()
-            return database(**self._get_credentials(), name=item)
+            database = self._get_database_class()(**self._get_credentials(), name=item)
+            database.tracer = self.tracer
+            return database
         except Exception:
             if self.automatically_create_database:
                 self._execute_sync(
@@ -170,22 +333,19 @@ class SQLClient(Client):
 
     async def get_database(self, name: str):
         try:
-            database = self._get_database_class()
-            return database(**self._get_credentials(), name=name)
+            database = await asyncio.to_thread(self._get_database_class(), **self._get_credentials(), name=name)
+            database.tracer = self.tracer
+            return database
         except mariadb.ProgrammingError:
             if self.automatically_create_database:
                 await self.create_database(name)
                 return await self.get_database(name)
             raise
 
-    async def get_databases(self) -> AsyncGenerator[Database | None, None]:
-        databases = await self.get_databases_names()
-        for database in databases:
-            yield await self.get_database(database)
-
-    async def get_databases_names(self) -> set:
+    async def get_databases_names(self, pattern: str | None = None) -> set:
         query = "SHOW DATABASES;"
-        return set(tup[0] for tup in await self._fetchall(query=query, log="Fetched all the tables of database."))
+        names = (tup[0] for tup in await self._fetchall(query=query, log="Fetched all the tables of database."))
+        return self._filter_databases_names(names, pattern)
 
     async def delete_database(self, name: str) -> bool:
         query = f"DROP DATABASE {name};"
@@ -194,12 +354,48 @@ class SQLClient(Client):
 
 class MariaDBClient(SQLClient):
     cursor: aiomysql.Cursor
-    connection: aiomysql.Connection
+    _pool: ConnectionPool
 
-    def __init__(self, username: str, password: str, host: str, port: int, logger_file: str | None = None):
-        super().__init__(username=username, password=password, host=host, port=port, logger_file=logger_file)
-        self.connection = None  # type: ignore
+    def __init__(
+        self,
+        username: str,
+        password: str,
+        host: str,
+        port: int,
+        logger_file: str | None = None,
+        pool_size: int = 5,
+        pool_min_size: int = 1,
+        idle_timeout: float | None = 300,
+        max_lifetime: float | None = 3600,
+        pre_ping: bool = False,
+        health_check_interval: float = 30,
+        discovery_concurrency: int = 10,
+        query_timeout: float | None = None,
+    ):
+        super().__init__(
+            username=username,
+            password=password,
+            host=host,
+            port=port,
+            logger_file=logger_file,
+            discovery_concurrency=discovery_concurrency,
+        )
         self.cursor = None  # type: ignore
+        self.query_timeout = query_timeout
+        self._pipeline_connection: aiomysql.Connection | None = None
+        self._pipeline_lock = asyncio.Lock()
+        self._pool = ConnectionPool(
+            connect=self._create_connection,
+            ping=lambda connection: connection.ping(reconnect=False),
+            disconnect=self._close_connection,
+            is_broken=self._is_disconnection,
+            size=pool_size,
+            min_size=pool_min_size,
+            idle_timeout=idle_timeout,
+            max_lifetime=max_lifetime,
+            pre_ping=pre_ping,
+            health_check_interval=health_check_interval,
+        )
         self._sync_connection = mysql.connector.connect(
             user=self.username,
             password=self.password,
@@ -208,9 +404,15 @@ class MariaDBClient(SQLClient):
         )
         self._sync_cursor = self._sync_connection.cursor()
 
-    async def _create_connection(self) -> aiomysql.Connection:
-        if self.connection is not None:
-            return self.connection
+    @property
+    def pool(self) -> ConnectionPool:
+        return self._pool
+
+    async def _create_connection(self, multi_statements: bool = False) -> aiomysql.Connection:
+        """
+        Opens a connection to the server. Only the dedicated pipeline connection accepts multi-statement batches,
+        so the statements built from strings elsewhere can not be stacked with other queries.
+        """
         assert (
             self.username is not None
             and self.password is not None
@@ -222,61 +424,153 @@ class MariaDBClient(SQLClient):
             password=self.password,
             host=self.host,
             port=self.port,
+            client_flag=CLIENT.MULTI_STATEMENTS if multi_statements else 0,
         )
 
-    async def _execute(self, query: str, values: tuple | None = None, log: Any = None) -> bool:
-        self.connection = await self._create_connection()
-        if log and self._logger:
-            self._logger.info(log)
+    @staticmethod
+    async def _close_connection(connection: aiomysql.Connection) -> None:
+        if connection.closed:
+            return
         try:
-            async with self.connection.cursor() as cursor:
-                if values:
-                    await cursor.execute(query, values)
-                else:
-                    await cursor.execute(query)
+            await connection.ensure_closed()
+        except Exception:
+            connection.close()
+
+    @staticmethod
+    def _is_disconnection(exception: BaseException) -> bool:
+        """
+        Tells whether the exception means that the connection can not be reused, in which case it is not returned to
+        the pool. A statement interrupted by a timeout or a cancellation, even once stopped with ``KILL QUERY``,
+        leaves its result unread on the connection, so that connection is replaced rather than drained.
+        """
+        if isinstance(exception, (pymysql.InterfaceError, ConnectionError, TimeoutError, asyncio.CancelledError)):
             return True
-        except Exception as e:
-            if self._logger:
-                self._logger.debug(str(e))
-            raise
-
-    async def _fetchone(self, query: str, values: tuple | None = None, log: Any = None) -> tuple:
-        self.connection = await self._create_connection()
-        if log and self._logger:
-            self._logger.info(log)
+        if isinstance(exception, pymysql.OperationalError) and exception.args:
+            return exception.args[0] in (2006, 2013, 2014, 2055)
+        return False
+
+    async def _kill_query(self, thread_id: int) -> None:
+        """
+        Stops the statement running on the connection ``thread_id`` through a side connection, so the server does
+        not keep working on a query nobody waits for.
+        """
+        connection = await self._create_connection()
         try:
-            async with self.connection.cursor() as cursor:
-                if values:
-                    await cursor.execute(query, values)
-                else:
-                    await cursor.execute(query)
-                return await cursor.fetchone()
-        except Exception as e:
+            async with connection.cursor() as cursor:
+                await cursor.execute("KILL QUERY %s;", (thread_id,))
             if self._logger:
-                self._logger.debug(str(e))
-            raise
+                self._logger.info(f"Killed the query of connection {thread_id}.")
+        finally:
+            await self._close_connection(connection)
 
-    async def _fetchall(self, query: str, values: tuple | None = None, log: Any = None) -> list[tuple]:
-        self.connection = await self._create_connection()
+    async def _run(
+        self,
+        query: str,
+        values: tuple | None,
+        log: Any,
+        fetch: str | None = None,
+        retry: bool = False,
+        timeout: float | None = None,
+    ) -> Any:
         if log and self._logger:
             self._logger.info(log)
+        timeout = self.query_timeout if timeout is None else timeout
         try:
-            async with self.connection.cursor() as cursor:
-                if values:
-                    await cursor.execute(query, values)
-                else:
-                    await cursor.execute(query)
-                return await cursor.fetchall()
+            async with self._pool.acquire(tracer=self.tracer) as connection:
+                thread_id = connection.thread_id()
+                try:
+                    async with asyncio.timeout(timeout):
+                        async with connection.cursor() as cursor:
+                            with trace(self.tracer, "execute", statement=query.split(None, 1)[0].upper()):
+                                if values:
+                                    await cursor.execute(query, values)
+                                else:
+                                    await cursor.execute(query)
+                            if fetch is None:
+                                return True
+                            with trace(self.tracer, "fetch"):
+                                if fetch == "one":
+                                    return await cursor.fetchone()
+                                return await cursor.fetchall()
+                except (asyncio.CancelledError, TimeoutError) as e:
+                    try:
+                        await asyncio.shield(self._kill_query(thread_id))
+                    except Exception as kill_error:
+                        if self._logger:
+                            self._logger.debug(str(kill_error))
+                    if isinstance(e, TimeoutError):
+                        raise QueryTimeoutPlanetaeBaseException(f"{query} took more than {timeout} seconds.") from e
+                    raise
         except Exception as e:
             if self._logger:
                 self._logger.debug(str(e))
+            if retry and self._is_disconnection(e) and not isinstance(e, TimeoutError):
+                return await self._run(query, values, log=None, fetch=fetch, timeout=timeout)
             raise
 
+    async def _execute(
+        self, query: str, values: tuple | None = None, log: Any = None, timeout: float | None = None
+    ) -> bool:
+        return await self._run(query, values, log, timeout=timeout)
+
+    async def _fetchone(
+        self, query: str, values: tuple | None = None, log: Any = None, timeout: float | None = None
+    ) -> tuple:
+        return await self._run(query, values, log, fetch="one", retry=True, timeout=timeout)
+
+    async def _fetchall(
+        self, query: str, values: tuple | None = None, log: Any = None, timeout: float | None = None
+    ) -> list[tuple]:
+        return await self._run(query, values, log, fetch="all", retry=True, timeout=timeout)
+
+    async def _run_pipeline(self, statements: list[PipelinedStatement]) -> list[Any]:
+        """
+        Sends the statements as one multi-statement batch, on a connection kept apart from the pool, and reads each
+        result set in submission order.
+
+        The server stops at the first failing statement, so that statement receives the error and the ones after
+        it are reported as not executed.
+        """
+        if self._logger:
+            self._logger.info(f"Sending a pipeline of {len(statements)} statements.")
+        results: list[Any] = []
+        async with self._pipeline_lock:
+            if self._pipeline_connection is None or self._pipeline_connection.closed:
+                self._pipeline_connection = await self._create_connection(multi_statements=True)
+            connection = self._pipeline_connection
+            async with connection.cursor() as cursor:
+                batch = ";\n".join(
+                    cursor.mogrify(statement.query.strip().rstrip(";"), statement.values or None)
+                    for statement in statements
+                )
+                try:
+                    await cursor.execute(batch + ";")
+                    for index, statement in enumerate(statements):
+                        if index:
+                            await cursor.nextset()
+                        if statement.fetch == "one":
+                            results.append(await cursor.fetchone())
+                        elif statement.fetch == "all":
+                            results.append(await cursor.fetchall())
+                        else:
+                            results.append(True)
+                except Exception as e:
+                    if self._logger:
+                        self._logger.debug(str(e))
+                    if self._is_disconnection(e):
+                        await self._close_connection(connection)
+                        self._pipeline_connection = None
+                    results.append(e)
+                    not_executed = RuntimeError("Statement not executed because a previous statement failed.")
+                    results.extend(not_executed for _ in statements[len(results) :])
+        return results
+
     async def close(self):
-        if self.connection is None:
-            return True
-        await self.connection.ensure_closed()
-        self.connection = None  # type: ignore
+        await self._close_fan_out_databases()
+        if self._pipeline_connection is not None:
+            await self._close_connection(self._pipeline_connection)
+            self._pipeline_connection = None
+        await self._pool.close()
         return True
 
 
@@ -333,17 +627,12 @@ class MongoDBClient(NoSQLClient):
             return None
         return Database(**self._get_credentials(), name=name)
 
-    async def get_databases(self) -> AsyncGenerator[Database | None, None]:
-        databases = await self.get_databases_names()
-        for database in databases:
-            yield await self.get_database(database)
-
-    async def get_databases_names(self) -> tuple:
+    async def get_databases_names(self, pattern: str | None = None) -> set:
         query = "SHOW DATABASES;"
         get = await self._execute(query=query, log="Fetched all the tables of database.")
         if not get:
-            return tuple()
-        return self.cursor.fetchone()
+            return set()
+        return self._filter_databases_names(self.cursor.fetchone(), pattern)
 
     async def delete_database(self, name: str) -> bool:
         query = f"DROP DATABASE {name};"
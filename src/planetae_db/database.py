@@ -1,8 +1,41 @@
-from typing import Any, AsyncGenerator, Callable, Generator, Iterable
+import asyncio
+import base64
+import datetime
+import decimal
+import functools
+import itertools
+import json
+import os
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Generator, Iterable
 from planetae_logger import Logger
 import mariadb
 
+from src.planetae_db.alter import AlterTable
+from src.planetae_db.buffer import WriteBuffer
+from src.planetae_db.changes import (
+    ChangeCursor,
+    ChangeEvent,
+    get_outbox_name,
+    get_outbox_signature,
+    get_triggers,
+)
+from src.planetae_db.documents import DocumentTable
+from src.planetae_db.exceptions import ChunkedOperationPlanetaeBaseException
+from src.planetae_db.explain import SlowQuery, get_full_scans, is_explainable
+from src.planetae_db.loader import DocumentLoader
+from src.planetae_db.pipeline import Pipeline, PipelinedStatement
 from src.planetae_db.table import Table
+from src.planetae_db.tracing import Tracer, trace, traced
+
+
+TSV_ESCAPES = ((b"\\", b"\\\\"), (b"\t", b"\\t"), (b"\n", b"\\n"), (b"\r", b"\\r"), (b"\x00", b"\\0"))
+AGGREGATE_FUNCTIONS = ("COUNT", "SUM", "AVG", "MIN", "MAX")
+TSV_UNESCAPES = {ord("t"): ord("\t"), ord("n"): ord("\n"), ord("r"): ord("\r"), ord("0"): 0, 0x5C: 0x5C}
+DELETIONS_TABLE = "_backup_deletions"
 
 
 class Database:
@@ -11,12 +44,15 @@ class Database:
     name: str
     host: str | None = None
     port: int | None = None
-    _tables: AsyncGenerator[Table | None, None] | None = None
+    _tables: dict[str, Table] | None = None
     username: str | None = None
     password: str | None = None
     connection_string: str | None = None
     logger_file: str | None = None
     _logger: Logger | None = None
+    _write_buffer: WriteBuffer | None = None
+    _loaders: dict[tuple[str, str], DocumentLoader] | None = None
+    tracer: Tracer | None = None
 
     def __init__(
         self,
@@ -38,6 +74,8 @@ class Database:
         if logger_file:
             self._logger = Logger("Client", log_file=logger_file)
         self.name = name
+        self._tables = {}
+        self._loaders = {}
 
     @staticmethod
     def _get_items_from_signature(
@@ -46,14 +84,55 @@ class Database:
         for key, value in signature.items():
             yield key, value
 
-    @staticmethod
-    def not_implemented(default: Any = False):
-        src.logger.log_exception(NotImplementedError)
+    def _log(self, message: str) -> None:
+        if self._logger:
+            self._logger.info(message)
+
+    def _log_exception(self, error: BaseException | type[BaseException] | str) -> None:
+        if self._logger:
+            self._logger.error(error.__name__ if isinstance(error, type) else str(error))
+
+    def not_implemented(self, default: Any = False):
+        self._log_exception(NotImplementedError)
         return default
 
     async def initialize(self):
         return self.not_implemented(None)
 
+    def pipeline(self) -> Pipeline:
+        """
+        Returns a pipeline that runs the statements queued on it together when it is flushed. Whether they share a
+        single round trip depends on the database, see ``_run_pipeline``.
+        """
+        return Pipeline(self._run_pipeline)
+
+    async def _run_pipeline(self, statements: list[PipelinedStatement]) -> list[Any]:
+        return self.not_implemented()
+
+    def write_buffer(self, max_rows: int = 500, max_delay: float = 0.005, max_pending: int = 10000) -> WriteBuffer:
+        """
+        Turns on the write buffer, which coalesces the ``insert_document`` calls made outside transactions into
+        multi-row inserts of up to ``max_rows`` documents, sent at most ``max_delay`` seconds after the first one.
+        Closing the returned buffer flushes it and turns it off. See ``WriteBuffer``.
+        """
+        if self._write_buffer is None:
+            self._write_buffer = WriteBuffer(
+                database=self, max_rows=max_rows, max_delay=max_delay, max_pending=max_pending
+            )
+        return self._write_buffer
+
+    async def explain(
+        self,
+        operation: str,
+        table_name: str,
+        query: dict[str, Any] | None = None,
+        changes: dict[str, Any] | None = None,
+    ) -> dict[str, Any]:
+        return self.not_implemented({})
+
+    def capture_slow_queries(self, threshold: float | None = 1.0, max_entries: int = 100) -> deque[SlowQuery]:
+        return self.not_implemented(deque())
+
     async def get_all_tables(self) -> tuple[str]:
         return self.not_implemented(None)
 
@@ -63,6 +142,33 @@ class Database:
     async def get_table_description(self, table_name: str) -> dict[str, str]:
         return self.not_implemented()
 
+    async def get_table_indexes(self, table_name: str) -> dict[str, tuple[str, ...]]:
+        return self.not_implemented({})
+
+    async def get_replication_lag(self) -> float | None:
+        return self.not_implemented(None)
+
+    async def table(self, table_name: str) -> Table:
+        """
+        Returns a handle to the table, bound to its schema. The handle is cached until the table is changed
+        through this database.
+        """
+        assert self._tables is not None
+        if table_name not in self._tables:
+            self._tables[table_name] = await Table.load(database=self, name=table_name)  # type: ignore
+        return self._tables[table_name]
+
+    async def create_document_table(self, table_name: str, indexes: dict[str, str] | None = None) -> DocumentTable:
+        return self.not_implemented()
+
+    async def document_table(self, table_name: str) -> DocumentTable:
+        return self.not_implemented()
+
+    def _forget_table(self, *table_names: str) -> None:
+        if self._tables:
+            for table_name in table_names:
+                self._tables.pop(table_name, None)
+
     async def add_column_to_table(
         self,
         table_name: str,
@@ -76,10 +182,18 @@ class Database:
     async def add_primary_key(self, table_name: str, key: str) -> bool:
         return self.not_implemented()
 
+    def alter_table(self, table_name: str) -> AlterTable:
+        """
+        Returns a builder that applies many changes to the table with a single ``ALTER TABLE``.
+        """
+        return AlterTable(database=self, table_name=table_name)  # type: ignore
+
     async def remove_column_from_table(self, table_name: str, key: str) -> bool:
         return self.not_implemented()
 
-    async def change_signature_from_column(self, table_name: str, signature: dict) -> bool:
+    async def change_signature_from_column(
+        self, table_name: str, signature: dict, online: bool = False, **online_options: Any
+    ) -> bool:
         return self.not_implemented()
 
     async def rename_column(self, table_name: str, old_name: str, signature: dict) -> bool:
@@ -88,6 +202,9 @@ class Database:
     async def rename_table(self, old_table_name: str, new_table_name: str) -> bool:
         return self.not_implemented()
 
+    async def rename_tables(self, renames: dict[str, str]) -> bool:
+        return self.not_implemented()
+
     async def delete_table(self, table_name: str) -> Any:
         return self.not_implemented()
 
@@ -99,12 +216,54 @@ class Database:
     ) -> bool | tuple[str, tuple]:
         return self.not_implemented()
 
+    async def insert_documents(
+        self, table_name: str, documents: Iterable[dict[str, Any]], chunk_size: int = 1000
+    ) -> bool:
+        return self.not_implemented()
+
     async def update_document(self, table_name: str, query: dict[str, Any], changes: dict[str, Any]) -> bool:
         return self.not_implemented()
 
     async def delete_document(self, table_name: str, query: dict[str, Any]) -> bool:
         return self.not_implemented()
 
+    async def update_documents(
+        self, table_name: str, updates: Iterable[tuple[dict[str, Any], dict[str, Any]]], chunk_size: int = 1000
+    ) -> bool:
+        return self.not_implemented()
+
+    async def delete_documents(
+        self, table_name: str, queries: Iterable[dict[str, Any]], chunk_size: int = 1000
+    ) -> bool:
+        return self.not_implemented()
+
+    async def delete_documents_chunked(
+        self, table_name: str, query: dict[str, Any], chunk_size: int = 1000, **options: Any
+    ) -> int:
+        return self.not_implemented(0)
+
+    async def update_documents_chunked(
+        self, table_name: str, query: dict[str, Any], changes: dict[str, Any], chunk_size: int = 1000, **options: Any
+    ) -> int:
+        return self.not_implemented(0)
+
+    async def write_blob(
+        self, table_name: str, query: dict[str, Any], column: str, source: Any, chunk_size: int = 1 << 20
+    ) -> int:
+        return self.not_implemented(0)
+
+    async def read_blob(
+        self, table_name: str, query: dict[str, Any], column: str, destination: Any = None, chunk_size: int = 1 << 20
+    ) -> Any:
+        return self.not_implemented(None)
+
+    async def iter_blob(
+        self, table_name: str, query: dict[str, Any], column: str, chunk_size: int = 1 << 20
+    ) -> AsyncIterator[bytes | str]:
+        self.not_implemented()
+        return
+        yield
+
     async def create_index(self, table_name: str, key: str) -> bool:
         return self.not_implemented()
 
@@ -117,19 +276,102 @@ class Database:
     async def get_all_documents(self, table_name: str) -> list[dict[str, Any]]:
         return self.not_implemented([])
 
-    async def backup_database(self, path: str, structure_only: bool = False, data_only: bool = False) -> bool:
+    async def get_documents_by_keys(self, table_name: str, key: str, values: Iterable[Any]) -> list[dict[str, Any]]:
+        return self.not_implemented([])
+
+    async def iter_documents(
+        self, table_name: str, batch_size: int = 1000, key: str | None = None, after: Any = None
+    ) -> AsyncIterator[list[dict[str, Any]]]:
+        self.not_implemented()
+        return
+        yield
+
+    def loader(self, table_name: str, key: str = "id", max_batch: int = 1000) -> DocumentLoader:
+        """
+        Returns the loader that batches the lookups of documents of the table by ``key`` made during the same
+        event loop iteration into a single query. See ``DocumentLoader``.
+        """
+        assert self._loaders is not None
+        if (table_name, key) not in self._loaders:
+            self._loaders[(table_name, key)] = DocumentLoader(
+                database=self, table_name=table_name, key=key, max_batch=max_batch
+            )
+        return self._loaders[(table_name, key)]
+
+    async def enable_change_feed(self, table_name: str) -> bool:
+        return self.not_implemented()
+
+    async def disable_change_feed(self, table_name: str, drop_outbox: bool = False) -> bool:
+        return self.not_implemented()
+
+    async def prune_changes(self, table_name: str, token: int) -> bool:
+        return self.not_implemented()
+
+    async def watch(
+        self,
+        table_name: str,
+        after: int | None = None,
+        poll_interval: float = 1.0,
+        batch_size: int = 1000,
+        gap_timeout: float = 10.0,
+        late_timeout: float = 600.0,
+        follow: bool = True,
+    ) -> AsyncIterator[ChangeEvent]:
+        self.not_implemented()
+        return
+        yield
+
+    async def count_documents(self, table_name: str, query: dict[str, Any] | None = None) -> int:
+        return self.not_implemented(0)
+
+    async def exists(self, table_name: str, query: dict[str, Any] | None = None) -> bool:
+        return self.not_implemented()
+
+    async def aggregate(
+        self,
+        table_name: str,
+        query: dict[str, Any] | None = None,
+        group_by: Iterable[str] = (),
+        metrics: dict[str, tuple[str, str]] | None = None,
+    ) -> list[dict[str, Any]]:
+        return self.not_implemented([])
+
+    async def backup_database(
+        self,
+        path: str,
+        structure_only: bool = False,
+        data_only: bool = False,
+        incremental_since: str | None = None,
+        version_column: str = "updated_at",
+        data_format: str = "sql",
+    ) -> bool:
+        return self.not_implemented()
+
+    async def restore_backup(self, path: str, incrementals: Iterable[str] = ()) -> bool:
+        return self.not_implemented()
+
+    async def enable_incremental_backups(self, version_column: str = "updated_at") -> bool:
         return self.not_implemented()
 
-    async def restore_backup(self, path: str) -> bool:
+    async def disable_incremental_backups(self, drop_tombstones: bool = False) -> bool:
         return self.not_implemented()
 
     async def delete_database(self) -> bool:
         return self.not_implemented()
 
+    async def close(self) -> bool:
+        return True
+
 
 class SQLDatabase(Database):
-    db: mariadb.Connection
+    connection: mariadb.Connection
     cursor: mariadb.Cursor
+    _in_transaction: bool = False
+    local_infile: bool = False
+    slow_query_threshold: float | None = None
+    slow_queries: deque[SlowQuery] | None = None
+    _explain_tasks: set[asyncio.Task]
+    _executor: ThreadPoolExecutor | None = None
 
     async def initialize(self):
         """
@@ -137,6 +379,39 @@ class SQLDatabase(Database):
         """
         return await super().initialize()
 
+    def use_worker_thread(self, enabled: bool = True) -> None:
+        """
+        Runs the blocking calls of the connector in a worker thread owned by this database, so the event loop keeps
+        serving other tasks while a statement runs. The coroutines of the database stay on the caller's loop. As
+        the loop is free during a statement, the operations of the database must then run one at a time: another
+        statement could otherwise reach the cursor before the results of the first one are read.
+        """
+        if enabled and self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"planetae-db-{self.name}")
+        elif not enabled and self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    async def _call(self, function: Callable[..., Any], *args: Any) -> Any:
+        """
+        Calls a blocking function of the connector, in the worker thread of the database when it has one.
+        """
+        if self._executor is None:
+            return function(*args)
+        return await asyncio.get_running_loop().run_in_executor(self._executor, functools.partial(function, *args))
+
+    async def close(self) -> bool:
+        """
+        Closes the connection of the database.
+        """
+        self.use_worker_thread(False)
+        connection = getattr(self, "connection", None)
+        if connection is not None:
+            self.cursor.close()
+            connection.close()
+            self.connection = None  # type: ignore
+        return True
+
     @staticmethod
     def _get_string_of_items_separated_by_comma(generator: Callable) -> Callable:
         """
@@ -163,24 +438,195 @@ class SQLDatabase(Database):
     async def _execute(self, query: str, string: str, values: tuple | None = None) -> bool:
         try:
             print(query)
-            if values is None:
-                self.cursor.execute(query)
-            else:
-                self.cursor.execute(query, values)
-            src.logger.log_string(string)
-            self.db.commit()
-            src.logger.log_string("Committed changes.")
+            started = time.perf_counter()
+            with trace(self.tracer, "execute", statement=query.split(None, 1)[0].upper()):
+                if values is None:
+                    await self._call(self.cursor.execute, query)
+                else:
+                    await self._call(self.cursor.execute, query, values)
+            duration = time.perf_counter() - started
+            if self.slow_query_threshold is not None and duration >= self.slow_query_threshold:
+                self._capture_slow_query(query=query, values=values, duration=duration)
+            self._log(string)
+            if not self._in_transaction:
+                await self._call(self.connection.commit)
+                self._log("Committed changes.")
             return True
         except Exception as e:
-            src.logger.log_exception(e)
+            self._log_exception(e)
+            if self._in_transaction:
+                raise
             return False
 
+    async def _executemany(self, query: str, string: str, values: list[tuple]) -> bool:
+        try:
+            with trace(self.tracer, "execute", statement=query.split(None, 1)[0].upper(), rows=len(values)):
+                await self._call(self.cursor.executemany, query, values)
+            self._log(string)
+            if not self._in_transaction:
+                await self._call(self.connection.commit)
+                self._log("Committed changes.")
+            return True
+        except Exception as e:
+            self._log_exception(e)
+            if self._in_transaction:
+                raise
+            return False
+
+    def capture_slow_queries(self, threshold: float | None = 1.0, max_entries: int = 100) -> deque[SlowQuery]:
+        """
+        Records the statements that take at least ``threshold`` seconds, with their ``EXPLAIN FORMAT=JSON`` plan
+        and the tables they read with a full table scan, keeping the last ``max_entries`` of them. A ``None``
+        threshold stops the recording.
+
+        :return: The recorded slow queries, oldest first
+        :rtype: deque[SlowQuery]
+        """
+        self.slow_query_threshold = threshold
+        self._explain_tasks = getattr(self, "_explain_tasks", set())
+        if self.slow_queries is None or self.slow_queries.maxlen != max_entries:
+            self.slow_queries = deque(self.slow_queries or (), maxlen=max_entries)
+        return self.slow_queries
+
+    def _capture_slow_query(self, query: str, values: tuple | None, duration: float) -> None:
+        slow_query = SlowQuery(query=query, values=values, duration=duration)
+        assert self.slow_queries is not None
+        self.slow_queries.append(slow_query)
+        self._log(f"Slow query ({duration:.3f}s): {query}")
+        if is_explainable(query):
+            # The plan is fetched once the caller has read the results of the slow statement.
+            task = asyncio.get_running_loop().create_task(self._explain_slow_query(slow_query))
+            self._explain_tasks.add(task)
+            task.add_done_callback(self._explain_tasks.discard)
+
+    async def _explain_slow_query(self, slow_query: SlowQuery) -> None:
+        try:
+            slow_query.plan = await self._get_plan(query=slow_query.query, values=slow_query.values)
+        except Exception as e:
+            self._log_exception(e)
+            return
+        slow_query.full_scans = get_full_scans(slow_query.plan)
+        if slow_query.full_scans:
+            self._log(f"Slow query scans {', '.join(slow_query.full_scans)}: {slow_query.query}")
+
+    async def _get_plan(self, query: str, values: tuple | None = None) -> dict[str, Any]:
+        return await self._call(self._fetch_plan, query, values)
+
+    def _fetch_plan(self, query: str, values: tuple | None) -> dict[str, Any]:
+        cursor = self.connection.cursor()
+        try:
+            statement = f"EXPLAIN FORMAT=JSON {query.strip().rstrip(';')};"
+            if values is None:
+                cursor.execute(statement)
+            else:
+                cursor.execute(statement, values)
+            line = cursor.fetchone()
+        finally:
+            cursor.close()
+        return json.loads(line[0]) if line else {}
+
+    def _get_operation_statement(
+        self, operation: str, table_name: str, query: dict[str, Any] | None, changes: dict[str, Any] | None
+    ) -> tuple[str, tuple]:
+        where, values = self._gen_where_clause(query)
+        if operation in ("get_document", "get_documents", "get_all_documents"):
+            return f"SELECT * FROM {table_name}{where};", values
+        if operation == "count_documents":
+            return f"SELECT COUNT(*) FROM {table_name}{where};", values
+        if operation == "exists":
+            return f"SELECT 1 FROM {table_name}{where} LIMIT 1;", values
+        if operation == "update_document":
+            if not changes:
+                raise ValueError("Explaining an update needs its changes.")
+            sets = self._gen_placeholder_query_or_set_string(query=changes)
+            return f"UPDATE {table_name} SET {sets}{where};", self._get_values_tuple_from_dict(changes) + values
+        if operation == "delete_document":
+            return f"DELETE FROM {table_name}{where};", values
+        raise ValueError(f"Can not explain the operation {operation}.")
+
+    async def explain(
+        self,
+        operation: str,
+        table_name: str,
+        query: dict[str, Any] | None = None,
+        changes: dict[str, Any] | None = None,
+    ) -> dict[str, Any]:
+        """
+        Returns the parsed ``EXPLAIN FORMAT=JSON`` plan of the statement that the operation would run. Use
+        ``get_full_scans`` to list the tables the plan reads entirely.
+
+        :param operation: One of get_document, get_documents, get_all_documents, count_documents, exists, \
+            update_document and delete_document
+        :type operation: str
+        :param changes: The changes of an update_document
+        :type changes: dict[str, Any] | None
+        """
+        statement, values = self._get_operation_statement(operation, table_name, query, changes)
+        return await self._get_plan(query=statement, values=values or None)
+
+    @asynccontextmanager
+    async def transaction(self) -> AsyncIterator["SQLDatabase"]:
+        """
+        Groups every statement executed inside the context in a single transaction.
+
+        The changes are committed when the context exits and rolled back if any statement fails. Nested
+        transactions are merged into the outermost one.
+        """
+        if self._in_transaction:
+            yield self
+            return
+        self._in_transaction = True
+        try:
+            yield self
+        except BaseException:
+            await self._call(self.connection.rollback)
+            self._log("Rolled back changes.")
+            raise
+        else:
+            await self._call(self.connection.commit)
+            self._log("Committed changes.")
+        finally:
+            self._in_transaction = False
+
+    async def _run_pipeline(self, statements: list[PipelinedStatement]) -> list[Any]:
+        """
+        Runs the pipelined statements one after another and commits them once, at the end of the batch.
+
+        The synchronous connector has no multi-statement batches, so every statement is still its own round trip:
+        compared to executing them one by one, a pipeline here only saves the commits.
+        """
+        results: list[Any] = []
+        async with self.transaction():
+            for statement in statements:
+                try:
+                    await self._execute(
+                        query=statement.query, string="Executed pipelined statement.", values=statement.values
+                    )
+                except Exception as e:
+                    results.append(e)
+                    continue
+                if statement.fetch == "one":
+                    results.append(self.cursor.fetchone())
+                elif statement.fetch == "all":
+                    results.append(self.cursor.fetchall())
+                else:
+                    results.append(True)
+        return results
+
+    @staticmethod
+    def _chunks(iterable: list, size: int) -> Generator[list, None, None]:
+        for index in range(0, len(iterable), size):
+            yield iterable[index : index + size]
+
     async def get_all_tables(self) -> tuple[str]:
         query = "SHOW TABLES;"
         get = await self._execute(query=query, string="Fetched all the tables of database.")
         if not get:
-            src.logger.log_exception(ValueError)
-        return self.cursor.fetchone()
+            self._log_exception(ValueError)
+        tables = self.cursor.fetchall()
+        if not tables:
+            return None  # type: ignore
+        return tuple(line[0] for line in tables)  # type: ignore
 
     async def create_table(self, table_name: str, signature: dict[str, str], force: bool = False) -> bool:
         """
@@ -206,14 +652,53 @@ class SQLDatabase(Database):
             await self.delete_table(table_name=table_name)
         return await self._execute(query=query, string=f"Created table {table_name}")
 
+    async def create_document_table(self, table_name: str, indexes: dict[str, str] | None = None) -> DocumentTable:
+        """
+        Creates a table that stores schemaless documents in a JSON column, exposing the JSON paths of ``indexes``
+        as indexed virtual generated columns. See ``DocumentTable``.
+        """
+        return await DocumentTable.create(database=self, name=table_name, indexes=indexes)
+
+    async def document_table(self, table_name: str) -> DocumentTable:
+        return await DocumentTable.load(database=self, name=table_name)
+
+    @traced
     async def get_table_description(self, table_name: str) -> dict[str, str]:
         query = f"DESCRIBE {table_name};"
         ex = await self._execute(query, string=f"Fetched description of table {table_name}.")
         if not ex:
-            src.logger.log_exception(NotImplementedError)
+            self._log_exception(NotImplementedError)
         result = self.cursor.fetchall()
         return {field[0]: field[1] for field in result}
 
+    async def get_replication_lag(self) -> float | None:
+        """
+        Returns how many seconds the database is behind its primary, ``None`` if it is not a replica and infinity
+        if the replication is stopped.
+        """
+        ex = await self._execute("SHOW SLAVE STATUS;", string="Fetched the replication status.")
+        if not ex:
+            self._log_exception(ValueError)
+        status = self.cursor.fetchone()
+        if status is None:
+            return None
+        columns = [column[0] for column in self.cursor.description]
+        lag = status[columns.index("Seconds_Behind_Master")]
+        return float("inf") if lag is None else float(lag)
+
+    async def get_table_indexes(self, table_name: str) -> dict[str, tuple[str, ...]]:
+        """
+        Returns the columns of each index of the table, by index name. The primary key is named ``PRIMARY``.
+        """
+        query = f"SHOW INDEX FROM {table_name};"
+        ex = await self._execute(query, string=f"Fetched indexes of table {table_name}.")
+        if not ex:
+            self._log_exception(ValueError)
+        indexes: dict[str, list[tuple[int, str]]] = {}
+        for line in self.cursor.fetchall():
+            indexes.setdefault(line[2], []).append((line[3], line[4]))
+        return {name: tuple(column for _, column in sorted(columns)) for name, columns in indexes.items()}
+
     async def add_column_to_table(
         self,
         table_name: str,
@@ -232,24 +717,37 @@ class SQLDatabase(Database):
             fi += " FIRST"
         if default:
             df += f" DEFAULT {default}"
+        self._forget_table(table_name)
         query = "ALTER TABLE " + table_name + " ADD COLUMN " + sig + af + fi + df + ";"
         return await self._execute(query=query, string=f"Column {sig} added to table {table_name}" + af + fi)
 
     async def add_primary_key(self, table_name: str, key: str) -> bool:
+        self._forget_table(table_name)
         query = "ALTER TABLE " + table_name + f" ADD PRIMARY KEY ({key});"
         return await self._execute(query=query, string=f"Added primary key {key} to table {table_name}.")
 
     async def remove_column_from_table(self, table_name: str, key: str) -> bool:
+        self._forget_table(table_name)
         query = "ALTER TABLE " + table_name + " DROP COLUMN " + key + ";"
         return await self._execute(query=query, string=f"column {key} dropped from the table.")
 
-    async def change_signature_from_column(self, table_name: str, signature: dict) -> bool:
+    async def change_signature_from_column(
+        self, table_name: str, signature: dict, online: bool = False, **online_options: Any
+    ) -> bool:
+        """
+        Changes the definition of a column. With ``online``, the table is copied to a shadow table and swapped, so \
+            it stays writable during the change. See ``AlterTable.execute_online`` for the options.
+        """
+        if online:
+            return await self.alter_table(table_name).modify_column(signature).execute_online(**online_options)
         line = next(self._get_lines_of_items(signature=signature)).replace(",", ";")
+        self._forget_table(table_name)
         query = "ALTER TABLE " + table_name + " MODIFY " + line
         return await self._execute(query=query, string=f"Column changed its signature:\nNew signature: {line}")
 
     async def rename_column(self, table_name: str, old_name: str, signature: dict) -> bool:
         line = next(self._get_lines_of_items(signature=signature)).replace(",", ";")
+        self._forget_table(table_name)
         query = "ALTER TABLE " + table_name + " CHANGE " + old_name + " " + line
         return await self._execute(
             query=query,
@@ -257,10 +755,20 @@ class SQLDatabase(Database):
         )
 
     async def rename_table(self, old_table_name: str, new_table_name: str) -> bool:
+        self._forget_table(old_table_name, new_table_name)
         query = "ALTER TABLE " + old_table_name + " RENAME TO " + new_table_name + ";"
         return await self._execute(query=query, string=f"Rename table {old_table_name} to {new_table_name}")
 
+    async def rename_tables(self, renames: dict[str, str]) -> bool:
+        """
+        Renames many tables atomically, in order, so tables can be swapped: ``{"a": "tmp", "b": "a", "tmp": "b"}``.
+        """
+        self._forget_table(*renames.keys(), *renames.values())
+        query = "RENAME TABLE " + ", ".join(f"{old} TO {new}" for old, new in renames.items()) + ";"
+        return await self._execute(query=query, string=f"Renamed tables {renames}")
+
     async def delete_table(self, table_name: str) -> bool:
+        self._forget_table(table_name)
         query = f"DROP TABLE IF EXISTS {table_name};"
         return await self._execute(query=query, string=f"Dropped table {table_name} if table existed.")
 
@@ -268,9 +776,12 @@ class SQLDatabase(Database):
         query = f"TRUNCATE {table_name};"
         return await self._execute(query=query, string=f"Truncated table {table_name}.")
 
+    @traced
     async def insert_document(
         self, table_name: str, document: dict[str, Any], return_query: bool = False
     ) -> bool | tuple[str, tuple]:
+        if self._write_buffer is not None and not self._in_transaction and not return_query:
+            return await self._write_buffer.insert_document(table_name=table_name, document=document)
         keys = self._get_keys_from_dict(document=document)
         values = self._get_values_tuple_from_dict(document=document)
         placeholders = self._get_string_with_placeholders_from_iterable(values)
@@ -283,6 +794,31 @@ class SQLDatabase(Database):
             string=f"Inserted {values} in table {table_name}.",
         )
 
+    @traced
+    async def insert_documents(
+        self, table_name: str, documents: Iterable[dict[str, Any]], chunk_size: int = 1000
+    ) -> bool:
+        """
+        Inserts many documents in a single transaction.
+
+        Documents that share the same keys are sent together with ``executemany``, in chunks of ``chunk_size``
+        documents.
+        """
+        shapes: dict[tuple, list[tuple]] = {}
+        for document in documents:
+            shapes.setdefault(tuple(document.keys()), []).append(self._get_values_tuple_from_dict(document))
+        async with self.transaction():
+            for keys, rows in shapes.items():
+                query = (
+                    f"INSERT INTO {table_name} {self._get_keys_from_dict(dict.fromkeys(keys))} "
+                    f"VALUES {self._get_string_with_placeholders_from_iterable(keys)};"
+                )
+                for chunk in self._chunks(rows, chunk_size):
+                    await self._executemany(
+                        query=query, string=f"Inserted {len(chunk)} documents in table {table_name}.", values=chunk
+                    )
+        return True
+
     @staticmethod
     def _get_string_with_placeholders_from_iterable(iterable: Iterable) -> str:
         string = "("
@@ -298,12 +834,17 @@ class SQLDatabase(Database):
         sets = sets[:-2]
         return sets
 
+    @staticmethod
+    def _gen_placeholder_where_string(query: dict[str, Any]) -> str:
+        return " AND ".join(f"{key} = %s" for key in query.keys())
+
     @staticmethod
     def _add_limit(query: str, limit: int | None = None) -> str:
         if limit is not None:
             query = query[:-1] + " LIMIT " + str(limit) + ";"
         return query
 
+    @traced
     async def update_document(
         self,
         table_name: str,
@@ -311,7 +852,7 @@ class SQLDatabase(Database):
         changes: dict[str, Any],
         limit: int | None = None,
     ) -> bool:
-        queries = self._gen_placeholder_query_or_set_string(query=query)
+        queries = self._gen_placeholder_where_string(query=query)
         sets = self._gen_placeholder_query_or_set_string(query=changes)
         print(queries)
         print(sets)
@@ -324,15 +865,299 @@ class SQLDatabase(Database):
             values=replacing_tuple,
         )
 
+    @traced
     async def delete_document(self, table_name: str, query: dict[str, Any], limit: int | None = None) -> Any:
-        queries = self._gen_placeholder_query_or_set_string(query=query)
+        queries = self._gen_placeholder_where_string(query=query)
         queries_tuple = self._get_values_tuple_from_dict(query)
         q = f"DELETE FROM {table_name} WHERE {queries};"
         q = self._add_limit(q, limit=limit)
         return await self._execute(query=q, string=f"Deleted documents where {queries}", values=queries_tuple)
 
+    @traced
+    async def update_documents(
+        self, table_name: str, updates: Iterable[tuple[dict[str, Any], dict[str, Any]]], chunk_size: int = 1000
+    ) -> bool:
+        """
+        Applies many independent updates in a single transaction.
+
+        Updates that share the same query and changes keys are sent together with ``executemany``, in chunks of
+        ``chunk_size`` rows, so the server receives one bulk statement per chunk instead of one per document.
+
+        :param updates: An iterable of ``(query, changes)`` couples, as taken by ``update_document``
+        :type updates: Iterable[tuple[dict[str, Any], dict[str, Any]]]
+        """
+        shapes: dict[tuple[tuple, tuple], list[tuple]] = {}
+        for query, changes in updates:
+            shape = (tuple(changes.keys()), tuple(query.keys()))
+            values = self._get_values_tuple_from_dict(changes) + self._get_values_tuple_from_dict(query)
+            shapes.setdefault(shape, []).append(values)
+        async with self.transaction():
+            for (changes_keys, query_keys), rows in shapes.items():
+                sets = self._gen_placeholder_query_or_set_string(query=dict.fromkeys(changes_keys))
+                queries = self._gen_placeholder_where_string(query=dict.fromkeys(query_keys))
+                q = f"UPDATE {table_name} SET {sets} WHERE {queries};"
+                for chunk in self._chunks(rows, chunk_size):
+                    await self._executemany(
+                        query=q, string=f"Updated {len(chunk)} documents of table {table_name} with: {q}", values=chunk
+                    )
+        return True
+
+    @staticmethod
+    def _gen_placeholder_in_string(keys: tuple, rows: int) -> str:
+        """
+        Generates a ``key IN (%s, ...)`` condition, or a row constructor ``(a, b) IN ((%s, %s), ...)`` when the \
+            rows are matched by more than one key.
+        """
+        if len(keys) == 1:
+            return f"{keys[0]} IN (" + ", ".join([r"%s"] * rows) + ")"
+        row = "(" + ", ".join([r"%s"] * len(keys)) + ")"
+        return "(" + ", ".join(keys) + ") IN (" + ", ".join([row] * rows) + ")"
+
+    @traced
+    async def delete_documents(
+        self, table_name: str, queries: Iterable[dict[str, Any]], chunk_size: int = 1000
+    ) -> bool:
+        """
+        Deletes the documents matching any of the queries in a single transaction.
+
+        Queries that share the same keys are merged into ``DELETE ... WHERE key IN (...)`` statements of at most
+        ``chunk_size`` documents each.
+
+        :param queries: An iterable of queries, as taken by ``delete_document``
+        :type queries: Iterable[dict[str, Any]]
+        """
+        shapes: dict[tuple, list[tuple]] = {}
+        for query in queries:
+            shapes.setdefault(tuple(query.keys()), []).append(self._get_values_tuple_from_dict(query))
+        async with self.transaction():
+            for keys, rows in shapes.items():
+                for chunk in self._chunks(rows, chunk_size):
+                    condition = self._gen_placeholder_in_string(keys, len(chunk))
+                    q = f"DELETE FROM {table_name} WHERE {condition};"
+                    await self._execute(
+                        query=q,
+                        string=f"Deleted {len(chunk)} documents from table {table_name}",
+                        values=tuple(value for row in chunk for value in row),
+                    )
+        return True
+
+    async def _get_single_primary_key(self, table_name: str) -> str:
+        primary_key = (await self.get_table_indexes(table_name=table_name)).get("PRIMARY", ())
+        if len(primary_key) != 1:
+            raise ValueError(f"Table {table_name} needs a single column primary key.")
+        return primary_key[0]
+
+    async def _run_chunked(
+        self,
+        table_name: str,
+        query: dict[str, Any],
+        statement: Callable[[str, str], tuple[str, tuple]],
+        chunk_size: int = 1000,
+        throttle: float = 0,
+        max_lag: float | None = None,
+        lag_source: "Database | None" = None,
+        progress: Callable[[int, Any], Any] | None = None,
+        resume_after: Any = None,
+    ) -> int:
+        """
+        Runs a statement over the documents that match the query in chunks of ``chunk_size`` documents, ordered by
+        the primary key, committing each chunk on its own.
+
+        :param statement: Receives the primary key and the ``IN`` condition of the chunk and returns the query and \
+            the values that come before the keys of the chunk
+        :param throttle: Seconds to sleep between chunks
+        :param max_lag: Waits, before each chunk, until the replication lag of ``lag_source`` is at most \
+            ``max_lag`` seconds
+        :param progress: Called after each chunk with the number of processed documents and the last primary \
+            key, which can be given as ``resume_after`` to resume an interrupted run
+        :param resume_after: Only the documents whose primary key is greater than this one are processed
+
+        :return: The number of processed documents
+        :rtype: int
+        :raises ChunkedOperationPlanetaeBaseException: When a chunk fails. The chunks reported to ``progress`` \
+            before it are committed, so the run can be resumed after the last reported key.
+        """
+        key = await self._get_single_primary_key(table_name=table_name)
+        where = self._gen_placeholder_where_string(query=query)
+        values = self._get_values_tuple_from_dict(query)
+        processed, last = 0, resume_after
+        while True:
+            conditions = [where] if where else []
+            if last is not None:
+                conditions.append(f"{key} > %s")
+            condition = " WHERE " + " AND ".join(conditions) if conditions else ""
+            ex = await self._execute(
+                query=f"SELECT {key} FROM {table_name}{condition} ORDER BY {key} LIMIT {chunk_size};",
+                string=f"Fetched the next chunk of table {table_name}.",
+                values=values + ((last,) if last is not None else ()),
+            )
+            if not ex:
+                raise ChunkedOperationPlanetaeBaseException(
+                    f"Could not fetch the chunk of table {table_name} after {last!r}, "
+                    f"{processed} documents processed."
+                )
+            keys = [line[0] for line in self.cursor.fetchall() or []]
+            if not keys:
+                return processed
+            while max_lag is not None and lag_source is not None:
+                lag = await lag_source.get_replication_lag()
+                if lag is None or lag <= max_lag:
+                    break
+                await asyncio.sleep(throttle or 1)
+            q, statement_values = statement(key, self._gen_placeholder_in_string((key,), len(keys)))
+            if where:
+                q = q[:-1] + f" AND {where};"
+            ex = await self._execute(
+                query=q,
+                string=f"Processed {len(keys)} documents of table {table_name}.",
+                values=statement_values + tuple(keys) + values,
+            )
+            if not ex:
+                raise ChunkedOperationPlanetaeBaseException(
+                    f"Could not process the chunk of table {table_name} after {last!r}, "
+                    f"{processed} documents processed."
+                )
+            processed, last = processed + len(keys), keys[-1]
+            if progress is not None:
+                progress(processed, last)
+            if throttle:
+                await asyncio.sleep(throttle)
+
+    async def delete_documents_chunked(
+        self, table_name: str, query: dict[str, Any], chunk_size: int = 1000, **options: Any
+    ) -> int:
+        """
+        Deletes the documents that match the query in primary key ordered chunks, each one in its own transaction,
+        so huge deletes neither bloat the undo log nor stall the replication. See ``_run_chunked`` for the options.
+        """
+        return await self._run_chunked(
+            table_name=table_name,
+            query=query,
+            statement=lambda key, keys: (f"DELETE FROM {table_name} WHERE {keys};", ()),
+            chunk_size=chunk_size,
+            **options,
+        )
+
+    async def update_documents_chunked(
+        self, table_name: str, query: dict[str, Any], changes: dict[str, Any], chunk_size: int = 1000, **options: Any
+    ) -> int:
+        """
+        Updates the documents that match the query in primary key ordered chunks, each one in its own transaction.
+        See ``_run_chunked`` for the options.
+        """
+        sets = self._gen_placeholder_query_or_set_string(query=changes)
+        return await self._run_chunked(
+            table_name=table_name,
+            query=query,
+            statement=lambda key, keys: (
+                f"UPDATE {table_name} SET {sets} WHERE {keys};",
+                self._get_values_tuple_from_dict(changes),
+            ),
+            chunk_size=chunk_size,
+            **options,
+        )
+
+    @staticmethod
+    def _iter_source_chunks(source: Any, chunk_size: int) -> Generator[bytes | str, None, None]:
+        if hasattr(source, "read"):
+            while chunk := source.read(chunk_size):
+                yield chunk
+            return
+        if isinstance(source, str):
+            for index in range(0, len(source), chunk_size):
+                yield source[index : index + chunk_size]
+            return
+        view = memoryview(source).cast("B")
+        for index in range(0, len(view), chunk_size):
+            yield view[index : index + chunk_size].tobytes()
+
+    async def write_blob(
+        self, table_name: str, query: dict[str, Any], column: str, source: Any, chunk_size: int = 1 << 20
+    ) -> int:
+        """
+        Writes a large value to a column of the documents that match the query, ``chunk_size`` bytes at a time.
+
+        The column is emptied and each chunk is appended with ``CONCAT``, in a single transaction, so readers never
+        see a partial value and only one chunk is held in memory. The transaction belongs to the whole database,
+        so the chunks are written without yielding to the event loop, which would let the statements of other
+        tasks join it.
+
+        :param source: The value, as ``bytes``, ``bytearray``, ``memoryview`` or ``str``, or a file-like object \
+            opened for reading, which is read one chunk at a time
+        :type source: Any
+
+        :return: The number of bytes, or characters for text, written
+        :rtype: int
+        """
+        where, values = self._gen_where_clause(query)
+        written = 0
+        async with self.transaction():
+            await self._execute(
+                query=f"UPDATE {table_name} SET {column} = ''{where};",
+                string=f"Emptied {column} of table {table_name}.",
+                values=values or None,
+            )
+            for chunk in self._iter_source_chunks(source, chunk_size):
+                await self._execute(
+                    query=f"UPDATE {table_name} SET {column} = CONCAT({column}, %s){where};",
+                    string=f"Appended {len(chunk)} bytes to {column} of table {table_name}.",
+                    values=(chunk,) + values,
+                )
+                written += len(chunk)
+        return written
+
+    async def iter_blob(
+        self, table_name: str, query: dict[str, Any], column: str, chunk_size: int = 1 << 20
+    ) -> AsyncIterator[bytes | str]:
+        """
+        Yields the value of a column of the first document that matches the query in chunks of ``chunk_size``
+        bytes, or characters for text, each one fetched with its own ``SUBSTRING``.
+        """
+        where, values = self._gen_where_clause(query)
+        position = 1
+        while True:
+            ex = await self._execute(
+                query=f"SELECT SUBSTRING({column}, %s, %s) FROM {table_name}{where} LIMIT 1;",
+                string=f"Fetched {chunk_size} bytes of {column} of table {table_name}.",
+                values=(position, chunk_size) + values,
+            )
+            if not ex:
+                self._log_exception(ValueError)
+            line = self.cursor.fetchone()
+            if line is None or not line[0]:
+                return
+            yield line[0]
+            if len(line[0]) < chunk_size:
+                return
+            position += len(line[0])
+
+    async def read_blob(
+        self, table_name: str, query: dict[str, Any], column: str, destination: Any = None, chunk_size: int = 1 << 20
+    ) -> Any:
+        """
+        Reads a large value of a column in chunks of ``chunk_size`` bytes. See ``iter_blob``.
+
+        :param destination: A file-like object opened for writing, to which each chunk is written as soon as it \
+            is fetched. When it is not given, the whole value is returned.
+        :type destination: Any
+
+        :return: The number of bytes, or characters for text, written to the destination, or the value
+        :rtype: Any
+        """
+        chunks = self.iter_blob(table_name=table_name, query=query, column=column, chunk_size=chunk_size)
+        if destination is None:
+            parts = [chunk async for chunk in chunks]
+            if not parts:
+                return None
+            return "".join(parts) if isinstance(parts[0], str) else b"".join(parts)
+        read = 0
+        async for chunk in chunks:
+            destination.write(chunk)
+            read += len(chunk)
+        return read
+
     async def create_index(self, table_name: str, key: str) -> Any:
-        src.logger.log_exception(NotImplementedError)
+        self._log_exception(NotImplementedError)
 
     @staticmethod
     def _convert_tuple_to_dict(line: tuple, keys: Iterable) -> dict:
@@ -349,120 +1174,619 @@ class SQLDatabase(Database):
     def _get_values_tuple_from_dict(document: dict) -> tuple:
         return tuple(document.values())
 
+    def _fetch_documents(self, keys: Iterable[str], one: bool = False) -> list[dict[str, Any]]:
+        with trace(self.tracer, "fetch"):
+            if one:
+                line = self.cursor.fetchone()
+                lines = [line] if line is not None else []
+            else:
+                lines = self.cursor.fetchall() or []
+        with trace(self.tracer, "decode", rows=len(lines)):
+            keys = tuple(keys)
+            return [self._convert_tuple_to_dict(line=line, keys=keys) for line in lines]
+
+    @traced
     async def get_document(self, table_name: str, query: dict[str, Any]) -> dict[str, Any] | None:
-        queries = self._gen_placeholder_query_or_set_string(query=query)
-        queries_values = self._get_values_tuple_from_dict(document=query)
-        q = f"SELECT * FROM {table_name} WHERE {queries};"
-        keys = await self._get_keys(table_name=table_name)
+        with trace(self.tracer, "build"):
+            queries = self._gen_placeholder_where_string(query=query)
+            queries_values = self._get_values_tuple_from_dict(document=query)
+            q = f"SELECT * FROM {table_name} WHERE {queries};"
+            keys = await self._get_keys(table_name=table_name)
         ex = await self._execute(
             query=q,
             string=f"Fetched one document that matches {queries}, {queries_values}",
             values=queries_values,
         )
         if not ex:
-            src.logger.log_exception(ValueError)
-        results = self.cursor.fetchone()
-        if results is None:
-            return results
-        return self._convert_tuple_to_dict(line=results, keys=keys)
+            self._log_exception(ValueError)
+        documents = self._fetch_documents(keys=keys, one=True)
+        return documents[0] if documents else None
 
+    @traced
     async def get_documents(self, table_name: str, query: dict[str, Any]) -> list[dict[str, Any]]:
-        queries = self._gen_placeholder_query_or_set_string(query=query)
-        queries_values = self._get_values_tuple_from_dict(document=query)
-        q = f"SELECT * FROM {table_name} WHERE {queries};"
+        with trace(self.tracer, "build"):
+            queries = self._gen_placeholder_where_string(query=query)
+            queries_values = self._get_values_tuple_from_dict(document=query)
+            q = f"SELECT * FROM {table_name} WHERE {queries};"
+            keys = await self._get_keys(table_name=table_name)
         ex = await self._execute(
             query=q,
             string=f"Fetched all documents from table {table_name} that meches {queries}, {queries_values}",
             values=queries_values,
         )
         if not ex:
-            src.logger.log_exception(ValueError)
-        results = self.cursor.fetchall()
-        if results is None:
+            self._log_exception(ValueError)
+        return self._fetch_documents(keys=keys)
+
+    @traced
+    async def get_documents_by_keys(self, table_name: str, key: str, values: Iterable[Any]) -> list[dict[str, Any]]:
+        """
+        Fetches, with a single query, the documents whose ``key`` is one of ``values``.
+        """
+        values = tuple(values)
+        if not values:
             return []
-        return [
-            self._convert_tuple_to_dict(line=result, keys=await self._get_keys(table_name=table_name))
-            for result in results
-        ]
+        keys = await self._get_keys(table_name=table_name)
+        ex = await self._execute(
+            query=f"SELECT * FROM {table_name} WHERE {self._gen_placeholder_in_string((key,), len(values))};",
+            string=f"Fetched {len(values)} documents from table {table_name} by {key}.",
+            values=values,
+        )
+        if not ex:
+            self._log_exception(ValueError)
+        return self._fetch_documents(keys=keys)
+
+    async def iter_documents(
+        self, table_name: str, batch_size: int = 1000, key: str | None = None, after: Any = None
+    ) -> AsyncIterator[list[dict[str, Any]]]:
+        """
+        Yields every document of the table in batches of up to ``batch_size`` documents, ordered by ``key``, the
+        single column primary key by default. Each batch is a separate keyset query, so only one batch is held in
+        memory and the iteration can be resumed with the ``key`` of the last document as ``after``.
+        """
+        key = key or await self._get_single_primary_key(table_name=table_name)
+        keys = list(await self._get_keys(table_name=table_name))
+        while True:
+            where, values = (f" WHERE {key} > %s", (after,)) if after is not None else ("", None)
+            ex = await self._execute(
+                query=f"SELECT * FROM {table_name}{where} ORDER BY {key} LIMIT {batch_size};",
+                string=f"Fetched the next batch of table {table_name}.",
+                values=values,
+            )
+            if not ex:
+                self._log_exception(ValueError)
+            documents = self._fetch_documents(keys=keys)
+            if not documents:
+                return
+            after = documents[-1][key]
+            yield documents
+            if len(documents) < batch_size:
+                return
+
+    async def enable_change_feed(self, table_name: str) -> bool:
+        """
+        Creates the outbox table of the table and the triggers that append to it every insert, update and delete,
+        so that they can be followed with ``watch``. Call it again after changing the columns of the table. Each
+        trigger is dropped before it is created again, as MySQL has no ``CREATE OR REPLACE TRIGGER``, so the
+        writes made while it is replaced are not recorded.
+        """
+        columns = tuple(await self._get_keys(table_name=table_name))
+        primary_key = (await self.get_table_indexes(table_name=table_name)).get("PRIMARY") or columns
+        if not await self.create_table(table_name=get_outbox_name(table_name), signature=get_outbox_signature()):
+            return False
+        for name, trigger in get_triggers(table_name=table_name, primary_key=primary_key, columns=columns).items():
+            if not await self._execute(query=f"DROP TRIGGER IF EXISTS {name};", string=f"Dropped {name}."):
+                return False
+            if not await self._execute(query=f"CREATE TRIGGER {name} {trigger};", string=f"Created {name}."):
+                return False
+        return True
+
+    async def disable_change_feed(self, table_name: str, drop_outbox: bool = False) -> bool:
+        for name in get_triggers(table_name=table_name, primary_key=(), columns=()):
+            if not await self._execute(query=f"DROP TRIGGER IF EXISTS {name};", string=f"Dropped {name}."):
+                return False
+        if drop_outbox:
+            return await self.delete_table(table_name=get_outbox_name(table_name))
+        return True
+
+    async def prune_changes(self, table_name: str, token: int) -> bool:
+        """
+        Deletes from the outbox table the changes up to ``token``, once every consumer has processed them.
+        """
+        return await self._execute(
+            query=f"DELETE FROM {get_outbox_name(table_name)} WHERE id <= %s;",
+            string=f"Pruned the changes of table {table_name}.",
+            values=(token,),
+        )
+
+    async def watch(
+        self,
+        table_name: str,
+        after: int | None = None,
+        poll_interval: float = 1.0,
+        batch_size: int = 1000,
+        gap_timeout: float = 10.0,
+        late_timeout: float = 600.0,
+        follow: bool = True,
+    ) -> AsyncIterator[ChangeEvent]:
+        """
+        Yields the inserts, updates and deletes made to the table, recorded since ``enable_change_feed`` was called.
+
+        The outbox table is read with a keyset cursor on its token, every ``poll_interval`` seconds once caught up.
+        It starts after the latest change by default, or after ``after``, the token of the last event processed,
+        ``0`` replaying every recorded change. When ``follow`` is false, it stops once caught up.
+
+        A missing token holds the events back for up to ``gap_timeout`` seconds, and is then read again on every
+        poll for ``late_timeout`` seconds, so the change of a transaction that commits late is still yielded, out
+        of token order. See ``ChangeCursor``. Resume with the greatest token processed.
+        """
+        outbox = get_outbox_name(table_name)
+        if after is None:
+            ex = await self._execute(
+                query=f"SELECT COALESCE(MAX(id), 0) FROM {outbox};", string=f"Fetched the last change of {table_name}."
+            )
+            if not ex:
+                self._log_exception(ValueError)
+            after = int(self.cursor.fetchone()[0])
+        cursor = ChangeCursor(
+            table_name=table_name, after=after, gap_timeout=gap_timeout, late_timeout=late_timeout, log=self._log
+        )
+        while True:
+            ex = await self._execute(
+                query=(
+                    f"SELECT id, operation, row_key, document, changed_at FROM {outbox} "
+                    f"WHERE id > %s ORDER BY id LIMIT {batch_size};"
+                ),
+                string=f"Fetched the next changes of table {table_name}.",
+                values=(cursor.after,),
+            )
+            if not ex:
+                self._log_exception(ValueError)
+            rows = self.cursor.fetchall() or []
+            events = cursor.advance(rows)
+            skipped = cursor.get_skipped()
+            if skipped:
+                ex = await self._execute(
+                    query=(
+                        f"SELECT id, operation, row_key, document, changed_at FROM {outbox} "
+                        f"WHERE {' OR '.join(['id BETWEEN %s AND %s'] * len(skipped))} ORDER BY id;"
+                    ),
+                    string=f"Fetched the late changes of table {table_name}.",
+                    values=tuple(token for tokens in skipped for token in tokens),
+                )
+                if not ex:
+                    self._log_exception(ValueError)
+                events += cursor.recover(self.cursor.fetchall() or [])
+            for event in events:
+                yield event
+            if events and len(rows) == batch_size:
+                continue
+            if not follow and not cursor.waiting:
+                return
+            await asyncio.sleep(poll_interval)
 
     async def _get_keys(self, table_name: str):
         return (await self.get_table_description(table_name=table_name)).keys()
 
+    @traced
     async def get_all_documents(self, table_name: str) -> list[dict[str, Any]]:
         query = f"SELECT * FROM {table_name};"
+        keys = await self._get_keys(table_name=table_name)
         ex = await self._execute(query=query, string=f"Fetched all documents from table {table_name}")
         if not ex:
-            src.logger.log_exception(ValueError)
-        results = self.cursor.fetchall()
-        if results is None:
-            return []
-        return [
-            self._convert_tuple_to_dict(line=result, keys=await self._get_keys(table_name=table_name))
-            for result in results
-        ]
+            self._log_exception(ValueError)
+        return self._fetch_documents(keys=keys)
+
+    def _gen_where_clause(self, query: dict[str, Any] | None) -> tuple[str, tuple]:
+        if not query:
+            return "", ()
+        return " WHERE " + self._gen_placeholder_where_string(query=query), self._get_values_tuple_from_dict(query)
+
+    @traced
+    async def count_documents(self, table_name: str, query: dict[str, Any] | None = None) -> int:
+        """
+        Counts the documents that match the query on the server, without fetching them.
+        """
+        where, values = self._gen_where_clause(query)
+        q = f"SELECT COUNT(*) FROM {table_name}{where};"
+        ex = await self._execute(query=q, string=f"Counted documents of table {table_name}{where}", values=values)
+        if not ex:
+            self._log_exception(ValueError)
+        return int(self.cursor.fetchone()[0])
+
+    @traced
+    async def exists(self, table_name: str, query: dict[str, Any] | None = None) -> bool:
+        """
+        Tells whether any document matches the query, stopping at the first match.
+        """
+        where, values = self._gen_where_clause(query)
+        q = f"SELECT EXISTS(SELECT 1 FROM {table_name}{where} LIMIT 1);"
+        ex = await self._execute(query=q, string=f"Checked documents of table {table_name}{where}", values=values)
+        if not ex:
+            self._log_exception(ValueError)
+        return bool(self.cursor.fetchone()[0])
+
+    @traced
+    async def aggregate(
+        self,
+        table_name: str,
+        query: dict[str, Any] | None = None,
+        group_by: Iterable[str] = (),
+        metrics: dict[str, tuple[str, str]] | None = None,
+    ) -> list[dict[str, Any]]:
+        """
+        Aggregates the documents that match the query on the server.
+
+        :param group_by: The columns the documents are grouped by
+        :type group_by: Iterable[str]
+        :param metrics: The metrics of each group, by name, as a couple of function and column, such as \
+            ``{"total": ("sum", "amount"), "documents": ("count", "*")}``. The functions are ``count``, ``sum``, \
+            ``avg``, ``min`` and ``max``.
+        :type metrics: dict[str, tuple[str, str]] | None
+
+        :return: One document per group, with the group columns and the metrics
+        :rtype: list[dict[str, Any]]
+        """
+        group_by = tuple(group_by)
+        metrics = metrics or {"count": ("count", "*")}
+        columns = list(group_by)
+        for name, (function, column) in metrics.items():
+            function = function.upper()
+            if function not in AGGREGATE_FUNCTIONS:
+                raise ValueError(f"Unknown aggregate function {function}.")
+            if column == "*" and function != "COUNT":
+                raise ValueError(f"{function} needs a column.")
+            columns.append(f"{function}({column}) AS {name}")
+        where, values = self._gen_where_clause(query)
+        q = f"SELECT {', '.join(columns)} FROM {table_name}{where}"
+        if group_by:
+            q += f" GROUP BY {', '.join(group_by)}"
+        q += ";"
+        ex = await self._execute(query=q, string=f"Aggregated documents of table {table_name}: {q}", values=values)
+        if not ex:
+            self._log_exception(ValueError)
+        keys = group_by + tuple(metrics.keys())
+        return [self._convert_tuple_to_dict(line=line, keys=keys) for line in self.cursor.fetchall() or []]
 
     async def _get_table_creation_command(self, table_name: str) -> str:
         query = f"SHOW CREATE TABLE {table_name};"
         ex = await self._execute(query=query, string=f"Got the commands to create table {table_name}")
         if not ex:
-            src.logger.log_exception(ValueError)
+            self._log_exception(ValueError)
         return self.cursor.fetchone()[1] + ";"
 
     async def _get_database_creation_command(self) -> str:
         query = "SHOW CREATE DATABASE planetae;"
         ex = await self._execute(query=query, string="Got the commands to create database")
         if not ex:
-            src.logger.log_exception(ValueError)
+            self._log_exception(ValueError)
         return self.cursor.fetchone()[1] + ";"
 
-    async def backup_database(self, path: str, structure_only: bool = False, data_only: bool = False) -> bool:
-        src.logger.log_string("Starting backup.")
-        async with asyncio.TaskGroup() as tg:
-            try:
-                all_tables = await self.get_all_tables()
-                src.logger.log_string("Fetching tables")
-                tables_tasks = [
-                    (
-                        tg.create_task(self.get_all_documents(table_name=table_name)),
-                        table_name,
-                    )
-                    for table_name in all_tables
-                ]
-                create_database_task = tg.create_task(self._get_database_creation_command())
-                create_tables_tasks = [tg.create_task(self._get_table_creation_command(table)) for table in all_tables]
-                src.logger.log_string("Fetching documments")
-
-            except Exception as e:
-                src.logger.log_exception(e)
-                raise
+    @staticmethod
+    def _encode_backup_value(value: Any) -> Any:
+        if isinstance(value, (datetime.date, datetime.time)):
+            return value.isoformat(sep=" ") if isinstance(value, datetime.datetime) else value.isoformat()
+        if isinstance(value, datetime.timedelta):
+            return str(value)
+        if isinstance(value, decimal.Decimal):
+            return str(value)
+        if isinstance(value, (bytes, bytearray, memoryview)):
+            return {"$binary": base64.b64encode(value).decode()}
+        raise TypeError(f"Object of type {type(value).__name__} can not be written to a backup.")
 
-            backup = "\n"
+    @staticmethod
+    def _decode_backup_value(value: dict) -> Any:
+        if "$binary" in value:
+            return base64.b64decode(value["$binary"])
+        return value
 
-        if not data_only:
-            backup += create_database_task.result() + "\n\n"
+    @classmethod
+    def _get_backup_block(cls, query: str, values: Any) -> str:
+        return query + "\n" + json.dumps(values, default=cls._encode_backup_value)
 
-            for table_task in create_tables_tasks:
-                table = table_task.result()
-                backup += table + "\n\n"
+    @staticmethod
+    def _get_manifest_path(path: str) -> str:
+        return path + ".manifest.json"
 
-            src.logger.log_string("Tables Fetched")
+    @classmethod
+    def _read_manifest(cls, path: str) -> dict[str, Any]:
+        with open(cls._get_manifest_path(path), "r") as manifest:
+            return json.load(manifest)
+
+    async def _get_checkpoint(self) -> str:
+        await self._execute(query="SELECT NOW(6);", string="Fetched the backup checkpoint.")
+        return str(self.cursor.fetchone()[0])
 
+    async def enable_incremental_backups(self, version_column: str = "updated_at") -> bool:
+        """
+        Creates the tombstone table and, on every table having ``version_column`` and a primary key, the trigger
+        that records in it the primary key of every deleted document, so incremental backups can replay deletions
+        without listing the documents that are kept. The triggers add an insert to every delete, so this is opt-in.
+        Call it again after creating tables.
+        """
+        for table_name in await self.get_all_tables() or ():
+            if table_name == DELETIONS_TABLE:
+                continue
+            primary_key = (await self.get_table_indexes(table_name=table_name)).get("PRIMARY")
+            if primary_key and version_column in await self._get_keys(table_name=table_name):
+                if not await self._track_deletions(table_name=table_name, primary_key=primary_key):
+                    return False
+        return True
+
+    async def disable_incremental_backups(self, drop_tombstones: bool = False) -> bool:
+        """
+        Drops the triggers installed by ``enable_incremental_backups`` and, with ``drop_tombstones``, the tombstone
+        table.
+        """
+        for table_name in await self.get_all_tables() or ():
+            trigger = f"_{table_name}_backup_delete"
+            if not await self._execute(query=f"DROP TRIGGER IF EXISTS {trigger};", string=f"Dropped {trigger}."):
+                return False
+        if drop_tombstones:
+            return await self.delete_table(table_name=DELETIONS_TABLE)
+        return True
+
+    async def _track_deletions(self, table_name: str, primary_key: tuple[str, ...]) -> bool:
+        ex = await self._execute(
+            query=(
+                f"CREATE TABLE IF NOT EXISTS {DELETIONS_TABLE} (id BIGINT NOT NULL AUTO_INCREMENT, "
+                "table_name VARCHAR(64) NOT NULL, row_key LONGTEXT NOT NULL, "
+                "deleted_at TIMESTAMP(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6), PRIMARY KEY (id), "
+                "INDEX table_deletions (table_name, deleted_at)) default charset=utf8mb4;"
+            ),
+            string=f"Created table {DELETIONS_TABLE}.",
+        )
+        trigger = f"_{table_name}_backup_delete"
+        row_key = "JSON_ARRAY(" + ", ".join(f"OLD.{column}" for column in primary_key) + ")"
+        return (
+            ex
+            and await self._execute(query=f"DROP TRIGGER IF EXISTS {trigger};", string=f"Dropped {trigger}.")
+            and await self._execute(
+                query=(
+                    f"CREATE TRIGGER {trigger} AFTER DELETE ON {table_name} FOR EACH ROW "
+                    f"INSERT INTO {DELETIONS_TABLE} (table_name, row_key) VALUES ('{table_name}', {row_key});"
+                ),
+                string=f"Created {trigger}.",
+            )
+        )
+
+    async def _get_table_data_blocks(
+        self, table_name: str, since: str | None = None, version_column: str = "updated_at"
+    ) -> tuple[list[str], bool]:
+        """
+        Returns the blocks that restore the documents of a table and whether only the changed documents were dumped.
+
+        When ``since`` is given and the table has the ``version_column``, the primary keys of the documents deleted
+        since the checkpoint, read from the tombstone table, are dumped first, followed by the documents changed
+        since the checkpoint as ``REPLACE`` statements.
+        """
+        keys = tuple(await self._get_keys(table_name=table_name))
+        incremental = since is not None and version_column in keys
+        blocks = []
+        if incremental:
+            primary_key = (await self.get_table_indexes(table_name=table_name)).get("PRIMARY")
+            if primary_key:
+                await self._execute(
+                    query=(
+                        f"SELECT row_key FROM {DELETIONS_TABLE} WHERE table_name = %s AND deleted_at >= %s ORDER BY id;"
+                    ),
+                    string=f"Fetched the documents deleted from table {table_name} since {since}",
+                    values=(table_name, since),
+                )
+                rows = [json.loads(line[0]) for line in self.cursor.fetchall() or []]
+                if rows:
+                    blocks.append(self._get_backup_block(f"-- DELETED {table_name} {', '.join(primary_key)}", rows))
+            query = f"SELECT * FROM {table_name} WHERE {version_column} >= %s;"
+            await self._execute(
+                query=query, string=f"Fetched documents of table {table_name} changed since {since}", values=(since,)
+            )
+        else:
+            await self._execute(query=f"SELECT * FROM {table_name};", string=f"Fetched documents of {table_name}")
+        for line in self.cursor.fetchall() or []:
+            query, values = await self.insert_document(
+                table_name=table_name, document=self._convert_tuple_to_dict(line=line, keys=keys), return_query=True
+            )  # type: ignore
+            if since is not None:
+                query = query.replace("INSERT INTO", "REPLACE INTO", 1)
+            blocks.append(self._get_backup_block(query, list(values)))
+        return blocks, incremental
+
+    @staticmethod
+    def _get_table_data_path(path: str, table_name: str) -> str:
+        return f"{path}.{table_name}.tsv"
+
+    @classmethod
+    def _encode_tsv_field(cls, value: Any) -> bytes:
+        if value is None:
+            return b"\\N"
+        if isinstance(value, (bytes, bytearray, memoryview)):
+            field = bytes(value)
+        elif isinstance(value, (datetime.date, datetime.time, datetime.timedelta, decimal.Decimal)):
+            field = cls._encode_backup_value(value).encode()
+        else:
+            field = str(value).encode()
+        for character, escaped in TSV_ESCAPES:
+            field = field.replace(character, escaped)
+        return field
+
+    @staticmethod
+    def _decode_tsv_field(field: bytes) -> Any:
+        if field == b"\\N":
+            return None
+        unescaped = bytearray()
+        characters = iter(field)
+        for character in characters:
+            if character == 0x5C:
+                escaped = next(characters, 0x5C)
+                character = TSV_UNESCAPES.get(escaped, escaped)
+            unescaped.append(character)
+        try:
+            return unescaped.decode()
+        except UnicodeDecodeError:
+            return bytes(unescaped)
+
+    async def _dump_table_data(self, table_name: str, path: str) -> dict[str, Any]:
+        """
+        Writes the documents of the table to a tab separated file in the format read by ``LOAD DATA`` with its \
+            default options.
+        """
+        keys = tuple(await self._get_keys(table_name=table_name))
+        await self._execute(query=f"SELECT * FROM {table_name};", string=f"Fetched documents of {table_name}")
+        rows = 0
+        with open(path, "wb") as data_file:
+            for line in self.cursor.fetchall() or []:
+                data_file.write(b"\t".join(self._encode_tsv_field(value) for value in line) + b"\n")
+                rows += 1
+        return {"file": os.path.basename(path), "columns": keys, "rows": rows}
+
+    async def _load_table_data(self, table_name: str, path: str, columns: Iterable[str], chunk_size: int = 5000):
+        """
+        Loads a tab separated file written by ``_dump_table_data`` with ``LOAD DATA LOCAL INFILE`` when the \
+            connection allows it, and with the connector's bulk ``executemany`` otherwise.
+        """
+        columns = tuple(columns)
+        if self.local_infile:
+            escaped_path = os.path.abspath(path).replace("\\", "\\\\").replace("'", "\\'")
+            query = (
+                f"LOAD DATA LOCAL INFILE '{escaped_path}' INTO TABLE {table_name} CHARACTER SET utf8mb4 "
+                f"({', '.join(columns)});"
+            )
+            if await self._execute(query=query, string=f"Loaded documents of table {table_name} from {path}."):
+                return True
+        placeholders = self._get_string_with_placeholders_from_iterable(columns)
+        query = f"INSERT INTO {table_name} ({', '.join(columns)}) VALUES {placeholders};"
+        async with self.transaction():
+            with open(path, "rb") as data_file:
+                rows = (
+                    tuple(self._decode_tsv_field(field) for field in line.rstrip(b"\n").split(b"\t"))
+                    for line in data_file
+                )
+                while chunk := list(itertools.islice(rows, chunk_size)):
+                    await self._executemany(
+                        query=query, string=f"Inserted {len(chunk)} documents in table {table_name}.", values=chunk
+                    )
+        return True
+
+    async def backup_database(
+        self,
+        path: str,
+        structure_only: bool = False,
+        data_only: bool = False,
+        incremental_since: str | None = None,
+        version_column: str = "updated_at",
+        data_format: str = "sql",
+    ) -> bool:
+        """
+        Writes a backup of the database to ``path`` and its checkpoint manifest to ``path.manifest.json``.
+
+        :param incremental_since: The checkpoint of a previous backup, read from its manifest. When given, only the \
+            documents of the tables having ``version_column`` that changed since the checkpoint are dumped, along \
+            with the primary keys of the documents deleted since then, which requires \
+            ``enable_incremental_backups``. A full backup prunes the deletions it covers, so incremental backups \
+            must start at the checkpoint of the latest full backup or of an incremental backup taken after it.
+        :type incremental_since: str | None
+        :param version_column: A column updated on every change, such as \
+            ``updated_at TIMESTAMP(6) DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6)``.
+        :type version_column: str
+        :param data_format: ``sql`` writes the documents as statements in the backup file. ``tsv`` writes the \
+            documents of each table to ``path.<table>.tsv``, which ``restore_backup`` bulk loads.
+        :type data_format: str
+        """
+        if data_format not in ("sql", "tsv"):
+            raise ValueError(f"Unknown backup data format {data_format}.")
+        if data_format == "tsv" and incremental_since is not None:
+            raise ValueError("Incremental backups can only be written in the sql data format.")
+        self._log("Starting backup.")
+        checkpoint = await self._get_checkpoint()
+        all_tables = await self.get_all_tables() or ()
+        incremental = incremental_since is not None
+        if incremental and DELETIONS_TABLE not in all_tables:
+            raise ValueError("Incremental backups need the deletions recorded by enable_incremental_backups.")
+        backup = "\n"
+
+        if not data_only and not incremental:
+            backup += await self._get_database_creation_command() + "\n\n"
+            for table_name in all_tables:
+                backup += await self._get_table_creation_command(table_name) + "\n\n"
+            self._log("Tables Fetched")
+
+        tables: dict[str, dict[str, Any]] = {}
         if not structure_only:
-            for table in tables_tasks:
-                for document in table[0].result():
-                    query = await self.insert_document(table_name=table[1], document=document, return_query=True)
-                    if isinstance(query, bool):
-                        src.logger.log_exception("Return query is not properly implemented")
-                        raise
-                    query = query[0] + "\n" + str(query[1])
-                    backup += query
-
-        os.makedirs(os.path.sep.join(path.split(os.path.sep)[:-1]), exist_ok=True)
+            self._log("Fetching documments")
+            for table_name in all_tables:
+                if table_name == DELETIONS_TABLE:
+                    continue
+                if data_format == "tsv":
+                    tables[table_name] = await self._dump_table_data(
+                        table_name=table_name, path=self._get_table_data_path(path, table_name)
+                    )
+                    continue
+                blocks, changes_only = await self._get_table_data_blocks(
+                    table_name=table_name, since=incremental_since, version_column=version_column
+                )
+                tables[table_name] = {"incremental": changes_only, "blocks": len(blocks)}
+                for block in blocks:
+                    backup += block + "\n\n"
+
+        manifest = {
+            "database": self.name,
+            "type": "incremental" if incremental else "full",
+            "since": incremental_since,
+            "checkpoint": checkpoint,
+            "version_column": version_column,
+            "data_format": data_format,
+            "tables": tables,
+        }
+        os.makedirs(os.path.sep.join(path.split(os.path.sep)[:-1]) or ".", exist_ok=True)
         with open(path, "w") as backup_file:
             backup_file.write(backup)
+        with open(self._get_manifest_path(path), "w") as manifest_file:
+            json.dump(manifest, manifest_file, indent=4)
+        if not incremental and not structure_only and DELETIONS_TABLE in all_tables:
+            await self._execute(
+                query=f"DELETE FROM {DELETIONS_TABLE} WHERE deleted_at < %s;",
+                string="Pruned the deletions covered by the full backup.",
+                values=(checkpoint,),
+            )
         return True
 
-    async def restore_backup(self, path: str) -> bool:
+    async def _replay_backup_block(self, block: str) -> None:
+        block = block.strip("\n")
+        query, _, values = block.partition("\n")
+        if query.startswith("-- DELETED "):
+            table_name, _, columns = query[len("-- DELETED ") :].partition(" ")
+            primary_key = tuple(columns.split(", "))
+            await self.delete_documents(
+                table_name=table_name, queries=[dict(zip(primary_key, row)) for row in json.loads(values)]
+            )
+        elif query.startswith(("INSERT INTO ", "REPLACE INTO ")) and values:
+            await self._execute(
+                query=query,
+                string="Restoring documents",
+                values=tuple(json.loads(values, object_hook=self._decode_backup_value)),
+            )
+        else:
+            await self._execute(query=block, string="Restoring tables")
+
+    async def restore_backup(self, path: str, incrementals: Iterable[str] = ()) -> bool:
+        """
+        Restores a full backup and then replays the incremental backups, which must be given in the order they \
+            were taken, each one starting at the checkpoint of the previous one.
+        """
+        chain = [path, *incrementals]
+        checkpoint = None
+        tables: dict[str, Any] = {}
+        if os.path.exists(self._get_manifest_path(path)):
+            manifest = self._read_manifest(path)
+            if manifest.get("data_format") == "tsv":
+                tables = manifest["tables"]
+        for backup_path in chain:
+            if os.path.exists(self._get_manifest_path(backup_path)):
+                manifest = self._read_manifest(backup_path)
+                if manifest["type"] == "incremental" and manifest["since"] != checkpoint:
+                    raise ValueError(f"Backup {backup_path} does not start at the checkpoint {checkpoint}.")
+                checkpoint = manifest["checkpoint"]
+
         await self.delete_database()
         with open(path, "r") as backup:
             queries = backup.read().split("\n\n")
@@ -472,7 +1796,21 @@ class SQLDatabase(Database):
                 await self._execute("USE planetae;", string="Selecting database.")
             else:
                 if query:
-                    await self._execute(query=query, string="Restoring tables")
+                    await self._replay_backup_block(query)
+
+        directory = os.path.dirname(path)
+        for table_name, table in tables.items():
+            await self._load_table_data(
+                table_name=table_name, path=os.path.join(directory, table["file"]), columns=table["columns"]
+            )
+
+        for incremental in incrementals:
+            with open(incremental, "r") as backup:
+                blocks = [block for block in backup.read().split("\n\n") if block.strip()]
+            async with self.transaction():
+                for block in blocks:
+                    await self._replay_backup_block(block)
+            self._log(f"Replayed incremental backup {incremental}.")
         return True
 
 
@@ -485,6 +1823,7 @@ class MariaDBDatabase(SQLDatabase):
         username: str,
         password: str,
         logger_file: str | None = None,
+        local_infile: bool = False,
     ):
         super().__init__(
             name=name,
@@ -494,12 +1833,14 @@ class MariaDBDatabase(SQLDatabase):
             password=password,
             logger_file=logger_file,
         )
+        self.local_infile = local_infile
         self.connection = mariadb.connect(
             user=self.username,
             password=self.password,
             host=self.host,
             port=self.port,
             database=self.name,
+            local_infile=local_infile,
         )
         self.cursor = self.connection.cursor()
 
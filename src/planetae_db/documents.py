@@ -0,0 +1,248 @@
+import json
+import re
+from typing import TYPE_CHECKING, Any, Iterable
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None  # type: ignore
+
+if TYPE_CHECKING:
+    from src.planetae_db.database import SQLDatabase
+
+
+DOCUMENT_COLUMN = "document"
+ID_COLUMN = "_id"
+PATH_PATTERN = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*(\.[A-Za-z_][A-Za-z0-9_]*)*$")
+
+
+def dumps(document: Any) -> str:
+    """
+    Serializes a document to JSON, with orjson when it is installed.
+    """
+    if orjson is not None:
+        return orjson.dumps(document, default=str).decode()
+    return json.dumps(document, default=str, separators=(",", ":"))
+
+
+def loads(data: str | bytes) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def flatten(query: dict[str, Any], prefix: str = "") -> dict[str, Any]:
+    """
+    Turns nested filters, like ``{"user": {"name": "Edmilson"}}``, into dotted paths, like
+    ``{"user.name": "Edmilson"}``.
+    """
+    paths = {}
+    for key, value in query.items():
+        if isinstance(value, dict) and value:
+            paths.update(flatten(value, f"{prefix}{key}."))
+        else:
+            paths[f"{prefix}{key}"] = value
+    return paths
+
+
+def check_path(path: str) -> str:
+    if not PATH_PATTERN.match(path):
+        raise ValueError(f"Invalid JSON path {path}, use dotted identifiers like user.name.")
+    return path
+
+
+def path_to_column(path: str) -> str:
+    column = "_" + check_path(path).replace(".", "__")
+    # Dots become double underscores, so paths like a__b and a.b, or a_.b and a._b, would share a column.
+    if column_to_path(column) != path:
+        raise ValueError(f"Can not index the JSON path {path}, its column is read back as {column_to_path(column)}.")
+    return column
+
+
+def column_to_path(column: str) -> str:
+    return column[1:].replace("__", ".")
+
+
+class DocumentTable:
+    """
+    A table that stores schemaless documents, nested dicts and lists included, in a JSON column.
+
+    Each document gets an ``_id`` primary key. The JSON paths given as ``indexes`` are exposed as indexed virtual
+    generated columns, and filters on those paths are compiled to comparisons on the columns, so they use the
+    indexes. Filters on other paths are compiled to ``JSON_VALUE`` comparisons, which scan the table.
+    """
+
+    database: "SQLDatabase"
+    name: str
+    paths: dict[str, str]
+
+    def __init__(self, database: "SQLDatabase", name: str, paths: dict[str, str] | None = None):
+        self.database = database
+        self.name = name
+        self.paths = paths or {}
+
+    def __repr__(self) -> str:
+        return f"DocumentTable(name={self.name!r}, indexes={tuple(self.paths)!r})"
+
+    @staticmethod
+    def _get_generated_column(path: str, column_type: str) -> dict[str, str]:
+        expression = f"JSON_VALUE({DOCUMENT_COLUMN}, '$.{check_path(path)}')"
+        return {path_to_column(path): f"{column_type} AS ({expression}) VIRTUAL"}
+
+    @classmethod
+    async def create(
+        cls, database: "SQLDatabase", name: str, indexes: dict[str, str] | None = None
+    ) -> "DocumentTable":
+        """
+        Creates the table, if it does not exist.
+
+        :param indexes: Maps the JSON paths to index to the SQL type of their values, like \
+            ``{"user.name": "VARCHAR(255)"}``
+        :type indexes: dict[str, str] | None
+        """
+        indexes = indexes or {}
+        lines = [f"{ID_COLUMN} BIGINT NOT NULL AUTO_INCREMENT", f"{DOCUMENT_COLUMN} JSON NOT NULL"]
+        for path, column_type in indexes.items():
+            lines.append(" ".join(next(iter(cls._get_generated_column(path, column_type).items()))))
+            lines.append(f"INDEX ({path_to_column(path)})")
+        lines.append(f"PRIMARY KEY ({ID_COLUMN})")
+        query = f"CREATE TABLE IF NOT EXISTS {name} ({', '.join(lines)}) default charset=utf8mb4;"
+        if not await database._execute(query=query, string=f"Created document table {name}."):
+            raise ValueError(f"Could not create document table {name}.")
+        return cls(database=database, name=name, paths={path: path_to_column(path) for path in indexes})
+
+    @classmethod
+    async def load(cls, database: "SQLDatabase", name: str) -> "DocumentTable":
+        columns = await database.get_table_description(table_name=name)
+        if DOCUMENT_COLUMN not in columns or ID_COLUMN not in columns:
+            raise ValueError(f"Table {name} is not a document table.")
+        paths = {
+            column_to_path(column): column
+            for column in columns
+            if column.startswith("_") and column != ID_COLUMN
+        }
+        return cls(database=database, name=name, paths=paths)
+
+    async def add_index(self, path: str, column_type: str) -> bool:
+        """
+        Exposes the JSON path as an indexed virtual generated column, in a single ``ALTER TABLE``.
+        """
+        column = path_to_column(path)
+        alter = self.database.alter_table(self.name)
+        alter.add_column(self._get_generated_column(path, column_type)).add_index(column)
+        if not await alter.execute():
+            return False
+        self.paths[path] = column
+        return True
+
+    @staticmethod
+    def _encode_value(value: Any) -> Any:
+        if isinstance(value, bool):
+            return "true" if value else "false"
+        if isinstance(value, (list, dict)):
+            return dumps(value)
+        return value
+
+    def compile_query(self, query: dict[str, Any] | None) -> tuple[str, tuple]:
+        """
+        Compiles a filter to a ``WHERE`` clause and its values. Filters on indexed paths use their generated
+        columns.
+        """
+        conditions, values = [], []
+        for path, value in flatten(query or {}).items():
+            if path == ID_COLUMN:
+                target = ID_COLUMN
+            elif path in self.paths:
+                target = self.paths[path]
+            else:
+                target = f"JSON_VALUE({DOCUMENT_COLUMN}, '$.{check_path(path)}')"
+            if value is None:
+                conditions.append(f"{target} IS NULL")
+            else:
+                conditions.append(f"{target} = %s")
+                values.append(self._encode_value(value))
+        if not conditions:
+            return "", ()
+        return " WHERE " + " AND ".join(conditions), tuple(values)
+
+    @staticmethod
+    def _decode(line: tuple) -> dict[str, Any]:
+        document = loads(line[1])
+        document[ID_COLUMN] = line[0]
+        return document
+
+    @staticmethod
+    def _strip_id(document: dict[str, Any]) -> dict[str, Any]:
+        return {key: value for key, value in document.items() if key != ID_COLUMN}
+
+    async def insert_document(self, document: dict[str, Any]) -> bool:
+        return await self.database._execute(
+            query=f"INSERT INTO {self.name} ({DOCUMENT_COLUMN}) VALUES (%s);",
+            string=f"Inserted document in table {self.name}.",
+            values=(dumps(self._strip_id(document)),),
+        )
+
+    async def insert_documents(self, documents: Iterable[dict[str, Any]], chunk_size: int = 1000) -> bool:
+        return await self.database.insert_documents(
+            table_name=self.name,
+            documents=({DOCUMENT_COLUMN: dumps(self._strip_id(document))} for document in documents),
+            chunk_size=chunk_size,
+        )
+
+    async def get_documents(self, query: dict[str, Any] | None = None, limit: int | None = None) -> list[dict]:
+        where, values = self.compile_query(query)
+        statement = f"SELECT {ID_COLUMN}, {DOCUMENT_COLUMN} FROM {self.name}{where}"
+        if limit is not None:
+            statement += f" LIMIT {limit}"
+        await self.database._execute(
+            query=statement + ";", string=f"Fetched documents from table {self.name}.", values=values
+        )
+        return [self._decode(line) for line in self.database.cursor.fetchall() or []]
+
+    async def get_document(self, query: dict[str, Any]) -> dict[str, Any] | None:
+        documents = await self.get_documents(query, limit=1)
+        return documents[0] if documents else None
+
+    async def get_all_documents(self) -> list[dict[str, Any]]:
+        return await self.get_documents()
+
+    async def update_document(self, query: dict[str, Any], changes: dict[str, Any]) -> bool:
+        """
+        Sets the given paths of the matching documents, keeping the rest of them. Nested dicts in ``changes`` are
+        stored as they are, use dotted paths to change a single nested value.
+        """
+        if not changes:
+            return True
+        where, values = self.compile_query(query)
+        sets = ", ".join(f"'$.{check_path(path)}', JSON_EXTRACT(%s, '$')" for path in changes)
+        return await self.database._execute(
+            query=f"UPDATE {self.name} SET {DOCUMENT_COLUMN} = JSON_SET({DOCUMENT_COLUMN}, {sets}){where};",
+            string=f"Updated documents of table {self.name}.",
+            values=tuple(dumps(value) for value in changes.values()) + values,
+        )
+
+    async def replace_document(self, query: dict[str, Any], document: dict[str, Any]) -> bool:
+        where, values = self.compile_query(query)
+        return await self.database._execute(
+            query=f"UPDATE {self.name} SET {DOCUMENT_COLUMN} = %s{where};",
+            string=f"Replaced documents of table {self.name}.",
+            values=(dumps(self._strip_id(document)),) + values,
+        )
+
+    async def delete_document(self, query: dict[str, Any]) -> bool:
+        where, values = self.compile_query(query)
+        return await self.database._execute(
+            query=f"DELETE FROM {self.name}{where};",
+            string=f"Deleted documents from table {self.name}.",
+            values=values,
+        )
+
+    async def count_documents(self, query: dict[str, Any] | None = None) -> int:
+        where, values = self.compile_query(query)
+        await self.database._execute(
+            query=f"SELECT COUNT(*) FROM {self.name}{where};",
+            string=f"Counted documents of table {self.name}.",
+            values=values,
+        )
+        line = self.database.cursor.fetchone()
+        return line[0] if line else 0
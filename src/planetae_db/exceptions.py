@@ -21,3 +21,15 @@ class PlanetaeBaseException(Exception):
 
 class CouldNotConnectWithDataPlanetaeBaseException(PlanetaeBaseException):
     pass
+
+
+class QueryTimeoutPlanetaeBaseException(PlanetaeBaseException, TimeoutError):
+    pass
+
+
+class OnlineSchemaChangePlanetaeBaseException(PlanetaeBaseException):
+    pass
+
+
+class ChunkedOperationPlanetaeBaseException(PlanetaeBaseException):
+    pass
@@ -0,0 +1,36 @@
+import time
+from dataclasses import dataclass, field
+from typing import Any
+
+EXPLAINABLE_STATEMENTS = ("SELECT", "UPDATE", "DELETE", "INSERT", "REPLACE")
+
+
+@dataclass
+class SlowQuery:
+    query: str
+    values: tuple | None
+    duration: float
+    plan: dict[str, Any] | None = None
+    full_scans: list[str] = field(default_factory=list)
+    captured_at: float = field(default_factory=time.time)
+
+
+def is_explainable(query: str) -> bool:
+    words = query.split(None, 1)
+    return bool(words) and words[0].upper() in EXPLAINABLE_STATEMENTS
+
+
+def get_full_scans(plan: Any) -> list[str]:
+    """
+    Returns the tables that the ``EXPLAIN FORMAT=JSON`` plan reads with a full table scan.
+    """
+    tables: list[str] = []
+    if isinstance(plan, dict):
+        if plan.get("access_type") == "ALL":
+            tables.append(plan.get("table_name", "?"))
+        for value in plan.values():
+            tables.extend(get_full_scans(value))
+    elif isinstance(plan, list):
+        for value in plan:
+            tables.extend(get_full_scans(value))
+    return tables
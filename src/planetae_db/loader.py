@@ -0,0 +1,74 @@
+import asyncio
+from typing import TYPE_CHECKING, Any, Hashable, Iterable
+
+if TYPE_CHECKING:
+    from src.planetae_db.database import Database
+
+
+class DocumentLoader:
+    """
+    Batches the lookups of documents by the value of one column.
+
+    The values requested during the same event loop iteration are fetched together with a single
+    ``SELECT ... WHERE key IN (...)``, in batches of up to ``max_batch`` values, and each caller gets its own
+    document, or ``None`` when there is none. Lookups of a value that is already being fetched share its query.
+    Nothing is cached once a batch is answered, so later lookups see fresh data.
+    """
+
+    database: "Database"
+    table_name: str
+    key: str
+
+    def __init__(self, database: "Database", table_name: str, key: str = "id", max_batch: int = 1000):
+        self.database = database
+        self.table_name = table_name
+        self.key = key
+        self.max_batch = max_batch
+        self._queue: dict[Hashable, asyncio.Future] = {}
+        self._inflight: dict[Hashable, asyncio.Future] = {}
+        self._tasks: set[asyncio.Task] = set()
+
+    async def load(self, value: Hashable) -> dict[str, Any] | None:
+        """
+        Returns the document whose ``key`` is ``value``.
+        """
+        future = self._queue.get(value) or self._inflight.get(value)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            if not self._queue:
+                loop.call_soon(self._dispatch)
+            future = self._queue[value] = loop.create_future()
+        return await asyncio.shield(future)
+
+    async def load_many(self, values: Iterable[Hashable]) -> list[dict[str, Any] | None]:
+        return list(await asyncio.gather(*(self.load(value) for value in values)))
+
+    def _dispatch(self) -> None:
+        queue, self._queue = self._queue, {}
+        self._inflight.update(queue)
+        values = list(queue)
+        for index in range(0, len(values), self.max_batch):
+            batch = {value: queue[value] for value in values[index : index + self.max_batch]}
+            task = asyncio.create_task(self._fetch(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _fetch(self, batch: dict[Hashable, asyncio.Future]) -> None:
+        try:
+            documents = await self.database.get_documents_by_keys(
+                table_name=self.table_name, key=self.key, values=list(batch)
+            )
+        except BaseException as e:
+            for future in batch.values():
+                if not future.done():
+                    future.set_exception(e)
+            if not isinstance(e, Exception):
+                raise
+        else:
+            found = {document[self.key]: document for document in documents}
+            for value, future in batch.items():
+                if not future.done():
+                    future.set_result(found.get(value))
+        finally:
+            for value in batch:
+                self._inflight.pop(value, None)
@@ -0,0 +1,924 @@
+import asyncio
+import copy
+import datetime
+import pickle
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Hashable, Iterable
+
+from src.planetae_db.alter import AlterTable
+from src.planetae_db.changes import ChangeEvent, get_outbox_name, get_outbox_signature
+from src.planetae_db.client import Client
+from src.planetae_db.database import AGGREGATE_FUNCTIONS, Database, SQLDatabase
+
+
+class InMemoryTable:
+    """
+    The rows of a table, by primary key, with a hash index per indexed column.
+
+    ``insert``, ``update`` and ``delete`` append to ``undo``, when given, the function that reverts them.
+    """
+
+    def __init__(self, name: str, columns: dict[str, str], primary_key: str, auto_increment: bool = False):
+        self.name = name
+        self.columns = columns
+        self.primary_key = primary_key
+        self.auto_increment = auto_increment
+        self.next_id = 1
+        self.rows: dict[Hashable, dict[str, Any]] = {}
+        self.indexes: dict[str, dict[Hashable, set[Hashable]]] = {}
+
+    def check_columns(self, keys: Iterable[str]) -> None:
+        for key in keys:
+            if key not in self.columns:
+                raise ValueError(f"Unknown column {key} in table {self.name}.")
+
+    @staticmethod
+    def _hashable(value: Any) -> bool:
+        try:
+            hash(value)
+        except TypeError:
+            return False
+        return True
+
+    def _index(self, pk: Hashable, row: dict[str, Any]) -> None:
+        for column, index in self.indexes.items():
+            if self._hashable(row.get(column)):
+                index.setdefault(row.get(column), set()).add(pk)
+
+    def _unindex(self, pk: Hashable, row: dict[str, Any]) -> None:
+        for column, index in self.indexes.items():
+            value = row.get(column)
+            if self._hashable(value) and value in index:
+                index[value].discard(pk)
+                if not index[value]:
+                    del index[value]
+
+    def create_index(self, column: str) -> None:
+        self.check_columns((column,))
+        self.indexes[column] = {}
+        for pk, row in self.rows.items():
+            if self._hashable(row[column]):
+                self.indexes[column].setdefault(row[column], set()).add(pk)
+
+    def rebuild(self, primary_key: str | None = None) -> None:
+        self.primary_key = primary_key or self.primary_key
+        rows = list(self.rows.values())
+        if len({row[self.primary_key] for row in rows}) != len(rows):
+            raise ValueError(f"Duplicate values for the primary key {self.primary_key} of table {self.name}.")
+        self.rows = {}
+        self.indexes = {column: {} for column in self.indexes if column in self.columns}
+        for row in rows:
+            self.rows[row[self.primary_key]] = row
+            self._index(row[self.primary_key], row)
+
+    def _put(self, pk: Hashable, row: dict[str, Any]) -> None:
+        self.rows[pk] = row
+        self._index(pk, row)
+
+    def _revert_update(self, pk: Hashable, new_pk: Hashable, row: dict[str, Any]) -> None:
+        self.delete(new_pk)
+        self._put(pk, row)
+
+    def insert(self, document: dict[str, Any], undo: list[Callable[[], None]] | None = None) -> Hashable:
+        self.check_columns(document)
+        row = {column: document.get(column) for column in self.columns}
+        if row[self.primary_key] is None and self.auto_increment:
+            row[self.primary_key] = self.next_id
+        pk = row[self.primary_key]
+        if pk is None:
+            raise ValueError(f"The primary key {self.primary_key} of table {self.name} can not be null.")
+        if pk in self.rows:
+            raise ValueError(f"Duplicate entry {pk!r} for the primary key of table {self.name}.")
+        if isinstance(pk, int):
+            self.next_id = max(self.next_id, pk + 1)
+        self._put(pk, row)
+        if undo is not None:
+            undo.append(lambda: self.delete(pk))
+        return pk
+
+    def plan(self, query: dict[str, Any] | None) -> tuple[str, str | None, Iterable[Hashable]]:
+        """
+        Returns how the rows that may match the query are found, as the ``access_type`` and ``key`` of a MariaDB
+        plan, with the primary keys of those rows.
+        """
+        query = query or {}
+        self.check_columns(query)
+        if self.primary_key in query:
+            pk = query[self.primary_key]
+            return "const", "PRIMARY", [pk] if self._hashable(pk) and pk in self.rows else []
+        indexed = [column for column in query if column in self.indexes and self._hashable(query[column])]
+        if indexed:
+            column = min(indexed, key=lambda column: len(self.indexes[column].get(query[column], ())))
+            return "ref", column, self.indexes[column].get(query[column], set())
+        return "ALL", None, self.rows.keys()
+
+    def find(self, query: dict[str, Any] | None) -> list[Hashable]:
+        """
+        Returns the primary keys of the rows equal to every value of the query, in primary key order when they can
+        be compared. As with ``column = NULL`` in SQL, a ``None`` in the query matches nothing.
+        """
+        query = query or {}
+        _, _, candidates = self.plan(query)
+        if any(value is None for value in query.values()):
+            return []
+        pks = [
+            pk
+            for pk in candidates
+            if all(self.rows[pk][column] == value for column, value in query.items())
+        ]
+        try:
+            return sorted(pks)  # type: ignore
+        except TypeError:
+            return pks
+
+    def update(
+        self, pk: Hashable, changes: dict[str, Any], undo: list[Callable[[], None]] | None = None
+    ) -> Hashable:
+        row = self.rows[pk]
+        new_row = {**row, **changes}
+        new_pk = new_row[self.primary_key]
+        if new_pk != pk and new_pk in self.rows:
+            raise ValueError(f"Duplicate entry {new_pk!r} for the primary key of table {self.name}.")
+        self._unindex(pk, row)
+        del self.rows[pk]
+        self._put(new_pk, new_row)
+        if undo is not None:
+            undo.append(lambda: self._revert_update(pk, new_pk, row))
+        return new_pk
+
+    def delete(self, pk: Hashable, undo: list[Callable[[], None]] | None = None) -> None:
+        row = self.rows.pop(pk)
+        self._unindex(pk, row)
+        if undo is not None:
+            undo.append(lambda: self._put(pk, row))
+
+
+class InMemoryAlterTable(AlterTable):
+    """
+    Collects the changes of an in-memory table and applies them with the column methods of the database, in a
+    single transaction. The ``ALTER TABLE`` statement is still built, see ``get_query``, but never run.
+    """
+
+    database: "InMemoryDatabase"  # type: ignore
+
+    def __init__(self, database: "InMemoryDatabase", table_name: str):
+        super().__init__(database=database, table_name=table_name)  # type: ignore
+        self._changes: list[Callable[[], Awaitable[Any]]] = []
+
+    def _change(self, change: Callable[[], Awaitable[Any]]) -> "InMemoryAlterTable":
+        self._changes.append(change)
+        return self
+
+    def add_column(
+        self, signature: dict[str, str], after: str | None = None, default: str | None = None, first: bool = False
+    ) -> "InMemoryAlterTable":
+        super().add_column(signature, after=after, default=default, first=first)
+        return self._change(
+            lambda: self.database.add_column_to_table(self.table_name, signature, after, default, first)
+        )
+
+    def drop_column(self, key: str) -> "InMemoryAlterTable":
+        super().drop_column(key)
+        return self._change(lambda: self.database.remove_column_from_table(self.table_name, key))
+
+    def modify_column(self, signature: dict[str, str]) -> "InMemoryAlterTable":
+        super().modify_column(signature)
+        return self._change(lambda: self.database.change_signature_from_column(self.table_name, signature))
+
+    def rename_column(self, old_name: str, signature: dict[str, str]) -> "InMemoryAlterTable":
+        super().rename_column(old_name, signature)
+        return self._change(lambda: self.database.rename_column(self.table_name, old_name, signature))
+
+    def add_primary_key(self, key: str | Iterable[str]) -> "InMemoryAlterTable":
+        columns = [key] if isinstance(key, str) else list(key)
+        if len(columns) != 1:
+            raise NotImplementedError("In-memory tables have a single column primary key.")
+        super().add_primary_key(columns[0])
+        return self._change(lambda: self.database.add_primary_key(self.table_name, columns[0]))
+
+    def drop_primary_key(self) -> "InMemoryAlterTable":
+        raise NotImplementedError("In-memory tables always have a primary key.")
+
+    def add_index(
+        self, key: str | Iterable[str], name: str | None = None, unique: bool = False
+    ) -> "InMemoryAlterTable":
+        columns = [key] if isinstance(key, str) else list(key)
+        if len(columns) != 1 or unique or name not in (None, columns[0]):
+            raise NotImplementedError("In-memory indexes are non unique, on a single column and named after it.")
+        super().add_index(columns[0])
+        return self._change(lambda: self.database.create_index(self.table_name, columns[0]))
+
+    def drop_index(self, name: str) -> "InMemoryAlterTable":
+        super().drop_index(name)
+        return self._change(lambda: self.database.drop_index(self.table_name, name))
+
+    async def execute(self) -> bool:
+        changes = self._changes
+        self._clauses, self._renames, self._changes = [], {}, []
+        if not changes:
+            return True
+        self.database._forget_table(self.table_name)
+        return await self.database._write_all(changes, f"Altered table {self.table_name} with {len(changes)} changes.")
+
+    async def execute_online(self, *args: Any, **kwargs: Any) -> bool:
+        """
+        Applies the changes with ``execute``, as in-memory changes do not lock the table.
+        """
+        return await self.execute()
+
+
+class InMemoryDatabase(Database):
+    """
+    A database kept in the memory of the process, with the interface of the SQL databases.
+
+    Tables have a primary key, ``id`` with auto increment unless the signature has a ``PRIMARY KEY`` column, and
+    ``create_index`` adds a hash index to a column. Queries are equality matches joined with ``AND``, like the
+    ones of the SQL builders, and use the primary key or the most selective index available, which ``explain``
+    reports in the shape of a MariaDB plan.
+
+    ``alter_table`` applies its changes with the column methods, see ``InMemoryAlterTable``, the change feed keeps
+    its outbox in an in-memory table too, and backups are pickled snapshots of the tables, always full.
+
+    As in the SQL databases, a failing write logs the error and returns ``False``, unless it runs inside
+    ``transaction``, whose changes are rolled back when it raises. The transaction keeps an undo log of the rows
+    it writes, while a schema change made inside it saves a copy of the table it changes.
+    """
+
+    _data: dict[str, InMemoryTable]
+    _feeds: dict[InMemoryTable, InMemoryTable]
+    _in_transaction: bool = False
+    _undo_log: list[Callable[[], None]] | None = None
+
+    def __init__(self, name: str, logger_file: str | None = None):
+        super().__init__(name=name, logger_file=logger_file)
+        self._data = {}
+        self._feeds = {}
+        self._in_transaction = False
+        self._undo_log = None
+
+    def _get_table(self, table_name: str) -> InMemoryTable:
+        try:
+            return self._data[table_name]
+        except KeyError:
+            raise ValueError(f"Table {table_name} does not exist.") from None
+
+    def _write(self, operation: Callable[[], Any], string: str) -> Any:
+        try:
+            result = operation()
+        except Exception as e:
+            if self._logger:
+                self._logger.debug(str(e))
+            if self._in_transaction:
+                raise
+            return False
+        if self._logger:
+            self._logger.info(string)
+        return True if result is None else result
+
+    async def _write_all(self, changes: Iterable[Callable[[], Awaitable[Any]]], string: str) -> bool:
+        """
+        Awaits the changes in a single transaction, returning ``False`` if any of them fails, or raising when it
+        runs inside an outer transaction.
+        """
+        try:
+            async with self.transaction():
+                for change in changes:
+                    await change()
+        except Exception as e:
+            self._log_exception(e)
+            if self._in_transaction:
+                raise
+            return False
+        self._log(string)
+        return True
+
+    def _record_change(self, table: InMemoryTable, operation: str, pk: Hashable, row: dict[str, Any]) -> None:
+        outbox = self._feeds.get(table)
+        if outbox is not None:
+            outbox.insert(
+                {
+                    "operation": operation,
+                    "row_key": {table.primary_key: pk},
+                    "document": dict(row) if operation != "delete" else None,
+                    "changed_at": datetime.datetime.now(),
+                },
+                self._undo_log,
+            )
+
+    def _insert(self, table: InMemoryTable, document: dict[str, Any]) -> None:
+        pk = table.insert(document, self._undo_log)
+        self._record_change(table, "insert", pk, table.rows[pk])
+
+    def _update(self, table: InMemoryTable, pk: Hashable, changes: dict[str, Any]) -> None:
+        pk = table.update(pk, changes, self._undo_log)
+        self._record_change(table, "update", pk, table.rows[pk])
+
+    def _delete(self, table: InMemoryTable, pk: Hashable) -> None:
+        row = table.rows[pk]
+        table.delete(pk, self._undo_log)
+        self._record_change(table, "delete", pk, row)
+
+    @asynccontextmanager
+    async def transaction(self) -> AsyncIterator["InMemoryDatabase"]:
+        """
+        Groups every change made inside the context, which are undone if the context raises.
+        """
+        if self._in_transaction:
+            yield self
+            return
+        self._undo_log = []
+        self._in_transaction = True
+        try:
+            yield self
+        except BaseException:
+            for undo in reversed(self._undo_log):
+                undo()
+            raise
+        finally:
+            self._in_transaction = False
+            self._undo_log = None
+
+    def _save_table(self, table: InMemoryTable) -> None:
+        if self._undo_log is not None:
+            saved = copy.deepcopy(table.__dict__)
+            self._undo_log.append(lambda: table.__dict__.update(saved))
+
+    def _save_tables(self) -> None:
+        if self._undo_log is not None:
+            data, feeds = dict(self._data), dict(self._feeds)
+            names = {table: table.name for table in self._data.values()}
+            self._undo_log.append(lambda: self._restore_tables(data, feeds, names))
+
+    def _restore_tables(
+        self,
+        data: dict[str, InMemoryTable],
+        feeds: dict[InMemoryTable, InMemoryTable],
+        names: dict[InMemoryTable, str],
+    ) -> None:
+        self._data, self._feeds = data, feeds
+        for table, name in names.items():
+            table.name = name
+
+    async def initialize(self):
+        return self
+
+    async def get_all_tables(self) -> tuple[str]:
+        return tuple(self._data) or None  # type: ignore
+
+    async def create_table(self, table_name: str, signature: dict[str, str], force: bool = False) -> bool:
+        self._save_tables()
+        if force:
+            self._data.pop(table_name, None)
+        if table_name in self._data:
+            return True
+        columns, primary_key = {}, None
+        for column, column_type in signature.items():
+            if "PRIMARY KEY" in column_type.upper():
+                primary_key = column
+                column_type = column_type[: column_type.upper().index("PRIMARY KEY")].strip()
+            columns[column] = column_type
+        if primary_key is None:
+            primary_key = "id"
+            columns = {"id": "int NOT NULL AUTO_INCREMENT", **columns}
+        auto_increment = "AUTO_INCREMENT" in columns[primary_key].upper()
+        self._data[table_name] = InMemoryTable(table_name, columns, primary_key, auto_increment)
+        return True
+
+    async def get_table_description(self, table_name: str) -> dict[str, str]:
+        return dict(self._get_table(table_name).columns)
+
+    async def get_table_indexes(self, table_name: str) -> dict[str, tuple[str, ...]]:
+        table = self._get_table(table_name)
+        return {"PRIMARY": (table.primary_key,), **{column: (column,) for column in table.indexes}}
+
+    async def get_replication_lag(self) -> float | None:
+        return None
+
+    async def add_column_to_table(
+        self,
+        table_name: str,
+        signature: dict,
+        after: str | None = None,
+        default: str | None = None,
+        first: bool = False,
+    ) -> bool:
+        table = self._get_table(table_name)
+        column, column_type = next(iter(signature.items()))
+        value = default.strip("'\"") if isinstance(default, str) else default
+
+        def add():
+            if column in table.columns:
+                raise ValueError(f"Column {column} already exists in table {table_name}.")
+            items = list(table.columns.items())
+            position = 0 if first else (list(table.columns).index(after) + 1 if after else len(items))
+            items.insert(position, (column, column_type))
+            table.columns = dict(items)
+            for row in table.rows.values():
+                row[column] = value
+
+        self._save_table(table)
+        return self._write(add, f"Added column {column} to table {table_name}.")
+
+    async def add_primary_key(self, table_name: str, key: str) -> bool:
+        table = self._get_table(table_name)
+        self._save_table(table)
+        return self._write(lambda: table.rebuild(key), f"Added primary key {key} to table {table_name}.")
+
+    def alter_table(self, table_name: str) -> InMemoryAlterTable:
+        return InMemoryAlterTable(database=self, table_name=table_name)
+
+    async def remove_column_from_table(self, table_name: str, key: str) -> bool:
+        table = self._get_table(table_name)
+
+        def remove():
+            if key == table.primary_key:
+                raise ValueError(f"Can not remove the primary key {key} of table {table_name}.")
+            table.check_columns((key,))
+            del table.columns[key]
+            table.indexes.pop(key, None)
+            for row in table.rows.values():
+                row.pop(key, None)
+
+        self._save_table(table)
+        return self._write(remove, f"Removed column {key} from table {table_name}.")
+
+    async def change_signature_from_column(
+        self, table_name: str, signature: dict, online: bool = False, **online_options: Any
+    ) -> bool:
+        table = self._get_table(table_name)
+        column, column_type = next(iter(signature.items()))
+
+        def change():
+            table.check_columns((column,))
+            table.columns[column] = column_type
+
+        self._save_table(table)
+        return self._write(change, f"Changed the signature of column {column} of table {table_name}.")
+
+    async def rename_column(self, table_name: str, old_name: str, signature: dict) -> bool:
+        table = self._get_table(table_name)
+        new_name, column_type = next(iter(signature.items()))
+
+        def rename():
+            table.check_columns((old_name,))
+            table.columns = {
+                (new_name if column == old_name else column): (column_type if column == old_name else kind)
+                for column, kind in table.columns.items()
+            }
+            for row in table.rows.values():
+                row[new_name] = row.pop(old_name)
+            if old_name in table.indexes:
+                table.indexes[new_name] = table.indexes.pop(old_name)
+            if table.primary_key == old_name:
+                table.primary_key = new_name
+
+        self._save_table(table)
+        return self._write(rename, f"Renamed column {old_name} of table {table_name} to {new_name}.")
+
+    async def rename_table(self, old_table_name: str, new_table_name: str) -> bool:
+        return await self.rename_tables({old_table_name: new_table_name})
+
+    async def rename_tables(self, renames: dict[str, str]) -> bool:
+        def rename():
+            data = dict(self._data)
+            for old_name, new_name in renames.items():
+                if old_name not in data or new_name in data:
+                    raise ValueError(f"Can not rename table {old_name} to {new_name}.")
+                data[new_name] = data.pop(old_name)
+                data[new_name].name = new_name
+            self._data = data
+
+        self._forget_table(*renames, *renames.values())
+        self._save_tables()
+        return self._write(rename, f"Renamed tables {renames}.")
+
+    async def delete_table(self, table_name: str) -> bool:
+        self._forget_table(table_name)
+        self._save_tables()
+        table = self._data.pop(table_name, None)
+        self._feeds.pop(table, None)  # type: ignore
+        return table is not None
+
+    async def truncate_table(self, table_name: str) -> bool:
+        table = self._get_table(table_name)
+        if self._undo_log is not None:
+            saved = {"rows": table.rows, "indexes": table.indexes, "next_id": table.next_id}
+            self._undo_log.append(lambda: table.__dict__.update(saved))
+        table.rows = {}
+        table.indexes = {column: {} for column in table.indexes}
+        table.next_id = 1
+        return True
+
+    async def create_index(self, table_name: str, key: str) -> bool:
+        table = self._get_table(table_name)
+        self._save_table(table)
+        return self._write(lambda: table.create_index(key), f"Created index on {key} of table {table_name}.")
+
+    async def drop_index(self, table_name: str, key: str) -> bool:
+        table = self._get_table(table_name)
+
+        def drop():
+            if key not in table.indexes:
+                raise ValueError(f"Table {table_name} has no index on {key}.")
+            del table.indexes[key]
+
+        self._save_table(table)
+        return self._write(drop, f"Dropped index on {key} of table {table_name}.")
+
+    async def insert_document(
+        self, table_name: str, document: dict[str, Any], return_query: bool = False
+    ) -> bool | tuple[str, tuple]:
+        if return_query:
+            values = SQLDatabase._get_values_tuple_from_dict(document)
+            keys = SQLDatabase._get_keys_from_dict(document)
+            placeholders = SQLDatabase._get_string_with_placeholders_from_iterable(values)
+            return f"INSERT INTO {table_name} {keys} VALUES {placeholders};", values
+        if self._write_buffer is not None and not self._in_transaction:
+            return await self._write_buffer.insert_document(table_name=table_name, document=document)
+        table = self._get_table(table_name)
+        return self._write(lambda: self._insert(table, document), f"Inserted document in table {table_name}.")
+
+    async def insert_documents(
+        self, table_name: str, documents: Iterable[dict[str, Any]], chunk_size: int = 1000
+    ) -> bool:
+        table = self._get_table(table_name)
+        async with self.transaction():
+            for document in documents:
+                self._write(lambda: self._insert(table, document), f"Inserted document in table {table_name}.")
+        return True
+
+    async def update_document(
+        self, table_name: str, query: dict[str, Any], changes: dict[str, Any], limit: int | None = None
+    ) -> bool:
+        table = self._get_table(table_name)
+
+        def update():
+            table.check_columns(changes)
+            for pk in table.find(query)[:limit]:
+                self._update(table, pk, changes)
+
+        return self._write(update, f"Updated documents of table {table_name}.")
+
+    async def delete_document(self, table_name: str, query: dict[str, Any], limit: int | None = None) -> bool:
+        table = self._get_table(table_name)
+
+        def delete():
+            for pk in table.find(query)[:limit]:
+                self._delete(table, pk)
+
+        return self._write(delete, f"Deleted documents from table {table_name}.")
+
+    async def update_documents(
+        self, table_name: str, updates: Iterable[tuple[dict[str, Any], dict[str, Any]]], chunk_size: int = 1000
+    ) -> bool:
+        async with self.transaction():
+            for query, changes in updates:
+                await self.update_document(table_name=table_name, query=query, changes=changes)
+        return True
+
+    async def delete_documents(
+        self, table_name: str, queries: Iterable[dict[str, Any]], chunk_size: int = 1000
+    ) -> bool:
+        async with self.transaction():
+            for query in queries:
+                await self.delete_document(table_name=table_name, query=query)
+        return True
+
+    async def _run_chunked(
+        self,
+        table_name: str,
+        query: dict[str, Any],
+        apply: Callable[[InMemoryTable, Hashable], None],
+        chunk_size: int = 1000,
+        progress: Callable[[int, Any], Any] | None = None,
+        resume_after: Any = None,
+        **options: Any,
+    ) -> int:
+        table = self._get_table(table_name)
+        pks = [pk for pk in table.find(query) if resume_after is None or pk > resume_after]  # type: ignore
+        processed = 0
+        for index in range(0, len(pks), chunk_size):
+            chunk = pks[index : index + chunk_size]
+            for pk in chunk:
+                apply(table, pk)
+            processed += len(chunk)
+            if progress is not None:
+                progress(processed, chunk[-1])
+        return processed
+
+    async def delete_documents_chunked(
+        self, table_name: str, query: dict[str, Any], chunk_size: int = 1000, **options: Any
+    ) -> int:
+        return await self._run_chunked(
+            table_name, query, self._delete, chunk_size, **options
+        )
+
+    async def update_documents_chunked(
+        self, table_name: str, query: dict[str, Any], changes: dict[str, Any], chunk_size: int = 1000, **options: Any
+    ) -> int:
+        self._get_table(table_name).check_columns(changes)
+        return await self._run_chunked(
+            table_name, query, lambda table, pk: self._update(table, pk, changes), chunk_size, **options
+        )
+
+    async def get_document(self, table_name: str, query: dict[str, Any]) -> dict[str, Any] | None:
+        table = self._get_table(table_name)
+        pks = table.find(query)
+        return dict(table.rows[pks[0]]) if pks else None
+
+    async def get_documents(self, table_name: str, query: dict[str, Any]) -> list[dict[str, Any]]:
+        table = self._get_table(table_name)
+        return [dict(table.rows[pk]) for pk in table.find(query)]
+
+    async def get_all_documents(self, table_name: str) -> list[dict[str, Any]]:
+        return await self.get_documents(table_name=table_name, query={})
+
+    async def get_documents_by_keys(self, table_name: str, key: str, values: Iterable[Any]) -> list[dict[str, Any]]:
+        documents = []
+        for value in dict.fromkeys(values):
+            documents.extend(await self.get_documents(table_name=table_name, query={key: value}))
+        return documents
+
+    async def iter_documents(
+        self, table_name: str, batch_size: int = 1000, key: str | None = None, after: Any = None
+    ) -> AsyncIterator[list[dict[str, Any]]]:
+        table = self._get_table(table_name)
+        key = key or table.primary_key
+        documents = sorted(
+            (dict(row) for row in table.rows.values() if after is None or row[key] > after), key=lambda row: row[key]
+        )
+        for index in range(0, len(documents), batch_size):
+            yield documents[index : index + batch_size]
+
+    async def write_blob(
+        self, table_name: str, query: dict[str, Any], column: str, source: Any, chunk_size: int = 1 << 20
+    ) -> int:
+        chunks = list(SQLDatabase._iter_source_chunks(source, chunk_size))
+        value = "".join(chunks) if chunks and isinstance(chunks[0], str) else b"".join(chunks)  # type: ignore
+        async with self.transaction():
+            await self.update_document(table_name=table_name, query=query, changes={column: value})
+        return len(value)
+
+    async def read_blob(
+        self, table_name: str, query: dict[str, Any], column: str, destination: Any = None, chunk_size: int = 1 << 20
+    ) -> Any:
+        document = await self.get_document(table_name=table_name, query=query)
+        value = document[column] if document is not None else None
+        if destination is None:
+            return value or None
+        for index in range(0, len(value or ()), chunk_size):
+            destination.write(value[index : index + chunk_size])
+        return len(value or ())
+
+    async def count_documents(self, table_name: str, query: dict[str, Any] | None = None) -> int:
+        return len(self._get_table(table_name).find(query))
+
+    async def exists(self, table_name: str, query: dict[str, Any] | None = None) -> bool:
+        return bool(self._get_table(table_name).find(query))
+
+    async def aggregate(
+        self,
+        table_name: str,
+        query: dict[str, Any] | None = None,
+        group_by: Iterable[str] = (),
+        metrics: dict[str, tuple[str, str]] | None = None,
+    ) -> list[dict[str, Any]]:
+        table = self._get_table(table_name)
+        group_by = tuple(group_by)
+        metrics = metrics or {"count": ("count", "*")}
+        table.check_columns(group_by)
+        for function, column in metrics.values():
+            if function.upper() not in AGGREGATE_FUNCTIONS:
+                raise ValueError(f"Unknown aggregate function {function.upper()}.")
+            if column == "*" and function.upper() != "COUNT":
+                raise ValueError(f"{function.upper()} needs a column.")
+            if column != "*":
+                table.check_columns((column,))
+        groups: dict[tuple, list[dict[str, Any]]] = {}
+        for pk in table.find(query):
+            row = table.rows[pk]
+            groups.setdefault(tuple(row[column] for column in group_by), []).append(row)
+        if not groups and not group_by:
+            groups[()] = []
+        documents = []
+        for group, rows in groups.items():
+            document = dict(zip(group_by, group))
+            for name, (function, column) in metrics.items():
+                function = function.upper()
+                if column == "*":
+                    document[name] = len(rows)
+                    continue
+                values = [row[column] for row in rows if row[column] is not None]
+                if function == "COUNT":
+                    document[name] = len(values)
+                elif not values:
+                    document[name] = None
+                elif function == "SUM":
+                    document[name] = sum(values)
+                elif function == "AVG":
+                    document[name] = sum(values) / len(values)
+                elif function == "MIN":
+                    document[name] = min(values)
+                else:
+                    document[name] = max(values)
+            documents.append(document)
+        return documents
+
+    async def explain(
+        self,
+        operation: str,
+        table_name: str,
+        query: dict[str, Any] | None = None,
+        changes: dict[str, Any] | None = None,
+    ) -> dict[str, Any]:
+        """
+        Returns the plan of the operation in the shape of ``EXPLAIN FORMAT=JSON``, with the primary key or the index
+        used to find the rows, so ``get_full_scans`` works on it. See ``SQLDatabase.explain`` for the operations.
+        """
+        table = self._get_table(table_name)
+        if operation == "update_document" and not changes:
+            raise ValueError("Explaining an update needs its changes.")
+        if operation not in (
+            "get_document",
+            "get_documents",
+            "get_all_documents",
+            "count_documents",
+            "exists",
+            "update_document",
+            "delete_document",
+        ):
+            raise ValueError(f"Can not explain the operation {operation}.")
+        access_type, key, candidates = table.plan(query)
+        plan = {"table_name": table_name, "access_type": access_type, "rows": len(candidates)}  # type: ignore
+        if key is not None:
+            plan["key"] = key
+        return {"query_block": {"select_id": 1, "table": plan}}
+
+    async def enable_change_feed(self, table_name: str) -> bool:
+        """
+        Creates the outbox table of the table, to which its inserts, updates and deletes are appended, so that they
+        can be followed with ``watch``.
+        """
+        table = self._get_table(table_name)
+        outbox = get_outbox_name(table_name)
+        if not await self.create_table(table_name=outbox, signature=get_outbox_signature()):
+            return False
+        self._feeds[table] = self._get_table(outbox)
+        return True
+
+    async def disable_change_feed(self, table_name: str, drop_outbox: bool = False) -> bool:
+        self._feeds.pop(self._get_table(table_name), None)
+        if drop_outbox:
+            return await self.delete_table(table_name=get_outbox_name(table_name))
+        return True
+
+    async def prune_changes(self, table_name: str, token: int) -> bool:
+        outbox = self._get_table(get_outbox_name(table_name))
+
+        def prune():
+            for pk in [pk for pk in outbox.rows if pk <= token]:  # type: ignore
+                outbox.delete(pk, self._undo_log)
+
+        return self._write(prune, f"Pruned the changes of table {table_name}.")
+
+    async def watch(
+        self,
+        table_name: str,
+        after: int | None = None,
+        poll_interval: float = 1.0,
+        batch_size: int = 1000,
+        gap_timeout: float = 10.0,
+        late_timeout: float = 600.0,
+        follow: bool = True,
+    ) -> AsyncIterator[ChangeEvent]:
+        """
+        Yields the inserts, updates and deletes made to the table, recorded since ``enable_change_feed`` was called,
+        with the same options as ``SQLDatabase.watch``. Changes are recorded in order, so ``gap_timeout`` and
+        ``late_timeout`` are unused.
+        """
+        outbox = self._get_table(get_outbox_name(table_name))
+        if after is None:
+            after = outbox.next_id - 1
+        while True:
+            tokens = sorted(token for token in outbox.rows if token > after)[:batch_size]  # type: ignore
+            for token in tokens:
+                row = outbox.rows[token]
+                after = token
+                yield ChangeEvent(
+                    token=token,
+                    table_name=table_name,
+                    operation=row["operation"],
+                    key=dict(row["row_key"]),
+                    document=dict(row["document"]) if row["document"] is not None else None,
+                    changed_at=row["changed_at"],
+                )
+            if len(tokens) == batch_size:
+                continue
+            if not follow:
+                return
+            await asyncio.sleep(poll_interval)
+
+    async def backup_database(
+        self,
+        path: str,
+        structure_only: bool = False,
+        data_only: bool = False,
+        incremental_since: str | None = None,
+        version_column: str = "updated_at",
+        data_format: str = "sql",
+    ) -> bool:
+        """
+        Writes a pickled snapshot of the tables to ``path``. In-memory backups are always full, so
+        ``incremental_since`` and the ``tsv`` data format are refused. Only restore the backups you wrote.
+        """
+        if incremental_since is not None or data_format != "sql":
+            raise ValueError("In-memory backups are full snapshots, without incrementals or data formats.")
+        tables = {}
+        for name, table in self._data.items():
+            tables[name] = copy.copy(table)
+            if structure_only:
+                tables[name].rows, tables[name].next_id = {}, 1
+                tables[name].indexes = {column: {} for column in table.indexes}
+        with open(path, "wb") as file:
+            pickle.dump({"data_only": data_only, "tables": tables}, file)
+        self._log(f"Backed up database {self.name} to {path}.")
+        return True
+
+    async def restore_backup(self, path: str, incrementals: Iterable[str] = ()) -> bool:
+        """
+        Restores a snapshot written by ``backup_database``, replacing the tables it holds or, when it was taken with
+        ``data_only``, the rows that have the primary keys of its rows.
+        """
+        if list(incrementals):
+            raise ValueError("In-memory backups are full snapshots, without incrementals.")
+        with open(path, "rb") as file:
+            backup = pickle.load(file)
+
+        async def restore(name: str, table: InMemoryTable) -> None:
+            if not backup["data_only"]:
+                self._forget_table(name)
+                self._save_tables()
+                self._feeds.pop(self._data.get(name), None)  # type: ignore
+                self._data[name] = table
+                return
+            target = self._get_table(name)
+            for pk, row in table.rows.items():
+                if pk in target.rows:
+                    self._delete(target, pk)
+                self._insert(target, row)
+
+        return await self._write_all(
+            [lambda name=name, table=table: restore(name, table) for name, table in backup["tables"].items()],
+            f"Restored database {self.name} from {path}.",
+        )
+
+    async def delete_database(self) -> bool:
+        self._save_tables()
+        self._data = {}
+        self._feeds = {}
+        self._forget_table(*self._tables or ())
+        return True
+
+
+class InMemoryClient(Client):
+    """
+    A client whose databases are ``InMemoryDatabase`` instances, kept until they are deleted.
+    """
+
+    def __init__(self, logger_file: str | None = None, automatically_create_database: bool = False):
+        super().__init__(logger_file=logger_file, automatically_create_database=automatically_create_database)
+        self.connection = None
+        self._databases: dict[str, InMemoryDatabase] = {}
+
+    def __getitem__(self, item: str) -> Database:
+        if item not in self._databases:
+            if not self.automatically_create_database:
+                raise KeyError(f"Database {item} does not exist.")
+            self._databases[item] = InMemoryDatabase(name=item, logger_file=self.logger_file)
+        return self._databases[item]
+
+    async def create_database(self, name: str, exist_ok: bool = True) -> bool:
+        if name in self._databases:
+            if exist_ok:
+                return False
+            raise ValueError(f"Database {name} already exists.")
+        self._databases[name] = InMemoryDatabase(name=name, logger_file=self.logger_file)
+        return True
+
+    async def get_databases_names(self, pattern: str | None = None) -> set:
+        return self._filter_databases_names(self._databases, pattern)
+
+    async def get_database(self, name: str) -> Database | None:
+        if name not in self._databases and self.automatically_create_database:
+            await self.create_database(name)
+        return self._databases.get(name)
+
+    async def delete_database(self, name: str) -> bool:
+        database = self._databases.pop(name, None)
+        if database is None:
+            return False
+        return await database.delete_database()
+
+    async def close(self):
+        await self._close_fan_out_databases()
+        return True
@@ -0,0 +1,80 @@
+import asyncio
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Literal
+
+
+@dataclass
+class PipelinedStatement:
+    query: str
+    values: tuple | None = None
+    fetch: Literal["none", "one", "all"] = "none"
+    future: asyncio.Future = field(default_factory=lambda: asyncio.get_running_loop().create_future())
+
+
+class Pipeline:
+    """
+    Queues independent statements and sends them together when the pipeline is flushed.
+
+    Every queued statement returns a future that is resolved, in submission order, with the statement result
+    once the batch is sent. Leaving the ``async with`` block flushes the pipeline, unless it is left because of an
+    exception, in which case the pending statements are discarded.
+    """
+
+    def __init__(self, runner: Callable[[list[PipelinedStatement]], Awaitable[list[Any]]]):
+        self._runner = runner
+        self._statements: list[PipelinedStatement] = []
+
+    def __len__(self) -> int:
+        return len(self._statements)
+
+    async def __aenter__(self) -> "Pipeline":
+        return self
+
+    async def __aexit__(self, exc_type, exc, traceback) -> None:
+        if exc_type is None:
+            await self.flush()
+            return
+        for statement in self._statements:
+            statement.future.cancel()
+        self._statements = []
+
+    def _queue(self, query: str, values: tuple | None, fetch: Literal["none", "one", "all"]) -> asyncio.Future:
+        statement = PipelinedStatement(query=query, values=values, fetch=fetch)
+        self._statements.append(statement)
+        return statement.future
+
+    def execute(self, query: str, values: tuple | None = None) -> asyncio.Future:
+        return self._queue(query, values, "none")
+
+    def fetchone(self, query: str, values: tuple | None = None) -> asyncio.Future:
+        return self._queue(query, values, "one")
+
+    def fetchall(self, query: str, values: tuple | None = None) -> asyncio.Future:
+        return self._queue(query, values, "all")
+
+    async def flush(self) -> None:
+        """
+        Sends every queued statement and resolves their futures.
+
+        The runner returns one result per statement; a result that is an exception is set as the exception of
+        the related future, so a failing statement does not hide the results of the others.
+        """
+        statements, self._statements = self._statements, []
+        if not statements:
+            return
+        try:
+            results = await self._runner(statements)
+            if not isinstance(results, list):
+                raise NotImplementedError("Pipelines are not supported by this database.")
+        except BaseException as e:
+            for statement in statements:
+                if not statement.future.done():
+                    statement.future.set_exception(e)
+            raise
+        for statement, result in zip(statements, results):
+            if statement.future.done():
+                continue
+            if isinstance(result, BaseException):
+                statement.future.set_exception(result)
+            else:
+                statement.future.set_result(result)
@@ -0,0 +1,187 @@
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Awaitable, Callable
+
+from src.planetae_db.tracing import Tracer, trace
+
+
+@dataclass
+class PooledConnection:
+    connection: Any
+    created_at: float = field(default_factory=time.monotonic)
+    last_used: float = field(default_factory=time.monotonic)
+
+    def expired(self, idle_timeout: float | None, max_lifetime: float | None) -> bool:
+        now = time.monotonic()
+        if idle_timeout is not None and now - self.last_used > idle_timeout:
+            return True
+        return max_lifetime is not None and now - self.created_at > max_lifetime
+
+
+class ConnectionPool:
+    """
+    Keeps a bounded set of connections alive and hands them out to one coroutine at a time.
+
+    Idle connections are recycled after ``idle_timeout`` seconds without use and every connection is replaced
+    after ``max_lifetime`` seconds, so they are never reused after the server has dropped them (MariaDB's
+    ``wait_timeout``). A background task pings the idle connections every ``health_check_interval`` seconds and
+    replaces the expired or broken ones, keeping at least ``min_size`` warm connections, so reconnects are paid
+    outside of the request path.
+
+    :param connect: A coroutine function that opens a new connection
+    :param ping: A coroutine function that raises if the connection is no longer usable
+    :param disconnect: A coroutine function that closes a connection
+    :param is_broken: Tells whether an exception raised while using a connection means that it must be discarded
+    """
+
+    def __init__(
+        self,
+        connect: Callable[[], Awaitable[Any]],
+        ping: Callable[[Any], Awaitable[Any]],
+        disconnect: Callable[[Any], Awaitable[Any]],
+        is_broken: Callable[[BaseException], bool] = lambda e: False,
+        size: int = 5,
+        min_size: int = 1,
+        idle_timeout: float | None = 300,
+        max_lifetime: float | None = 3600,
+        pre_ping: bool = False,
+        health_check_interval: float = 30,
+    ):
+        self._connect = connect
+        self._ping = ping
+        self._disconnect = disconnect
+        self._is_broken = is_broken
+        self.size = size
+        self.min_size = min(min_size, size)
+        self.idle_timeout = idle_timeout
+        self.max_lifetime = max_lifetime
+        self.pre_ping = pre_ping
+        self.health_check_interval = health_check_interval
+        self._idle: deque[PooledConnection] = deque()
+        self._opened = 0
+        self._semaphore: asyncio.Semaphore | None = None
+        self._maintenance: asyncio.Task | None = None
+        self._background: set[asyncio.Task] = set()
+        self._closed = False
+        self.acquisitions = 0
+        self.wait_time = 0.0
+
+    @property
+    def idle(self) -> int:
+        return len(self._idle)
+
+    @property
+    def opened(self) -> int:
+        return self._opened
+
+    def _start(self) -> None:
+        self._closed = False
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.size)
+        if self._maintenance is None or self._maintenance.done():
+            self._maintenance = asyncio.create_task(self._maintain())
+
+    async def _open(self) -> PooledConnection:
+        self._opened += 1
+        try:
+            return PooledConnection(await self._connect())
+        except BaseException:
+            self._opened -= 1
+            raise
+
+    async def _discard(self, pooled: PooledConnection) -> None:
+        self._opened -= 1
+        try:
+            await self._disconnect(pooled.connection)
+        except Exception:
+            pass
+
+    def _spawn(self, coroutine: Awaitable[Any]) -> None:
+        task = asyncio.ensure_future(coroutine)
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    async def _replenish(self) -> None:
+        while not self._closed and self._opened < self.min_size:
+            try:
+                self._idle.append(await self._open())
+            except Exception:
+                return
+
+    async def _maintain(self) -> None:
+        while not self._closed:
+            await asyncio.sleep(self.health_check_interval)
+            for _ in range(len(self._idle)):
+                if not self._idle:
+                    break
+                pooled = self._idle.popleft()
+                if pooled.expired(self.idle_timeout, self.max_lifetime):
+                    await self._discard(pooled)
+                    continue
+                try:
+                    await self._ping(pooled.connection)
+                except Exception:
+                    await self._discard(pooled)
+                    continue
+                self._idle.append(pooled)
+            await self._replenish()
+
+    async def _checkout(self) -> PooledConnection:
+        while self._idle:
+            pooled = self._idle.popleft()
+            if pooled.expired(self.idle_timeout, self.max_lifetime):
+                self._spawn(self._discard(pooled))
+                continue
+            if self.pre_ping:
+                try:
+                    await self._ping(pooled.connection)
+                except Exception:
+                    self._spawn(self._discard(pooled))
+                    continue
+            return pooled
+        return await self._open()
+
+    def _checkin(self, pooled: PooledConnection, broken: bool = False) -> None:
+        if broken or self._closed:
+            self._spawn(self._discard(pooled))
+            self._spawn(self._replenish())
+            return
+        pooled.last_used = time.monotonic()
+        self._idle.append(pooled)
+
+    @asynccontextmanager
+    async def acquire(self, tracer: Tracer | None = None) -> AsyncIterator[Any]:
+        self._start()
+        assert self._semaphore is not None
+        started = time.monotonic()
+        with trace(tracer, "acquire"):
+            await self._semaphore.acquire()
+            try:
+                self.acquisitions += 1
+                self.wait_time += time.monotonic() - started
+                pooled = await self._checkout()
+            except BaseException:
+                self._semaphore.release()
+                raise
+        try:
+            yield pooled.connection
+        except BaseException as e:
+            self._checkin(pooled, broken=self._is_broken(e))
+            raise
+        else:
+            self._checkin(pooled)
+        finally:
+            self._semaphore.release()
+
+    async def close(self) -> None:
+        self._closed = True
+        if self._maintenance is not None:
+            self._maintenance.cancel()
+            self._maintenance = None
+        while self._idle:
+            await self._discard(self._idle.popleft())
+        if self._background:
+            await asyncio.gather(*self._background, return_exceptions=True)
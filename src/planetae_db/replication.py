@@ -0,0 +1,257 @@
+import asyncio
+import itertools
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Iterable
+
+from src.planetae_db.alter import AlterTable
+from src.planetae_db.buffer import WriteBuffer
+from src.planetae_db.changes import ChangeEvent
+from src.planetae_db.client import Client
+from src.planetae_db.database import Database
+from src.planetae_db.documents import DocumentTable
+from src.planetae_db.pipeline import Pipeline
+from src.planetae_db.table import Table
+
+
+def _on_primary(method: str, write: bool = True):
+    async def on_primary(self: "ReplicatedDatabase", *args: Any, **kwargs: Any) -> Any:
+        try:
+            return await getattr(self.primary, method)(*args, **kwargs)
+        finally:
+            if write:
+                self._last_write = time.monotonic()
+
+    on_primary.__name__ = method
+    return on_primary
+
+
+def _on_reader(method: str):
+    async def on_reader(self: "ReplicatedDatabase", *args: Any, **kwargs: Any) -> Any:
+        return await getattr(await self.get_reader(), method)(*args, **kwargs)
+
+    on_reader.__name__ = method
+    return on_reader
+
+
+def _iter_on_reader(method: str):
+    async def iter_on_reader(self: "ReplicatedDatabase", *args: Any, **kwargs: Any) -> AsyncIterator[Any]:
+        async for item in getattr(await self.get_reader(), method)(*args, **kwargs):
+            yield item
+
+    iter_on_reader.__name__ = method
+    return iter_on_reader
+
+
+class ReplicatedDatabase(Database):
+    """
+    A database whose reads are spread over its replicas and whose writes go to its primary.
+
+    ``get_document``, ``get_documents``, ``get_all_documents``, ``iter_documents`` and ``backup_database`` go to
+    the replicas in turns. A replica whose lag, checked at most every ``lag_check_interval`` seconds, is above
+    ``max_lag`` seconds or unknown is skipped, and the primary is used when every replica is skipped. Everything
+    else, including reads made inside ``transaction``, goes to the primary. When ``read_your_writes`` is set, reads
+    made up to that many seconds after a write also go to the primary. With a ``max_lag`` of ``None`` the lag is not
+    checked, which is how replicas that can not report it are read.
+    """
+
+    primary: Database
+    replicas: list[Database]
+
+    def __init__(
+        self,
+        name: str,
+        primary: Database,
+        replicas: Iterable[Database],
+        max_lag: float | None = 5,
+        lag_check_interval: float = 5,
+        read_your_writes: float = 0,
+        logger_file: str | None = None,
+    ):
+        super().__init__(name=name, logger_file=logger_file)
+        self.primary = primary
+        self.replicas = list(replicas)
+        self.max_lag = max_lag
+        self.lag_check_interval = lag_check_interval
+        self.read_your_writes = read_your_writes
+        self._turns = itertools.cycle(range(len(self.replicas)))
+        self._lags: dict[int, tuple[float, float]] = {}
+        self._last_write = float("-inf")
+        self._in_transaction = False
+
+    async def _get_lag(self, index: int) -> float:
+        checked_at, lag = self._lags.get(index, (float("-inf"), 0.0))
+        if time.monotonic() - checked_at >= self.lag_check_interval:
+            try:
+                lag = await self.replicas[index].get_replication_lag()
+            except Exception:
+                lag = None
+            if lag is None:
+                lag = float("inf")
+            self._lags[index] = (time.monotonic(), lag)
+        return lag
+
+    async def get_reader(self) -> Database:
+        if self._in_transaction or not self.replicas:
+            return self.primary
+        if time.monotonic() - self._last_write < self.read_your_writes:
+            return self.primary
+        for _ in range(len(self.replicas)):
+            index = next(self._turns)
+            if self.max_lag is None or await self._get_lag(index) <= self.max_lag:
+                return self.replicas[index]
+        if self._logger:
+            self._logger.info("Every replica is lagging, reading from the primary.")
+        return self.primary
+
+    @asynccontextmanager
+    async def transaction(self) -> AsyncIterator["ReplicatedDatabase"]:
+        """
+        Runs every statement of the context on the primary, in a single transaction.
+        """
+        if self._in_transaction:
+            yield self
+            return
+        self._in_transaction = True
+        try:
+            async with self.primary.transaction():  # type: ignore
+                yield self
+        finally:
+            self._in_transaction = False
+            self._last_write = time.monotonic()
+
+    def pipeline(self) -> Pipeline:
+        self._last_write = time.monotonic()
+        return self.primary.pipeline()
+
+    def write_buffer(self, max_rows: int = 500, max_delay: float = 0.005, max_pending: int = 10000) -> WriteBuffer:
+        """
+        Turns on the write buffer of the primary, where the inserts are sent.
+        """
+        return self.primary.write_buffer(max_rows=max_rows, max_delay=max_delay, max_pending=max_pending)
+
+    async def table(self, table_name: str) -> Table:
+        return await self.primary.table(table_name)
+
+    async def document_table(self, table_name: str) -> DocumentTable:
+        return await self.primary.document_table(table_name)
+
+    def alter_table(self, table_name: str) -> AlterTable:
+        self._last_write = time.monotonic()
+        return self.primary.alter_table(table_name)
+
+    def watch(self, table_name: str, **options: Any) -> AsyncIterator[ChangeEvent]:
+        return self.primary.watch(table_name, **options)
+
+    get_document = _on_reader("get_document")
+    get_documents = _on_reader("get_documents")
+    get_all_documents = _on_reader("get_all_documents")
+    get_documents_by_keys = _on_reader("get_documents_by_keys")
+    backup_database = _on_reader("backup_database")
+    count_documents = _on_reader("count_documents")
+    exists = _on_reader("exists")
+    aggregate = _on_reader("aggregate")
+    read_blob = _on_reader("read_blob")
+    iter_documents = _iter_on_reader("iter_documents")
+    iter_blob = _iter_on_reader("iter_blob")
+
+    get_all_tables = _on_primary("get_all_tables", write=False)
+    get_table_description = _on_primary("get_table_description", write=False)
+    get_table_indexes = _on_primary("get_table_indexes", write=False)
+    explain = _on_primary("explain", write=False)
+    create_table = _on_primary("create_table")
+    create_document_table = _on_primary("create_document_table")
+    add_column_to_table = _on_primary("add_column_to_table")
+    add_primary_key = _on_primary("add_primary_key")
+    remove_column_from_table = _on_primary("remove_column_from_table")
+    change_signature_from_column = _on_primary("change_signature_from_column")
+    rename_column = _on_primary("rename_column")
+    rename_table = _on_primary("rename_table")
+    rename_tables = _on_primary("rename_tables")
+    delete_table = _on_primary("delete_table")
+    truncate_table = _on_primary("truncate_table")
+    insert_document = _on_primary("insert_document")
+    insert_documents = _on_primary("insert_documents")
+    update_document = _on_primary("update_document")
+    update_documents = _on_primary("update_documents")
+    delete_document = _on_primary("delete_document")
+    delete_documents = _on_primary("delete_documents")
+    update_documents_chunked = _on_primary("update_documents_chunked")
+    delete_documents_chunked = _on_primary("delete_documents_chunked")
+    create_index = _on_primary("create_index")
+    enable_change_feed = _on_primary("enable_change_feed")
+    disable_change_feed = _on_primary("disable_change_feed")
+    prune_changes = _on_primary("prune_changes")
+    write_blob = _on_primary("write_blob")
+    restore_backup = _on_primary("restore_backup")
+    enable_incremental_backups = _on_primary("enable_incremental_backups")
+    disable_incremental_backups = _on_primary("disable_incremental_backups")
+    delete_database = _on_primary("delete_database")
+
+
+class ReplicatedClient(Client):
+    """
+    A client made of a primary client and its replicas, whose databases split the reads and writes between them.
+    See ``ReplicatedDatabase``.
+    """
+
+    primary: Client
+    replicas: list[Client]
+
+    def __init__(
+        self,
+        primary: Client,
+        replicas: Iterable[Client],
+        max_lag: float | None = 5,
+        lag_check_interval: float = 5,
+        read_your_writes: float = 0,
+        logger_file: str | None = None,
+    ):
+        super().__init__(
+            host=primary.host,
+            port=primary.port,
+            username=primary.username,
+            password=primary.password,
+            logger_file=logger_file,
+            discovery_concurrency=primary.discovery_concurrency,
+        )
+        self.primary = primary
+        self.replicas = list(replicas)
+        self.max_lag = max_lag
+        self.lag_check_interval = lag_check_interval
+        self.read_your_writes = read_your_writes
+
+    def __getitem__(self, item: str) -> Database:
+        return self._replicate(item, self.primary[item], [replica[item] for replica in self.replicas])
+
+    def _replicate(self, name: str, primary: Database, replicas: list[Database]) -> "ReplicatedDatabase":
+        return ReplicatedDatabase(
+            name=name,
+            primary=primary,
+            replicas=replicas,
+            max_lag=self.max_lag,
+            lag_check_interval=self.lag_check_interval,
+            read_your_writes=self.read_your_writes,
+            logger_file=self.logger_file,
+        )
+
+    async def create_database(self, name: str, exist_ok: bool = True) -> bool:
+        return await self.primary.create_database(name, exist_ok=exist_ok)
+
+    async def get_databases_names(self, pattern: str | None = None) -> set:
+        return await self.primary.get_databases_names(pattern=pattern)
+
+    async def get_database(self, name: str) -> Database | None:
+        primary, *replicas = await asyncio.gather(
+            self.primary.get_database(name), *(replica.get_database(name) for replica in self.replicas)
+        )
+        if primary is None:
+            return None
+        return self._replicate(name, primary, [replica for replica in replicas if replica is not None])
+
+    async def delete_database(self, name: str) -> bool:
+        return await self.primary.delete_database(name)
+
+    async def close(self):
+        await asyncio.gather(self.primary.close(), *(replica.close() for replica in self.replicas))
+        return True
@@ -0,0 +1,449 @@
+import asyncio
+import decimal
+import zlib
+from bisect import bisect_right
+from collections import deque
+from typing import TYPE_CHECKING, Any, AsyncIterator, Iterable
+
+from src.planetae_db.alter import AlterTable
+from src.planetae_db.buffer import WriteBuffer
+from src.planetae_db.changes import ChangeEvent
+from src.planetae_db.database import Database
+from src.planetae_db.documents import DocumentTable
+from src.planetae_db.pipeline import Pipeline
+from src.planetae_db.table import Table
+
+if TYPE_CHECKING:
+    from src.planetae_db.client import Client
+
+
+class ShardedDatabase(Database):
+    """
+    A database partitioned over many clients by the value of a shard key.
+
+    Every client holds a database called ``name`` with the same tables. Documents are routed to a shard by
+    hashing the value of ``shard_key``, or, when ``ranges`` is given, by the range the value falls in: with the
+    upper bounds ``[100, 200]`` values below 100 go to the first client, values from 100 to 199 to the second
+    one and the others to the third one. Hash sharding accepts integer and string keys.
+
+    Operations whose query has the shard key run on a single shard. The others are sent to every shard and
+    their results are gathered. Schema changes are applied to every shard. Table handles, pipelines, write buffers
+    and change feeds are bound to a single connection, so they are only available on the databases of ``get_shards``.
+    """
+
+    clients: list["Client"]
+    shard_key: str
+    ranges: list[Any] | None = None
+    _shards: list[Database] | None = None
+
+    def __init__(
+        self,
+        name: str,
+        clients: Iterable["Client"],
+        shard_key: str,
+        ranges: Iterable[Any] | None = None,
+        logger_file: str | None = None,
+    ):
+        super().__init__(name=name, logger_file=logger_file)
+        self.clients = list(clients)
+        self.shard_key = shard_key
+        if not self.clients:
+            raise ValueError("A sharded database needs at least one client.")
+        if ranges is not None:
+            self.ranges = sorted(ranges)
+            if len(self.ranges) != len(self.clients) - 1:
+                raise ValueError("The ranges must have one upper bound less than the number of clients.")
+        self._shards = None
+        self._lock = asyncio.Lock()
+
+    def shard_index(self, value: Any) -> int:
+        if self.ranges is not None:
+            return bisect_right(self.ranges, value)
+        return zlib.crc32(self._canonical_key(value).encode()) % len(self.clients)
+
+    @staticmethod
+    def _canonical_key(value: Any) -> str:
+        """
+        Returns the text hashed for a shard key, the same for keys the database finds equal: whole numbers are
+        hashed by their integer value whatever their type, so ``1``, ``1.0``, ``Decimal("1")`` and ``"1"`` go to the
+        same shard.
+        """
+        if isinstance(value, str):
+            return value
+        if isinstance(value, (int, float, decimal.Decimal)) and not isinstance(value, bool):
+            if value != value or value in (float("inf"), float("-inf")) or value != int(value):
+                raise ValueError(f"Can not shard on the fractional key {value!r}.")
+            return str(int(value))
+        raise ValueError(f"Can not shard on a key of type {type(value).__name__}, use an integer or a string.")
+
+    async def get_shards(self) -> list[Database]:
+        async with self._lock:
+            if self._shards is None:
+                self._shards = list(await asyncio.gather(*(client.get_database(self.name) for client in self.clients)))
+        return self._shards
+
+    async def close(self) -> bool:
+        async with self._lock:
+            shards, self._shards = self._shards, None
+        if shards is not None:
+            await asyncio.gather(*(shard.close() for shard in shards))
+        return True
+
+    async def _shard_for(self, document: dict[str, Any]) -> Database | None:
+        if self.shard_key not in document:
+            return None
+        return (await self.get_shards())[self.shard_index(document[self.shard_key])]
+
+    async def _broadcast(self, method: str, *args: Any, **kwargs: Any) -> list[Any]:
+        shards = await self.get_shards()
+        return list(await asyncio.gather(*(getattr(shard, method)(*args, **kwargs) for shard in shards)))
+
+    def _group_by_shard(self, documents: Iterable[Any], key: Any = lambda item: item) -> dict[int, list[Any]]:
+        groups: dict[int, list[Any]] = {}
+        broadcast = []
+        for document in documents:
+            query = key(document)
+            if self.shard_key in query:
+                groups.setdefault(self.shard_index(query[self.shard_key]), []).append(document)
+            else:
+                broadcast.append(document)
+        if broadcast:
+            for index in range(len(self.clients)):
+                groups.setdefault(index, []).extend(broadcast)
+        return groups
+
+    async def get_all_tables(self) -> tuple[str]:
+        return await (await self.get_shards())[0].get_all_tables()
+
+    async def create_table(self, table_name: str, signature: dict, **kwargs: Any) -> bool:
+        return all(await self._broadcast("create_table", table_name=table_name, signature=signature, **kwargs))
+
+    async def get_table_description(self, table_name: str) -> dict[str, str]:
+        return await (await self.get_shards())[0].get_table_description(table_name=table_name)
+
+    async def get_table_indexes(self, table_name: str) -> dict[str, tuple[str, ...]]:
+        return await (await self.get_shards())[0].get_table_indexes(table_name=table_name)
+
+    @staticmethod
+    def _single_connection_only(feature: str) -> NotImplementedError:
+        return NotImplementedError(
+            f"{feature} runs its statements on a single connection and can not span shards, "
+            "use it on the databases returned by get_shards."
+        )
+
+    async def table(self, table_name: str) -> Table:
+        raise self._single_connection_only("A table handle")
+
+    def alter_table(self, table_name: str) -> AlterTable:
+        raise self._single_connection_only("alter_table")
+
+    async def create_document_table(self, table_name: str, indexes: dict[str, str] | None = None) -> DocumentTable:
+        raise self._single_connection_only("A document table")
+
+    async def document_table(self, table_name: str) -> DocumentTable:
+        raise self._single_connection_only("A document table")
+
+    def pipeline(self) -> Pipeline:
+        raise self._single_connection_only("A pipeline")
+
+    def write_buffer(self, max_rows: int = 500, max_delay: float = 0.005, max_pending: int = 10000) -> WriteBuffer:
+        raise self._single_connection_only("A write buffer")
+
+    def watch(self, table_name: str, **options: Any) -> AsyncIterator[ChangeEvent]:
+        raise NotImplementedError("Change tokens are specific to each shard, watch the databases of get_shards.")
+
+    async def prune_changes(self, table_name: str, token: int) -> bool:
+        raise NotImplementedError("Change tokens are specific to each shard, prune the databases of get_shards.")
+
+    async def add_column_to_table(self, table_name: str, signature: dict, **kwargs: Any) -> bool:
+        return all(await self._broadcast("add_column_to_table", table_name=table_name, signature=signature, **kwargs))
+
+    async def add_primary_key(self, table_name: str, key: str) -> bool:
+        return all(await self._broadcast("add_primary_key", table_name=table_name, key=key))
+
+    async def remove_column_from_table(self, table_name: str, key: str) -> bool:
+        return all(await self._broadcast("remove_column_from_table", table_name=table_name, key=key))
+
+    async def change_signature_from_column(self, table_name: str, signature: dict) -> bool:
+        return all(await self._broadcast("change_signature_from_column", table_name=table_name, signature=signature))
+
+    async def rename_column(self, table_name: str, old_name: str, signature: dict) -> bool:
+        return all(
+            await self._broadcast("rename_column", table_name=table_name, old_name=old_name, signature=signature)
+        )
+
+    async def rename_tables(self, renames: dict[str, str]) -> bool:
+        return all(await self._broadcast("rename_tables", renames=renames))
+
+    async def rename_table(self, old_table_name: str, new_table_name: str) -> bool:
+        return all(
+            await self._broadcast("rename_table", old_table_name=old_table_name, new_table_name=new_table_name)
+        )
+
+    async def delete_table(self, table_name: str) -> bool:
+        return all(await self._broadcast("delete_table", table_name=table_name))
+
+    async def truncate_table(self, table_name: str) -> bool:
+        return all(await self._broadcast("truncate_table", table_name=table_name))
+
+    async def create_index(self, table_name: str, key: str) -> bool:
+        return all(await self._broadcast("create_index", table_name=table_name, key=key))
+
+    async def enable_change_feed(self, table_name: str) -> bool:
+        return all(await self._broadcast("enable_change_feed", table_name=table_name))
+
+    async def disable_change_feed(self, table_name: str, drop_outbox: bool = False) -> bool:
+        return all(await self._broadcast("disable_change_feed", table_name=table_name, drop_outbox=drop_outbox))
+
+    async def insert_document(
+        self, table_name: str, document: dict[str, Any], return_query: bool = False
+    ) -> bool | tuple[str, tuple]:
+        shard = await self._shard_for(document)
+        if shard is None:
+            raise ValueError(f"The document has no value for the shard key {self.shard_key}.")
+        return await shard.insert_document(table_name=table_name, document=document, return_query=return_query)
+
+    async def insert_documents(
+        self, table_name: str, documents: Iterable[dict[str, Any]], chunk_size: int = 1000
+    ) -> bool:
+        documents = list(documents)
+        if any(self.shard_key not in document for document in documents):
+            raise ValueError(f"Every document must have a value for the shard key {self.shard_key}.")
+        shards = await self.get_shards()
+        groups = self._group_by_shard(documents)
+        results = await asyncio.gather(
+            *(
+                shards[index].insert_documents(table_name=table_name, documents=group, chunk_size=chunk_size)
+                for index, group in groups.items()
+            )
+        )
+        return all(results)
+
+    def _check_changes(self, changes: dict[str, Any]) -> None:
+        if self.shard_key in changes:
+            raise ValueError(f"The shard key {self.shard_key} can not be changed, delete and insert the document.")
+
+    async def update_document(self, table_name: str, query: dict[str, Any], changes: dict[str, Any], **kwargs) -> bool:
+        self._check_changes(changes)
+        shard = await self._shard_for(query)
+        if shard is not None:
+            return await shard.update_document(table_name=table_name, query=query, changes=changes, **kwargs)
+        return all(
+            await self._broadcast("update_document", table_name=table_name, query=query, changes=changes, **kwargs)
+        )
+
+    async def update_documents(
+        self, table_name: str, updates: Iterable[tuple[dict[str, Any], dict[str, Any]]], chunk_size: int = 1000
+    ) -> bool:
+        updates = list(updates)
+        for _, changes in updates:
+            self._check_changes(changes)
+        shards = await self.get_shards()
+        groups = self._group_by_shard(updates, key=lambda update: update[0])
+        results = await asyncio.gather(
+            *(
+                shards[index].update_documents(table_name=table_name, updates=group, chunk_size=chunk_size)
+                for index, group in groups.items()
+            )
+        )
+        return all(results)
+
+    async def delete_document(self, table_name: str, query: dict[str, Any], **kwargs) -> bool:
+        shard = await self._shard_for(query)
+        if shard is not None:
+            return await shard.delete_document(table_name=table_name, query=query, **kwargs)
+        return all(await self._broadcast("delete_document", table_name=table_name, query=query, **kwargs))
+
+    async def delete_documents(
+        self, table_name: str, queries: Iterable[dict[str, Any]], chunk_size: int = 1000
+    ) -> bool:
+        shards = await self.get_shards()
+        groups = self._group_by_shard(queries)
+        results = await asyncio.gather(
+            *(
+                shards[index].delete_documents(table_name=table_name, queries=group, chunk_size=chunk_size)
+                for index, group in groups.items()
+            )
+        )
+        return all(results)
+
+    async def delete_documents_chunked(
+        self, table_name: str, query: dict[str, Any], chunk_size: int = 1000, **options: Any
+    ) -> int:
+        shard = await self._shard_for(query)
+        if shard is not None:
+            return await shard.delete_documents_chunked(table_name, query, chunk_size=chunk_size, **options)
+        return sum(
+            await self._broadcast(
+                "delete_documents_chunked", table_name=table_name, query=query, chunk_size=chunk_size, **options
+            )
+        )
+
+    async def update_documents_chunked(
+        self, table_name: str, query: dict[str, Any], changes: dict[str, Any], chunk_size: int = 1000, **options: Any
+    ) -> int:
+        self._check_changes(changes)
+        shard = await self._shard_for(query)
+        if shard is not None:
+            return await shard.update_documents_chunked(table_name, query, changes, chunk_size=chunk_size, **options)
+        return sum(
+            await self._broadcast(
+                "update_documents_chunked",
+                table_name=table_name,
+                query=query,
+                changes=changes,
+                chunk_size=chunk_size,
+                **options,
+            )
+        )
+
+    async def write_blob(
+        self, table_name: str, query: dict[str, Any], column: str, source: Any, chunk_size: int = 1 << 20
+    ) -> int:
+        shard = await self._shard_for(query)
+        if shard is None:
+            raise ValueError(f"Writing a blob needs the shard key {self.shard_key} in the query.")
+        return await shard.write_blob(table_name, query, column, source, chunk_size=chunk_size)
+
+    async def _blob_shard(self, table_name: str, query: dict[str, Any]) -> Database | None:
+        shard = await self._shard_for(query)
+        if shard is not None:
+            return shard
+        for shard, found in zip(await self.get_shards(), await self._broadcast("exists", table_name, query)):
+            if found:
+                return shard
+        return None
+
+    async def read_blob(
+        self, table_name: str, query: dict[str, Any], column: str, destination: Any = None, chunk_size: int = 1 << 20
+    ) -> Any:
+        shard = await self._blob_shard(table_name, query)
+        if shard is None:
+            return None
+        return await shard.read_blob(table_name, query, column, destination=destination, chunk_size=chunk_size)
+
+    async def iter_blob(
+        self, table_name: str, query: dict[str, Any], column: str, chunk_size: int = 1 << 20
+    ) -> AsyncIterator[bytes | str]:
+        shard = await self._blob_shard(table_name, query)
+        if shard is not None:
+            async for chunk in shard.iter_blob(table_name, query, column, chunk_size=chunk_size):
+                yield chunk
+
+    async def get_document(self, table_name: str, query: dict[str, Any]) -> dict[str, Any] | None:
+        shard = await self._shard_for(query)
+        if shard is not None:
+            return await shard.get_document(table_name=table_name, query=query)
+        for document in await self._broadcast("get_document", table_name=table_name, query=query):
+            if document is not None:
+                return document
+        return None
+
+    async def get_documents(self, table_name: str, query: dict[str, Any]) -> list[dict[str, Any]]:
+        shard = await self._shard_for(query)
+        if shard is not None:
+            return await shard.get_documents(table_name=table_name, query=query)
+        results = await self._broadcast("get_documents", table_name=table_name, query=query)
+        return [document for documents in results for document in documents]
+
+    async def get_documents_by_keys(self, table_name: str, key: str, values: Iterable[Any]) -> list[dict[str, Any]]:
+        values = list(values)
+        if key != self.shard_key:
+            results = await self._broadcast("get_documents_by_keys", table_name=table_name, key=key, values=values)
+        else:
+            shards = await self.get_shards()
+            groups: dict[int, list[Any]] = {}
+            for value in values:
+                groups.setdefault(self.shard_index(value), []).append(value)
+            results = await asyncio.gather(
+                *(
+                    shards[index].get_documents_by_keys(table_name=table_name, key=key, values=group)
+                    for index, group in groups.items()
+                )
+            )
+        return [document for documents in results for document in documents]
+
+    async def get_all_documents(self, table_name: str) -> list[dict[str, Any]]:
+        results = await self._broadcast("get_all_documents", table_name=table_name)
+        return [document for documents in results for document in documents]
+
+    async def iter_documents(
+        self, table_name: str, batch_size: int = 1000, key: str | None = None, after: Any = None
+    ) -> AsyncIterator[list[dict[str, Any]]]:
+        """
+        Merges the keyset iterations of every shard, so the batches are ordered by ``key`` across the shards and
+        the iteration can be resumed with the ``key`` of the last document as ``after``, as on a single database.
+        """
+        if key is None:
+            primary_key = (await self.get_table_indexes(table_name=table_name)).get("PRIMARY", ())
+            if len(primary_key) != 1:
+                raise ValueError(f"Table {table_name} needs a single column primary key.")
+            key = primary_key[0]
+        iterators = [
+            shard.iter_documents(table_name, batch_size=batch_size, key=key, after=after)
+            for shard in await self.get_shards()
+        ]
+        heads = [deque(await anext(iterator, [])) for iterator in iterators]
+        batch: list[dict[str, Any]] = []
+        while any(heads):
+            index = min((index for index, head in enumerate(heads) if head), key=lambda index: heads[index][0][key])
+            batch.append(heads[index].popleft())
+            if not heads[index]:
+                heads[index] = deque(await anext(iterators[index], []))
+            if len(batch) == batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    async def count_documents(self, table_name: str, query: dict[str, Any] | None = None) -> int:
+        shard = await self._shard_for(query or {})
+        if shard is not None:
+            return await shard.count_documents(table_name=table_name, query=query)
+        return sum(await self._broadcast("count_documents", table_name=table_name, query=query))
+
+    async def exists(self, table_name: str, query: dict[str, Any] | None = None) -> bool:
+        shard = await self._shard_for(query or {})
+        if shard is not None:
+            return await shard.exists(table_name=table_name, query=query)
+        return any(await self._broadcast("exists", table_name=table_name, query=query))
+
+    async def aggregate(
+        self,
+        table_name: str,
+        query: dict[str, Any] | None = None,
+        group_by: Iterable[str] = (),
+        metrics: dict[str, tuple[str, str]] | None = None,
+    ) -> list[dict[str, Any]]:
+        """
+        Aggregates on the shard of the query, or on every shard when the query has no shard key, merging the
+        groups of the shards. Averages can only be merged when the query has the shard key.
+        """
+        group_by = tuple(group_by)
+        metrics = metrics or {"count": ("count", "*")}
+        shard = await self._shard_for(query or {})
+        if shard is not None:
+            return await shard.aggregate(table_name=table_name, query=query, group_by=group_by, metrics=metrics)
+        if any(function.lower() == "avg" for function, _ in metrics.values()):
+            raise ValueError("Averages can not be merged across shards, aggregate the sum and the count instead.")
+        results = await self._broadcast(
+            "aggregate", table_name=table_name, query=query, group_by=group_by, metrics=metrics
+        )
+        merged: dict[tuple, dict[str, Any]] = {}
+        for documents in results:
+            for document in documents:
+                group = tuple(document[column] for column in group_by)
+                if group not in merged:
+                    merged[group] = dict(document)
+                    continue
+                for name, (function, _) in metrics.items():
+                    value, current = document[name], merged[group][name]
+                    if value is None or current is None:
+                        merged[group][name] = current if value is None else value
+                    elif function.lower() in ("count", "sum"):
+                        merged[group][name] = current + value
+                    elif function.lower() == "min":
+                        merged[group][name] = min(current, value)
+                    else:
+                        merged[group][name] = max(current, value)
+        return list(merged.values())
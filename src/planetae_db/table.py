@@ -1,2 +1,143 @@
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from src.planetae_db.database import SQLDatabase
+
+
 class Table:
-    pass
+    """
+    A handle to a table of a SQL database, bound to the table's schema.
+
+    The column list, primary key and indexes are fetched once, when the handle is loaded, and the statements are
+    compiled once per shape of document, so the CRUD methods do not describe the table on every call. Use
+    ``refresh`` if the schema is changed by something other than the database handle that created the table.
+    """
+
+    database: "SQLDatabase"
+    name: str
+    columns: tuple[str, ...]
+    primary_key: tuple[str, ...]
+    indexes: dict[str, tuple[str, ...]]
+
+    def __init__(
+        self,
+        database: "SQLDatabase",
+        name: str,
+        columns: tuple[str, ...],
+        primary_key: tuple[str, ...] = (),
+        indexes: dict[str, tuple[str, ...]] | None = None,
+    ):
+        self.database = database
+        self.name = name
+        self._bind(columns, primary_key, indexes or {})
+
+    def __repr__(self) -> str:
+        return f"Table(name={self.name!r}, columns={self.columns!r}, primary_key={self.primary_key!r})"
+
+    @classmethod
+    async def load(cls, database: "SQLDatabase", name: str) -> "Table":
+        table = cls(database=database, name=name, columns=())
+        await table.refresh()
+        return table
+
+    async def refresh(self) -> None:
+        columns = tuple((await self.database.get_table_description(table_name=self.name)).keys())
+        indexes = await self.database.get_table_indexes(table_name=self.name)
+        self._bind(columns, indexes.get("PRIMARY", ()), indexes)
+
+    def _bind(self, columns: tuple[str, ...], primary_key: tuple[str, ...], indexes: dict[str, tuple[str, ...]]):
+        self.columns = columns
+        self.primary_key = primary_key
+        self.indexes = indexes
+        self._select = f"SELECT {', '.join(columns)} FROM {self.name}"
+        self._statements: dict[tuple, str] = {}
+        if columns:
+            self._statement("insert", tuple(column for column in columns if column not in primary_key))
+        if primary_key:
+            self._statement("select", primary_key)
+            self._statement("delete", primary_key)
+
+    def _statement(self, kind: str, keys: tuple[str, ...], changes: tuple[str, ...] = ()) -> str:
+        try:
+            return self._statements[(kind, keys, changes)]
+        except KeyError:
+            pass
+        where = " WHERE " + " AND ".join(f"{key} = %s" for key in keys) if keys else ""
+        if kind == "insert":
+            statement = f"INSERT INTO {self.name} ({', '.join(keys)}) VALUES ({', '.join([r'%s'] * len(keys))});"
+        elif kind == "select":
+            statement = f"{self._select}{where};"
+        elif kind == "update":
+            sets = ", ".join(f"{key} = %s" for key in changes)
+            statement = f"UPDATE {self.name} SET {sets}{where};"
+        elif kind == "delete":
+            statement = f"DELETE FROM {self.name}{where};"
+        else:
+            raise ValueError(f"Unknown statement kind {kind}.")
+        self._statements[(kind, keys, changes)] = statement
+        return statement
+
+    def _decode(self, line: tuple) -> dict[str, Any]:
+        return dict(zip(self.columns, line))
+
+    def _pk_query(self, key: Any) -> dict[str, Any]:
+        if not self.primary_key:
+            raise ValueError(f"Table {self.name} has no primary key.")
+        values = key if isinstance(key, tuple) else (key,)
+        return dict(zip(self.primary_key, values))
+
+    async def insert_document(self, document: dict[str, Any]) -> bool:
+        statement = self._statement("insert", tuple(document.keys()))
+        return await self.database._execute(
+            query=statement, string=f"Inserted document in table {self.name}.", values=tuple(document.values())
+        )
+
+    async def get(self, key: Any) -> dict[str, Any] | None:
+        """
+        Returns the document whose primary key is ``key``, a tuple for composite primary keys.
+        """
+        return await self.get_document(self._pk_query(key))
+
+    async def get_document(self, query: dict[str, Any]) -> dict[str, Any] | None:
+        statement = self._add_limit(self._statement("select", tuple(query.keys())), 1)
+        ex = await self.database._execute(
+            query=statement, string=f"Fetched one document from table {self.name}.", values=tuple(query.values())
+        )
+        if not ex:
+            return None
+        line = self.database.cursor.fetchone()
+        if line is None:
+            return None
+        return self._decode(line)
+
+    async def get_documents(self, query: dict[str, Any]) -> list[dict[str, Any]]:
+        statement = self._statement("select", tuple(query.keys()))
+        ex = await self.database._execute(
+            query=statement, string=f"Fetched documents from table {self.name}.", values=tuple(query.values())
+        )
+        if not ex:
+            return []
+        return [self._decode(line) for line in self.database.cursor.fetchall() or []]
+
+    async def get_all_documents(self) -> list[dict[str, Any]]:
+        return await self.get_documents({})
+
+    async def update_document(self, query: dict[str, Any], changes: dict[str, Any], limit: int | None = None) -> bool:
+        statement = self._add_limit(self._statement("update", tuple(query.keys()), tuple(changes.keys())), limit)
+        return await self.database._execute(
+            query=statement,
+            string=f"Updated table {self.name} with: {statement}.",
+            values=tuple(changes.values()) + tuple(query.values()),
+        )
+
+    async def delete_document(self, query: dict[str, Any], limit: int | None = None) -> bool:
+        statement = self._add_limit(self._statement("delete", tuple(query.keys())), limit)
+        return await self.database._execute(
+            query=statement, string=f"Deleted documents from table {self.name}.", values=tuple(query.values())
+        )
+
+    @staticmethod
+    def _add_limit(statement: str, limit: int | None) -> str:
+        if limit is None:
+            return statement
+        return statement[:-1] + f" LIMIT {limit};"
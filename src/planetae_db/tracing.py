@@ -0,0 +1,106 @@
+import functools
+import json
+import os
+import time
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, ContextManager, Iterator, TextIO
+
+_current_span: ContextVar["Span | None"] = ContextVar("planetae_db_span", default=None)
+_no_span = nullcontext()
+
+
+@dataclass
+class Span:
+    name: str
+    trace_id: str
+    span_id: str
+    parent_id: str | None = None
+    tags: dict[str, Any] = field(default_factory=dict)
+    start: float = field(default_factory=time.time)
+    duration: float | None = None
+    error: str | None = None
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+def current_span() -> Span | None:
+    return _current_span.get()
+
+
+class Tracer:
+    """
+    Records nested spans around database operations and exports each one when it ends.
+
+    The current span is kept in a context variable, so the spans opened by concurrent tasks do not mix, and a
+    span opened inside another one becomes its child and inherits its tags. Finished spans are appended, one JSON
+    object per line, to ``path`` and passed to ``callback``.
+    """
+
+    def __init__(self, path: str | None = None, callback: Callable[[Span], Any] | None = None):
+        self.path = path
+        self.callback = callback
+        self._file: TextIO | None = None
+
+    @contextmanager
+    def span(self, name: str, **tags: Any) -> Iterator[Span]:
+        parent = _current_span.get()
+        span = Span(
+            name=name,
+            trace_id=parent.trace_id if parent else os.urandom(8).hex(),
+            span_id=os.urandom(8).hex(),
+            parent_id=parent.span_id if parent else None,
+            tags={**parent.tags, **tags} if parent else tags,
+        )
+        token = _current_span.set(span)
+        started = time.perf_counter()
+        try:
+            yield span
+        except BaseException as e:
+            span.error = repr(e)
+            raise
+        finally:
+            span.duration = time.perf_counter() - started
+            _current_span.reset(token)
+            self.export(span)
+
+    def export(self, span: Span) -> None:
+        if self.callback is not None:
+            self.callback(span)
+        if self.path is not None:
+            if self._file is None:
+                self._file = open(self.path, "a", encoding="utf-8")
+            self._file.write(json.dumps(span.to_dict(), default=str) + "\n")
+            self._file.flush()
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def trace(tracer: Tracer | None, name: str, **tags: Any) -> ContextManager[Any]:
+    """
+    Opens a span on the tracer, or does nothing when tracing is off.
+    """
+    if tracer is None:
+        return _no_span
+    return tracer.span(name, **tags)
+
+
+def traced(method: Callable) -> Callable:
+    """
+    Wraps a coroutine method of a database in a span named after it, tagged with the operation and the table.
+    """
+
+    @functools.wraps(method)
+    async def wrapper(self, *args: Any, **kwargs: Any) -> Any:
+        if self.tracer is None:
+            return await method(self, *args, **kwargs)
+        table = kwargs.get("table_name", args[0] if args and isinstance(args[0], str) else None)
+        with self.tracer.span(method.__name__, operation=method.__name__, table=table):
+            return await method(self, *args, **kwargs)
+
+    return wrapper
@@ -0,0 +1,105 @@
+import asyncio
+from typing import Any, Callable
+
+from src.planetae_db.database import Database, SQLDatabase
+
+
+async def get_copy_signature(source: Database, table_name: str) -> dict[str, str]:
+    """
+    Builds the ``create_table`` signature of a copy of the table, from its description and primary key.
+    """
+    description = await source.get_table_description(table_name=table_name)
+    primary_key = (await source.get_table_indexes(table_name=table_name)).get("PRIMARY", ())
+    if len(primary_key) != 1:
+        raise ValueError(f"Table {table_name} needs a single column primary key to be copied.")
+    return {
+        column: f"{column_type} PRIMARY KEY" if column == primary_key[0] else column_type
+        for column, column_type in description.items()
+    }
+
+
+async def copy_table(
+    source: Database,
+    destination: Database,
+    table_name: str,
+    transform: Callable[[dict[str, Any]], dict[str, Any] | None] | None = None,
+    batch_size: int = 1000,
+    destination_table: str | None = None,
+    signature: dict[str, str] | None = None,
+    create: bool = True,
+    resume_after: Any = None,
+    max_pending_batches: int = 4,
+    progress: Callable[[int, Any], Any] | None = None,
+) -> int:
+    """
+    Copies a table from one database to another, possibly of other clients.
+
+    The source is read in primary key order, one keyset batch of ``batch_size`` documents at a time, while the
+    previous batches are written to the destination with ``insert_documents``, each in its own transaction. At
+    most ``max_pending_batches`` batches wait between the reader and the writer, so the memory used does not
+    depend on the size of the table.
+
+    The SQL databases send their statements with a blocking connector, so during the copy each of them runs its
+    statements in its own worker thread, and reading a batch overlaps writing the previous one. Reads and writes
+    do not overlap when the source and the destination are the same database, nor on databases that wrap others,
+    like ``ReplicatedDatabase``, whose statements block the event loop.
+
+    :param transform: Called with every document, returns the document to write or ``None`` to skip it
+    :param destination_table: The name of the table in the destination, ``table_name`` by default
+    :param signature: The signature of the destination table, built from the source table by default
+    :param create: Whether to create the destination table, if it does not exist
+    :param resume_after: Only the documents whose primary key is greater than this one are copied
+    :param progress: Called after each written batch with the number of copied documents and the primary key of \
+        the last one, which can be given as ``resume_after`` to resume an interrupted copy
+
+    :return: The number of copied documents
+    :rtype: int
+    """
+    destination_table = destination_table or table_name
+    source_signature = await get_copy_signature(source, table_name)
+    key = next(column for column, column_type in source_signature.items() if column_type.endswith("PRIMARY KEY"))
+    if create and not await destination.create_table(
+        table_name=destination_table, signature=signature or source_signature
+    ):
+        raise ValueError(f"Could not create table {destination_table}.")
+
+    batches: asyncio.Queue[tuple[list[dict[str, Any]], Any] | None] = asyncio.Queue(maxsize=max_pending_batches)
+    copied = 0
+
+    async def read() -> None:
+        async for documents in source.iter_documents(
+            table_name=table_name, batch_size=batch_size, key=key, after=resume_after
+        ):
+            last = documents[-1][key]
+            if transform is not None:
+                documents = [document for document in map(transform, documents) if document is not None]
+            await batches.put((documents, last))
+        await batches.put(None)
+
+    async def write() -> None:
+        nonlocal copied
+        while (batch := await batches.get()) is not None:
+            documents, last = batch
+            if documents and not await destination.insert_documents(
+                table_name=destination_table, documents=documents, chunk_size=batch_size
+            ):
+                raise ValueError(f"Could not write to table {destination_table}.")
+            copied += len(documents)
+            if progress is not None:
+                progress(copied, last)
+
+    threaded = [
+        database
+        for database in (source, destination)
+        if isinstance(database, SQLDatabase) and source is not destination and database._executor is None
+    ]
+    for database in threaded:
+        database.use_worker_thread()
+    try:
+        async with asyncio.TaskGroup() as group:
+            group.create_task(read())
+            group.create_task(write())
+    finally:
+        for database in threaded:
+            database.use_worker_thread(False)
+    return copied
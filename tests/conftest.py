@@ -0,0 +1 @@
+from tests.fixtures import database, sql_database  # noqa: F401
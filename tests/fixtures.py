@@ -0,0 +1,274 @@
+import asyncio
+import threading
+import time
+from contextlib import asynccontextmanager
+from typing import Any
+
+import pytest
+
+from src.planetae_db.tracing import trace, traced
+
+
+class FakeCursor:
+    """
+    A cursor that records the statements it runs instead of sending them to a server.
+
+    Statements containing a pattern given to ``respond`` return the next of its results, the last one being
+    returned again once the others are used, and statements containing a pattern given to ``fail`` raise.
+    """
+
+    def __init__(self):
+        self.executed: list[tuple[str, Any]] = []
+        self.rows: list[tuple] = []
+        self.description: list[tuple] | None = None
+        self.rowcount = 0
+        self.closed = False
+        self._responses: list[tuple[str, list[list[tuple]]]] = []
+        self._failures: list[str] = []
+
+    def respond(self, pattern: str, *results: list[tuple]) -> None:
+        self._responses.append((pattern, list(results)))
+
+    def fail(self, pattern: str) -> None:
+        self._failures.append(pattern)
+
+    def execute(self, query: str, values: Any = None) -> None:
+        self.executed.append((query, values))
+        if any(pattern in query for pattern in self._failures):
+            raise ValueError(f"Refused {query}")
+        for pattern, results in self._responses:
+            if pattern in query:
+                self.rows = list(results.pop(0) if len(results) > 1 else results[0])
+                break
+        self.rowcount = len(self.rows)
+
+    def executemany(self, query: str, values: list[tuple]) -> None:
+        self.execute(query, list(values))
+
+    def fetchone(self) -> tuple | None:
+        return self.rows[0] if self.rows else None
+
+    def fetchall(self) -> list[tuple]:
+        return self.rows
+
+    def close(self) -> None:
+        self.closed = True
+
+
+class SlowCursor(FakeCursor):
+    """
+    A ``FakeCursor`` whose statements take ``delay`` seconds. Their start and end are appended to ``events`` as
+    ``(name, "start" | "end", thread name)``, so cursors sharing the list show whether their statements overlap.
+    """
+
+    def __init__(self, delay: float, name: str = "cursor", events: list[tuple[str, str, str]] | None = None):
+        super().__init__()
+        self.delay = delay
+        self.name = name
+        self.events = events if events is not None else []
+
+    def execute(self, query: str, values: Any = None) -> None:
+        self.events.append((self.name, "start", threading.current_thread().name))
+        time.sleep(self.delay)
+        super().execute(query, values)
+        self.events.append((self.name, "end", threading.current_thread().name))
+
+
+class FakeConnection:
+    def __init__(self):
+        self._cursor = FakeCursor()
+        self.commits = 0
+        self.rollbacks = 0
+
+    def cursor(self, *args: Any, **kwargs: Any) -> FakeCursor:
+        return self._cursor
+
+    def commit(self) -> None:
+        self.commits += 1
+
+    def rollback(self) -> None:
+        self.rollbacks += 1
+
+    def close(self) -> None:
+        pass
+
+
+class FakeDatabase:
+    """
+    A database double for the handles and wrappers built on top of a database.
+
+    ``_execute`` records the statements on a ``FakeCursor`` instead of running them, and the document methods
+    read and write ``documents``, yielding to the event loop like a round trip to a server would.
+    """
+
+    _write_buffer = None
+
+    def __init__(self, name: str = "test", documents: Any = (), lag: float | None = None, tracer: Any = None):
+        self.name = name
+        self.cursor = FakeCursor()
+        self.documents: list[dict[str, Any]] = list(documents)
+        self.batches: list[list[dict[str, Any]]] = []
+        self.lookups: list[list[Any]] = []
+        self.lag = lag
+        self.tracer = tracer
+
+    @property
+    def executed(self) -> list[tuple[str, Any]]:
+        return self.cursor.executed
+
+    @property
+    def queries(self) -> list[str]:
+        return [query for query, _ in self.cursor.executed]
+
+    def _forget_table(self, *table_names: str) -> None:
+        pass
+
+    async def _execute(self, query: str, string: str, values: tuple | None = None) -> bool:
+        self.cursor.execute(query, values)
+        return True
+
+    async def get_replication_lag(self) -> float | None:
+        return self.lag
+
+    @asynccontextmanager
+    async def transaction(self):
+        yield self
+
+    async def insert_document(self, table_name: str, document: dict[str, Any], return_query: bool = False) -> bool:
+        if document.get("bad"):
+            raise ValueError("Bad document.")
+        self.documents.append(document)
+        return True
+
+    async def insert_documents(self, table_name: str, documents: Any, chunk_size: int = 1000) -> bool:
+        documents = list(documents)
+        if any(document.get("bad") for document in documents):
+            raise ValueError("Bad document.")
+        self.batches.append(documents)
+        self.documents.extend(documents)
+        return True
+
+    @traced
+    async def get_document(self, table_name: str, query: dict[str, Any]) -> dict[str, Any] | None:
+        with trace(self.tracer, "execute", statement="SELECT"):
+            await asyncio.sleep(0)
+        return next(
+            (document for document in self.documents if all(document.get(k) == v for k, v in query.items())), None
+        )
+
+    async def get_documents_by_keys(self, table_name: str, key: str, values: Any) -> list[dict[str, Any]]:
+        values = list(values)
+        self.lookups.append(values)
+        await asyncio.sleep(0)
+        return [document for document in self.documents if document.get(key) in values]
+
+
+class FakeServerCursor:
+    def __init__(self, connection: "FakeServerConnection"):
+        self.connection = connection
+        self.rows: list[tuple] = []
+
+    async def __aenter__(self) -> "FakeServerCursor":
+        return self
+
+    async def __aexit__(self, *args: Any) -> None:
+        pass
+
+    @staticmethod
+    def mogrify(query: str, values: Any = None) -> str:
+        return query % tuple(repr(value) for value in values) if values else query
+
+    async def execute(self, query: str, values: Any = None) -> None:
+        server = self.connection.server
+        server.executed.append((self.connection.number, query, values))
+        if query.startswith("KILL QUERY"):
+            server.killed.append(values[0])
+            return
+        await asyncio.sleep(server.delay if "SLEEP" in query else 0)
+        self.rows = list(server.rows)
+
+    async def nextset(self) -> None:
+        pass
+
+    async def fetchone(self) -> tuple | None:
+        return self.rows[0] if self.rows else None
+
+    async def fetchall(self) -> list[tuple]:
+        return self.rows
+
+
+class FakeServerConnection:
+    def __init__(self, server: "FakeServer", number: int, client_flag: int):
+        self.server = server
+        self.number = number
+        self.client_flag = client_flag
+        self.alive = True
+        self.closed = False
+
+    def thread_id(self) -> int:
+        return self.number
+
+    def cursor(self) -> FakeServerCursor:
+        return FakeServerCursor(self)
+
+    async def ping(self, reconnect: bool = False) -> None:
+        if self.closed or not self.alive:
+            raise ConnectionError
+
+    async def ensure_closed(self) -> None:
+        self.closed = True
+
+    def close(self) -> None:
+        self.closed = True
+
+
+class FakeServer:
+    """
+    Stands for a MariaDB server behind ``aiomysql.connect``. Statements containing ``SLEEP`` take ``delay``
+    seconds, and the others return ``rows``.
+    """
+
+    def __init__(self, rows: Any = ((1,),), delay: float = 0):
+        self.rows = list(rows)
+        self.delay = delay
+        self.connections: list[FakeServerConnection] = []
+        self.executed: list[tuple[int, str, Any]] = []
+        self.killed: list[int] = []
+
+    async def connect(self, client_flag: int = 0, **kwargs: Any) -> FakeServerConnection:
+        connection = FakeServerConnection(self, len(self.connections), client_flag)
+        self.connections.append(connection)
+        return connection
+
+
+def make_mariadb_client(monkeypatch: pytest.MonkeyPatch, server: FakeServer, **kwargs: Any):
+    """
+    Returns a ``MariaDBClient`` whose connections are opened on the fake ``server``.
+    """
+    from src.planetae_db import client
+
+    monkeypatch.setattr(client.aiomysql, "connect", server.connect)
+    monkeypatch.setattr(client.mysql.connector, "connect", lambda **_: FakeConnection())
+    return client.MariaDBClient(username="root", password="", host="localhost", port=3306, **kwargs)
+
+
+def make_sql_database(name: str = "test"):
+    """
+    Returns a ``SQLDatabase`` connected to a ``FakeConnection``, whose cursor is available as ``database.cursor``.
+    """
+    from src.planetae_db.database import SQLDatabase
+
+    database = SQLDatabase(name=name)
+    database.connection = FakeConnection()  # type: ignore
+    database.cursor = database.connection.cursor()  # type: ignore
+    return database
+
+
+@pytest.fixture()
+def database():
+    return FakeDatabase()
+
+
+@pytest.fixture()
+def sql_database():
+    return make_sql_database()
@@ -0,0 +1,202 @@
+"""
+Load test of planetae_db.
+
+Runs concurrent workers that issue a weighted mix of ``insert_document``, ``get_document``, ``update_document`` and
+``delete_document`` calls, printing the throughput and error rate of every interval, then the latency percentiles
+of each operation.
+
+The SQL databases send their statements through a single blocking connection, so on the mariadb backend every
+worker gets its own database handle, whose statements run in a worker thread: ``--concurrency`` is then also the
+number of connections opened to the server.
+
+    python -m tests.load --backend memory --concurrency 200 --duration 10
+    python -m tests.load --backend mariadb --host localhost --username root --password secret --concurrency 50
+"""
+
+import argparse
+import asyncio
+import random
+import string
+import time
+
+from src.planetae_db.memory import InMemoryClient
+
+OPERATIONS = ("insert", "get", "update", "delete")
+
+
+def parse_mix(mix: str) -> dict[str, int]:
+    weights = {}
+    for item in mix.split(","):
+        operation, _, weight = item.partition("=")
+        if operation not in OPERATIONS:
+            raise argparse.ArgumentTypeError(f"Unknown operation {operation}, use {', '.join(OPERATIONS)}.")
+        weights[operation] = int(weight or 1)
+    return weights
+
+
+def parse_args(args: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Concurrent load test of planetae_db.")
+    parser.add_argument("--backend", choices=("memory", "mariadb"), default="memory")
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=3306)
+    parser.add_argument("--username", default="root")
+    parser.add_argument("--password", default="")
+    parser.add_argument("--database", default="planetae_load_test")
+    parser.add_argument("--table", default="load_test")
+    parser.add_argument("--concurrency", type=int, default=50, help="Number of concurrent workers.")
+    parser.add_argument("--duration", type=float, default=10, help="Seconds the load runs for.")
+    parser.add_argument("--mix", type=parse_mix, default="insert=2,get=6,update=1,delete=1")
+    parser.add_argument("--prefill", type=int, default=1000, help="Documents inserted before the load starts.")
+    parser.add_argument("--interval", type=float, default=1, help="Seconds between progress reports.")
+    parser.add_argument("--seed", type=int, default=None)
+    return parser.parse_args(args)
+
+
+def percentile(latencies: list[float], fraction: float) -> float:
+    if not latencies:
+        return 0.0
+    return latencies[min(len(latencies) - 1, int(fraction * len(latencies)))]
+
+
+class Stats:
+    def __init__(self):
+        self.latencies: dict[str, list[float]] = {operation: [] for operation in OPERATIONS}
+        self.errors: dict[str, int] = dict.fromkeys(OPERATIONS, 0)
+        self.interval_operations = 0
+        self.interval_errors = 0
+
+    def record(self, operation: str, latency: float, ok: bool) -> None:
+        self.latencies[operation].append(latency)
+        self.interval_operations += 1
+        if not ok:
+            self.errors[operation] += 1
+            self.interval_errors += 1
+
+    def flush_interval(self) -> tuple[int, int]:
+        operations, errors = self.interval_operations, self.interval_errors
+        self.interval_operations = self.interval_errors = 0
+        return operations, errors
+
+
+def get_client(options: argparse.Namespace):
+    if options.backend == "memory":
+        return InMemoryClient(automatically_create_database=True)
+    from src.planetae_db.client import MariaDBClient
+
+    return MariaDBClient(
+        host=options.host,
+        port=options.port,
+        username=options.username,
+        password=options.password,
+    )
+
+
+def random_payload() -> str:
+    return "".join(random.choices(string.ascii_letters, k=32))
+
+
+async def run_operation(database, options: argparse.Namespace, operation: str, keyspace: list[int]) -> bool:
+    key = random.randint(1, max(keyspace[0], 1))
+    if operation == "insert":
+        ok = await database.insert_document(options.table, {"payload": random_payload(), "counter": 0})
+        if ok:
+            keyspace[0] += 1
+        return bool(ok)
+    if operation == "get":
+        await database.get_document(options.table, {"id": key})
+        return True
+    if operation == "update":
+        return bool(await database.update_document(options.table, {"id": key}, {"payload": random_payload()}))
+    return bool(await database.delete_document(options.table, {"id": key}))
+
+
+async def worker(database, options: argparse.Namespace, stats: Stats, deadline: float, keyspace: list[int]):
+    operations, weights = list(options.mix), list(options.mix.values())
+    while time.perf_counter() < deadline:
+        operation = random.choices(operations, weights)[0]
+        started = time.perf_counter()
+        try:
+            ok = await run_operation(database, options, operation, keyspace)
+        except Exception:
+            ok = False
+        stats.record(operation, time.perf_counter() - started, ok)
+        # Backends that never suspend, such as the in-memory one, would otherwise starve the other workers.
+        await asyncio.sleep(0)
+
+
+async def report(stats: Stats, options: argparse.Namespace, started: float, deadline: float) -> None:
+    while time.perf_counter() < deadline:
+        await asyncio.sleep(options.interval)
+        operations, errors = stats.flush_interval()
+        error_rate = errors / operations * 100 if operations else 0.0
+        print(
+            f"[{time.perf_counter() - started:6.1f}s] {operations / options.interval:10.1f} ops/s "
+            f"{error_rate:6.2f}% errors"
+        )
+
+
+def print_summary(stats: Stats, elapsed: float, connections: int) -> None:
+    total = sum(len(latencies) for latencies in stats.latencies.values())
+    errors = sum(stats.errors.values())
+    print(f"\n{total} operations in {elapsed:.2f}s: {total / elapsed:.1f} ops/s, {errors} errors")
+    print(f"{'operation':<10}{'count':>10}{'errors':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    for operation, latencies in stats.latencies.items():
+        if not latencies:
+            continue
+        latencies.sort()
+        print(
+            f"{operation:<10}{len(latencies):>10}{stats.errors[operation]:>8}"
+            f"{percentile(latencies, 0.5) * 1000:>10.2f}{percentile(latencies, 0.95) * 1000:>10.2f}"
+            f"{percentile(latencies, 0.99) * 1000:>10.2f}{latencies[-1] * 1000:>10.2f}"
+        )
+    if connections:
+        print(f"connections: {connections}, one per worker")
+    else:
+        print("connections: not used by this backend")
+
+
+async def get_worker_databases(client, database, options: argparse.Namespace) -> list:
+    """
+    Returns the database handle of each worker. Sharing one SQL handle would serialize the workers on its
+    connection, so on the mariadb backend each worker opens its own handle and runs its statements in a worker
+    thread.
+    """
+    if options.backend == "memory":
+        return [database] * options.concurrency
+    databases = [database] + [await client.get_database(options.database) for _ in range(options.concurrency - 1)]
+    for handle in databases:
+        handle.use_worker_thread()
+    return databases
+
+
+async def main(options: argparse.Namespace) -> None:
+    if options.seed is not None:
+        random.seed(options.seed)
+    client = get_client(options)
+    await client.create_database(options.database)
+    database = await client.get_database(options.database)
+    await database.create_table(options.table, {"payload": "varchar(64)", "counter": "int"})
+    await database.insert_documents(
+        options.table, [{"payload": random_payload(), "counter": 0} for _ in range(options.prefill)]
+    )
+    keyspace = [options.prefill]
+    stats = Stats()
+    databases = [database]
+    try:
+        databases = await get_worker_databases(client, database, options)
+        started = time.perf_counter()
+        deadline = started + options.duration
+        await asyncio.gather(
+            report(stats, options, started, deadline),
+            *(worker(handle, options, stats, deadline, keyspace) for handle in databases),
+        )
+        print_summary(stats, time.perf_counter() - started, len(databases) if options.backend == "mariadb" else 0)
+    finally:
+        await database.delete_table(options.table)
+        for handle in {id(handle): handle for handle in databases}.values():
+            await handle.close()
+        await client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
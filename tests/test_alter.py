@@ -0,0 +1,106 @@
+import pytest
+
+from src.planetae_db.alter import AlterTable
+from src.planetae_db.exceptions import OnlineSchemaChangePlanetaeBaseException
+from tests.fixtures import FakeDatabase
+
+
+class HintRefusingDatabase(FakeDatabase):
+    async def _execute(self, query: str, string: str, values: tuple | None = None) -> bool:
+        await super()._execute(query, string, values)
+        return "ALGORITHM" not in query
+
+
+def test_alter_table_merges_changes():
+    alter = AlterTable(FakeDatabase(), "people")  # type: ignore
+    alter.add_column({"age": "int"}).drop_column("nickname").add_index("phone")
+    assert alter.get_query() == (
+        "ALTER TABLE people ADD COLUMN age int, DROP COLUMN nickname, ADD INDEX phone (phone), "
+        "ALGORITHM=INPLACE, LOCK=NONE;"
+    )
+
+
+def test_alter_table_instant_hint():
+    alter = AlterTable(FakeDatabase(), "people")  # type: ignore
+    alter.add_column({"age": "int"}, default="0").drop_index("phone")
+    assert alter.get_query() == "ALTER TABLE people ADD COLUMN age int DEFAULT 0, DROP INDEX phone, ALGORITHM=INSTANT;"
+
+
+def test_alter_table_without_hints_for_copies():
+    alter = AlterTable(FakeDatabase(), "people")  # type: ignore
+    alter.add_column({"age": "int"}).modify_column({"name": "varchar(100)"})
+    assert alter.get_query() == "ALTER TABLE people ADD COLUMN age int, MODIFY name varchar(100);"
+
+
+@pytest.mark.asyncio()
+async def test_alter_table_runs_one_statement():
+    database = FakeDatabase()
+    async with AlterTable(database, "people") as alter:  # type: ignore
+        alter.add_column({"age": "int"})
+        alter.rename_column("name", {"full_name": "varchar(100)"})
+        alter.add_primary_key("phone")
+    assert len(database.executed) == 1
+
+
+@pytest.mark.asyncio()
+async def test_alter_table_retries_without_refused_hints():
+    database = HintRefusingDatabase()
+    assert await AlterTable(database, "people").add_column({"age": "int"}).execute()  # type: ignore
+    assert database.queries == [
+        "ALTER TABLE people ADD COLUMN age int, ALGORITHM=INSTANT;",
+        "ALTER TABLE people ADD COLUMN age int;",
+    ]
+
+
+class FakeOnlineDatabase(FakeDatabase):
+    def __init__(self):
+        super().__init__()
+        self.renamable = True
+        self.cursor.respond("SELECT id FROM people", [(1,), (2,)], [(3,)], [])
+
+    async def get_table_indexes(self, table_name):
+        return {"PRIMARY": ("id",)}
+
+    async def get_table_description(self, table_name):
+        if table_name == "_people_new":
+            return {"id": "int(11)", "full_name": "varchar(100)"}
+        return {"id": "int(11)", "name": "varchar(50)", "nickname": "varchar(50)"}
+
+    async def count_documents(self, table_name, query=None):
+        return 3
+
+    async def rename_tables(self, renames):
+        self.cursor.execute(f"RENAME {renames}")
+        return self.renamable
+
+
+@pytest.mark.asyncio()
+async def test_alter_table_online_copies_in_chunks():
+    database = FakeOnlineDatabase()
+    reports = []
+    alter = AlterTable(database, "people")  # type: ignore
+    alter.rename_column("name", {"full_name": "varchar(100)"}).drop_column("nickname")
+    assert await alter.execute_online(chunk_size=2, progress=lambda copied, total: reports.append((copied, total)))
+    assert reports == [(2, 3), (3, 3)]
+    assert "CREATE TABLE _people_new LIKE people;" in database.queries
+    assert "ALTER TABLE _people_new CHANGE name full_name varchar(100), DROP COLUMN nickname;" in database.queries
+    assert (
+        "INSERT IGNORE INTO _people_new (id, full_name) SELECT id, name FROM people WHERE id >= %s AND id <= %s;"
+        in database.queries
+    )
+    values = [values for _, values in database.executed]
+    assert (1, 2) in values and (3, 3) in values
+    assert "RENAME {'people': '_people_old', '_people_new': 'people'}" in database.queries
+    assert database.queries[-1] == "DROP TABLE _people_old;"
+
+
+@pytest.mark.asyncio()
+async def test_alter_table_online_keeps_the_table_when_the_swap_fails():
+    database = FakeOnlineDatabase()
+    database.renamable = False
+    alter = AlterTable(database, "people")  # type: ignore
+    with pytest.raises(OnlineSchemaChangePlanetaeBaseException):
+        await alter.rename_column("name", {"full_name": "varchar(100)"}).execute_online(chunk_size=2)
+    assert "DROP TABLE _people_old;" not in database.queries
+    assert database.queries[-1] == "DROP TABLE IF EXISTS _people_new;"
+    assert "DROP TRIGGER IF EXISTS _people_osc_insert;" in database.queries
@@ -0,0 +1,117 @@
+import json
+
+import pytest
+
+
+def serve_people(database, deleted=(), tracked=True):
+    cursor = database.cursor
+    cursor.respond("SELECT NOW(6)", [("2026-01-02 00:00:00",)])
+    cursor.respond("SHOW TABLES", [("people",), ("_backup_deletions",)] if tracked else [("people",)])
+    cursor.respond("DESCRIBE people", [("id", "int(11)"), ("name", "varchar(50)"), ("updated_at", "timestamp(6)")])
+    cursor.respond("SHOW INDEX FROM people", [("people", 0, "PRIMARY", 1, "id")])
+    cursor.respond("FROM _backup_deletions", [(json.dumps(key),) for key in deleted])
+    cursor.respond("FROM people", [(1, "Edmilson", "2026-01-01 12:00:00")])
+
+
+@pytest.mark.asyncio()
+async def test_deletions_are_tracked_on_demand(sql_database):
+    serve_people(sql_database, tracked=False)
+    assert await sql_database.enable_incremental_backups()
+    assert (
+        "CREATE TRIGGER _people_backup_delete AFTER DELETE ON people FOR EACH ROW "
+        "INSERT INTO _backup_deletions (table_name, row_key) VALUES ('people', JSON_ARRAY(OLD.id));"
+    ) in [query for query, _ in sql_database.cursor.executed]
+    sql_database.cursor.executed.clear()
+    assert await sql_database.disable_incremental_backups()
+    assert [query for query, _ in sql_database.cursor.executed] == [
+        "SHOW TABLES;",
+        "DROP TRIGGER IF EXISTS _people_backup_delete;",
+    ]
+
+
+@pytest.mark.asyncio()
+async def test_full_backup_does_not_install_triggers(sql_database, tmp_path):
+    serve_people(sql_database, tracked=False)
+    path = tmp_path / "full.sql"
+    assert await sql_database.backup_database(path=str(path), data_only=True)
+    assert not any("TRIGGER" in query or "_backup_deletions" in query for query, _ in sql_database.cursor.executed)
+    manifest = json.loads((tmp_path / "full.sql.manifest.json").read_text())
+    assert manifest["type"] == "full" and manifest["checkpoint"] == "2026-01-02 00:00:00"
+    with pytest.raises(ValueError, match="enable_incremental_backups"):
+        await sql_database.backup_database(path=str(path), incremental_since="2026-01-01 00:00:00")
+
+
+@pytest.mark.asyncio()
+async def test_full_backup_prunes_covered_deletions(sql_database, tmp_path):
+    serve_people(sql_database)
+    assert await sql_database.backup_database(path=str(tmp_path / "full.sql"), data_only=True)
+    assert sql_database.cursor.executed[-1] == (
+        "DELETE FROM _backup_deletions WHERE deleted_at < %s;",
+        ("2026-01-02 00:00:00",),
+    )
+
+
+@pytest.mark.asyncio()
+async def test_incremental_backup_replays_changes_and_deletions(sql_database, tmp_path):
+    serve_people(sql_database, deleted=[[2], [3]])
+    path = tmp_path / "incremental.sql"
+    assert await sql_database.backup_database(path=str(path), incremental_since="2026-01-01 00:00:00")
+    assert not any("SELECT id FROM people" in query for query, _ in sql_database.cursor.executed)
+    manifest = json.loads((tmp_path / "incremental.sql.manifest.json").read_text())
+    assert manifest["since"] == "2026-01-01 00:00:00"
+    assert manifest["tables"] == {"people": {"incremental": True, "blocks": 2}}
+
+    sql_database.cursor.executed.clear()
+    blocks = [block for block in path.read_text().split("\n\n") if block.strip()]
+    for block in blocks:
+        await sql_database._replay_backup_block(block)
+    assert sql_database.cursor.executed == [
+        ("DELETE FROM people WHERE id IN (%s, %s);", (2, 3)),
+        (
+            "REPLACE INTO people (id, name, updated_at) VALUES (%s, %s, %s);",
+            (1, "Edmilson", "2026-01-01 12:00:00"),
+        ),
+    ]
+
+
+@pytest.mark.asyncio()
+async def test_restore_checks_the_incremental_chain(sql_database, tmp_path):
+    for name, manifest in (
+        ("full.sql", {"type": "full", "since": None, "checkpoint": "2026-01-02"}),
+        ("incremental.sql", {"type": "incremental", "since": "2026-01-01", "checkpoint": "2026-01-03"}),
+    ):
+        (tmp_path / name).write_text("\n")
+        (tmp_path / f"{name}.manifest.json").write_text(json.dumps(manifest))
+    with pytest.raises(ValueError, match="does not start at the checkpoint 2026-01-02"):
+        await sql_database.restore_backup(
+            str(tmp_path / "full.sql"), incrementals=[str(tmp_path / "incremental.sql")]
+        )
+    assert sql_database.cursor.executed == []
+
+
+@pytest.mark.parametrize(
+    "value",
+    [None, "plain", "tab\there", "new\nline\r", "back\\slash", "\\N", "nul\x00byte", "ação", b"\xff\xfe\x00\t"],
+)
+def test_tsv_fields_round_trip(sql_database, value):
+    field = sql_database._encode_tsv_field(value)
+    assert b"\t" not in field and b"\n" not in field
+    assert sql_database._decode_tsv_field(field) == value
+
+
+@pytest.mark.asyncio()
+async def test_tsv_data_is_loaded_in_chunks(sql_database, tmp_path):
+    sql_database.cursor.respond("DESCRIBE people", [("id", "int(11)"), ("name", "varchar(50)")])
+    sql_database.cursor.respond("SELECT * FROM people", [(1, "a\tb"), (2, None), (3, "c")])
+    path = str(tmp_path / "backup.sql.people.tsv")
+    table = await sql_database._dump_table_data("people", path)
+    assert table == {"file": "backup.sql.people.tsv", "columns": ("id", "name"), "rows": 3}
+
+    sql_database.cursor.executed.clear()
+    sql_database.connection.commits = 0
+    assert await sql_database._load_table_data("people", path, table["columns"], chunk_size=2)
+    assert sql_database.cursor.executed == [
+        ("INSERT INTO people (id, name) VALUES (%s, %s);", [("1", "a\tb"), ("2", None)]),
+        ("INSERT INTO people (id, name) VALUES (%s, %s);", [("3", "c")]),
+    ]
+    assert sql_database.connection.commits == 1
@@ -0,0 +1,42 @@
+import asyncio
+
+import pytest
+
+from src.planetae_db.buffer import WriteBuffer
+from tests.fixtures import FakeDatabase
+
+
+@pytest.mark.asyncio()
+async def test_write_buffer_coalesces_inserts():
+    database = FakeDatabase()
+    buffer = WriteBuffer(database, max_rows=2, max_delay=0.01)  # type: ignore
+    results = await asyncio.gather(*(buffer.insert_document("people", {"id": i}) for i in range(5)))
+    assert results == [True] * 5
+    assert [len(batch) for batch in database.batches] == [2, 2, 1]
+
+
+@pytest.mark.asyncio()
+async def test_write_buffer_isolates_failures():
+    database = FakeDatabase()
+    buffer = WriteBuffer(database, max_rows=3, max_delay=0.01)  # type: ignore
+    results = await asyncio.gather(
+        buffer.insert_document("people", {"id": 1, "bad": False}),
+        buffer.insert_document("people", {"id": 2, "bad": True}),
+        buffer.insert_document("people", {"id": 3, "bad": False}),
+        return_exceptions=True,
+    )
+    assert results[0] is True and results[2] is True
+    assert isinstance(results[1], ValueError)
+    assert [row["id"] for row in database.documents] == [1, 3]
+
+
+@pytest.mark.asyncio()
+async def test_write_buffer_applies_backpressure():
+    database = FakeDatabase()
+    buffer = WriteBuffer(database, max_rows=2, max_delay=10, max_pending=2)  # type: ignore
+    first = asyncio.ensure_future(buffer.insert_document("people", {"id": 1}))
+    await asyncio.sleep(0)
+    assert len(buffer) == 1
+    assert await buffer.insert_document("people", {"id": 2})
+    assert await first
+    assert database.batches == [[{"id": 1}, {"id": 2}]]
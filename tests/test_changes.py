@@ -0,0 +1,95 @@
+import time
+
+import pytest
+
+from src.planetae_db.changes import ChangeCursor, get_outbox_name, get_triggers
+
+
+def test_get_triggers_records_keys_and_documents():
+    triggers = get_triggers("people", primary_key=("id",), columns=("id", "name"))
+    assert set(triggers) == {"_people_feed_insert", "_people_feed_update", "_people_feed_delete"}
+    assert triggers["_people_feed_update"] == (
+        f"AFTER UPDATE ON people FOR EACH ROW INSERT INTO {get_outbox_name('people')} (operation, row_key, document) "
+        "VALUES ('update', JSON_OBJECT('id', NEW.id), JSON_OBJECT('id', NEW.id, 'name', NEW.name))"
+    )
+    assert "JSON_OBJECT('id', OLD.id), NULL)" in triggers["_people_feed_delete"]
+
+
+def test_change_cursor_emits_events_in_order():
+    cursor = ChangeCursor("people", after=0)
+    events = cursor.advance(
+        [
+            (1, "insert", '{"id": 1}', '{"id": 1, "name": "Ada"}', None),
+            (2, "delete", '{"id": 1}', None, None),
+        ]
+    )
+    assert [(event.token, event.operation, event.key, event.document) for event in events] == [
+        (1, "insert", {"id": 1}, {"id": 1, "name": "Ada"}),
+        (2, "delete", {"id": 1}, None),
+    ]
+    assert cursor.after == 2
+    assert not cursor.waiting
+
+
+def test_change_cursor_waits_for_gaps():
+    skipped = []
+    cursor = ChangeCursor("people", after=1, gap_timeout=0.05, log=skipped.append)
+    rows = [(3, "insert", '{"id": 3}', '{"id": 3}', None)]
+    assert cursor.advance(rows) == []
+    assert cursor.waiting and cursor.after == 1
+    time.sleep(0.06)
+    assert [event.token for event in cursor.advance(rows)] == [3]
+    assert not cursor.waiting
+    assert cursor.get_skipped() == [(2, 2)]
+    assert skipped == ["Skipped the missing changes 2 to 2 of table people."]
+
+
+def test_change_cursor_recovers_late_changes():
+    cursor = ChangeCursor("people", after=0, gap_timeout=0, late_timeout=0.05)
+    cursor.advance([(5, "insert", '{"id": 5}', '{"id": 5}', None)])
+    assert cursor.get_skipped() == [(1, 4)]
+    late = [(3, "update", '{"id": 1}', '{"id": 1}', None)]
+    assert [event.token for event in cursor.recover(late)] == [3]
+    assert cursor.recover(late) == []
+    assert cursor.get_skipped() == [(1, 2), (4, 4)]
+    time.sleep(0.06)
+    assert cursor.get_skipped() == []
+
+
+def test_change_cursor_keeps_a_bounded_number_of_gaps():
+    cursor = ChangeCursor("people", after=0, gap_timeout=0, max_skipped=2)
+    cursor.advance([(token, "delete", "{}", None, None) for token in (2, 4, 6)])
+    assert cursor.get_skipped() == [(3, 3), (5, 5)]
+
+
+@pytest.mark.asyncio()
+async def test_watch_reads_skipped_tokens_again(sql_database):
+    sql_database.cursor.respond(
+        "WHERE id > %s", [(1, "insert", '{"id": 1}', "{}", None), (3, "delete", "{}", None, None)]
+    )
+    sql_database.cursor.respond("BETWEEN", [(2, "insert", '{"id": 2}', "{}", None)])
+    events = [event async for event in sql_database.watch("people", after=0, gap_timeout=0, follow=False)]
+    assert [event.token for event in events] == [1, 3, 2]
+    assert sql_database.cursor.executed[-1] == (
+        "SELECT id, operation, row_key, document, changed_at FROM _people_changes WHERE id BETWEEN %s AND %s "
+        "ORDER BY id;",
+        (2, 2),
+    )
+
+
+@pytest.mark.asyncio()
+async def test_enable_change_feed_replaces_triggers_portably(sql_database):
+    sql_database.cursor.respond("DESCRIBE people", [("id", "int(11)"), ("name", "varchar(50)")])
+    sql_database.cursor.respond("SHOW INDEX FROM people", [("people", 0, "PRIMARY", 1, "id")])
+
+    async def create_table(table_name, signature):
+        return True
+
+    sql_database.create_table = create_table
+    assert await sql_database.enable_change_feed("people")
+    triggers = [query for query, _ in sql_database.cursor.executed if "TRIGGER" in query]
+    assert triggers[:2] == [
+        "DROP TRIGGER IF EXISTS _people_feed_insert;",
+        f"CREATE TRIGGER _people_feed_insert {get_triggers('people', ('id',), ('id', 'name'))['_people_feed_insert']};",
+    ]
+    assert not any("OR REPLACE" in query for query in triggers)
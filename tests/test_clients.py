@@ -322,3 +322,9 @@ async def test_integrated_mysql_client_test(mysql_client, database_name, xampp_m
     assert database.name == database_name
     assert await mysql_client.delete_database(database_name)
     assert await mysql_client.close()
+
+
+def test_filter_databases_names_by_pattern():
+    names = {"tenant_1", "tenant_2", "mysql", "information_schema"}
+    assert MariaDBClient._filter_databases_names(names, "tenant_*") == {"tenant_1", "tenant_2"}
+    assert MariaDBClient._filter_databases_names(names) == names
@@ -0,0 +1,63 @@
+import pytest
+
+from src.planetae_db.documents import DocumentTable, column_to_path, dumps, flatten, loads, path_to_column
+from tests.fixtures import FakeDatabase
+
+
+def test_paths_round_trip_to_columns():
+    assert path_to_column("user.name") == "_user__name"
+    assert column_to_path("_user__name") == "user.name"
+    with pytest.raises(ValueError):
+        path_to_column("user.name') OR 1=1 --")
+    assert column_to_path(path_to_column("user._id")) == "user._id"
+    for path in ("user__name", "user_.id"):
+        with pytest.raises(ValueError, match="read back as"):
+            path_to_column(path)
+
+
+def test_flatten_nested_filters():
+    assert flatten({"user": {"name": "Edmilson", "age": 30}, "tags": ["a"]}) == {
+        "user.name": "Edmilson",
+        "user.age": 30,
+        "tags": ["a"],
+    }
+
+
+def test_serializer_round_trip():
+    document = {"user": {"name": "Edmilson"}, "tags": [1, 2], "active": True}
+    assert loads(dumps(document)) == document
+
+
+def test_compile_query_uses_generated_columns():
+    table = DocumentTable(FakeDatabase(), "people", paths={"user.name": "_user__name"})  # type: ignore
+    where, values = table.compile_query({"user": {"name": "Edmilson"}, "active": True, "city": None})
+    assert where == (
+        " WHERE _user__name = %s AND JSON_VALUE(document, '$.active') = %s "
+        "AND JSON_VALUE(document, '$.city') IS NULL"
+    )
+    assert values == ("Edmilson", "true")
+
+
+@pytest.mark.asyncio()
+async def test_create_document_table_with_indexes():
+    database = FakeDatabase()
+    table = await DocumentTable.create(database, "people", indexes={"user.name": "VARCHAR(255)"})  # type: ignore
+    assert table.paths == {"user.name": "_user__name"}
+    assert database.executed[0][0] == (
+        "CREATE TABLE IF NOT EXISTS people (_id BIGINT NOT NULL AUTO_INCREMENT, document JSON NOT NULL, "
+        "_user__name VARCHAR(255) AS (JSON_VALUE(document, '$.user.name')) VIRTUAL, INDEX (_user__name), "
+        "PRIMARY KEY (_id)) default charset=utf8mb4;"
+    )
+
+
+@pytest.mark.asyncio()
+async def test_update_document_sets_paths():
+    database = FakeDatabase()
+    table = DocumentTable(database, "people")  # type: ignore
+    await table.update_document({"_id": 1}, {"user.name": "Neto"})
+    assert database.executed == [
+        (
+            "UPDATE people SET document = JSON_SET(document, '$.user.name', JSON_EXTRACT(%s, '$')) WHERE _id = %s;",
+            ('"Neto"', 1),
+        )
+    ]
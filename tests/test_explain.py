@@ -0,0 +1,76 @@
+import asyncio
+import json
+
+import pytest
+
+from src.planetae_db.explain import get_full_scans, is_explainable
+
+FULL_SCAN = {"query_block": {"table": {"table_name": "people", "access_type": "ALL"}}}
+
+
+def test_get_full_scans_walks_nested_plans():
+    plan = {
+        "query_block": {
+            "select_id": 1,
+            "nested_loop": [
+                {"table": {"table_name": "people", "access_type": "ALL", "rows": 1000}},
+                {"table": {"table_name": "pets", "access_type": "ref", "key": "owner_id"}},
+            ],
+        }
+    }
+    assert get_full_scans(plan) == ["people"]
+
+
+def test_get_full_scans_without_scans():
+    assert get_full_scans({"query_block": {"table": {"table_name": "people", "access_type": "const"}}}) == []
+
+
+def test_is_explainable():
+    assert is_explainable("  select * from people;")
+    assert is_explainable("DELETE FROM people WHERE id = %s;")
+    assert not is_explainable("CREATE TABLE people (id int);")
+    assert not is_explainable("")
+
+
+@pytest.mark.asyncio()
+async def test_explain_builds_the_statements_of_the_operations(sql_database):
+    sql_database.cursor.respond("EXPLAIN", [(json.dumps(FULL_SCAN),)])
+    assert await sql_database.explain("get_documents", "people", {"name": "a", "age": 1}) == FULL_SCAN
+    await sql_database.explain("update_document", "people", {"id": 1}, {"name": "b"})
+    await sql_database.explain("get_all_documents", "people")
+    assert sql_database.cursor.executed == [
+        ("EXPLAIN FORMAT=JSON SELECT * FROM people WHERE name = %s AND age = %s;", ("a", 1)),
+        ("EXPLAIN FORMAT=JSON UPDATE people SET name = %s WHERE id = %s;", ("b", 1)),
+        ("EXPLAIN FORMAT=JSON SELECT * FROM people;", None),
+    ]
+    with pytest.raises(ValueError):
+        await sql_database.explain("update_document", "people", {"id": 1})
+    with pytest.raises(ValueError):
+        await sql_database.explain("insert_document", "people")
+
+
+@pytest.mark.asyncio()
+async def test_operations_and_explain_share_the_where_clause(sql_database):
+    sql_database.cursor.respond("EXPLAIN", [(json.dumps(FULL_SCAN),)])
+    await sql_database.delete_document("people", {"name": "a", "age": 1})
+    await sql_database.explain("delete_document", "people", {"name": "a", "age": 1})
+    statement, explained = sql_database.cursor.executed
+    assert explained == ("EXPLAIN FORMAT=JSON " + statement[0], statement[1])
+
+
+@pytest.mark.asyncio()
+async def test_capture_slow_queries_records_plans_and_full_scans(sql_database):
+    sql_database.cursor.respond("EXPLAIN", [(json.dumps(FULL_SCAN),)])
+    sql_database.cursor.respond("COUNT", [(3,)])
+    slow_queries = sql_database.capture_slow_queries(threshold=0, max_entries=1)
+    await sql_database._execute(query="CREATE TABLE people (id int);", string="Created table people.")
+    assert await sql_database.count_documents("people", {"name": "a"}) == 3
+    await asyncio.sleep(0)
+    [slow_query] = slow_queries
+    assert slow_query.query == "SELECT COUNT(*) FROM people WHERE name = %s;"
+    assert slow_query.values == ("a",)
+    assert slow_query.plan == FULL_SCAN and slow_query.full_scans == ["people"]
+
+    assert sql_database.capture_slow_queries(threshold=None, max_entries=1) is slow_queries
+    await sql_database.count_documents("people")
+    assert list(slow_queries) == [slow_query]
@@ -0,0 +1,59 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from src.planetae_db.memory import InMemoryClient
+from tests.fixtures import FakeServer, SlowCursor, make_mariadb_client, make_sql_database
+
+
+@pytest.mark.asyncio()
+async def test_fan_out_reuses_database_handles():
+    client = InMemoryClient()
+    for name in ("tenant_1", "tenant_2", "other"):
+        await client.create_database(name)
+        await (await client.get_database(name)).create_table("people", {"name": "varchar(50)"})
+    opened = []
+    get_database = client.get_database
+
+    async def counting_get_database(name):
+        opened.append(name)
+        return await get_database(name)
+
+    client.get_database = counting_get_database  # type: ignore
+    for _ in range(2):
+        results = dict([result async for result in client.fan_out("count_documents", "people", pattern="tenant_*")])
+        assert results == {"tenant_1": 0, "tenant_2": 0}
+    assert sorted(opened) == ["tenant_1", "tenant_2"]
+    failures = [result async for result in client.fan_out("count_documents", "missing", databases=["tenant_1"])]
+    assert failures[0][0] == "tenant_1" and isinstance(failures[0][1], Exception)
+    await client.close()
+
+
+@pytest.mark.asyncio()
+async def test_sql_fan_out_overlaps_databases_and_closes_them(monkeypatch):
+    client = make_mariadb_client(monkeypatch, FakeServer())
+    databases = {}
+
+    async def get_database(name):
+        databases[name] = make_sql_database(name)
+        databases[name].cursor = SlowCursor(0.1, name=name)
+        return databases[name]
+
+    async def operation(database):
+        loop = asyncio.get_running_loop()
+        await database.delete_document("people", {"id": 1})
+        return loop
+
+    client.get_database = get_database  # type: ignore
+    started = time.perf_counter()
+    names = [f"tenant_{index}" for index in range(4)]
+    results = [result async for result in client.fan_out(operation, databases=names, concurrency=4)]
+    assert time.perf_counter() - started < 0.3
+    assert sorted(name for name, _ in results) == names
+    assert all(loop is asyncio.get_running_loop() for _, loop in results)
+    threads = [databases[name].cursor.events[0][2] for name in names]
+    assert threading.current_thread().name not in threads and len(set(threads)) == len(names)
+    await client.close()
+    assert all(database.connection is None for database in databases.values())
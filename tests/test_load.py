@@ -0,0 +1,50 @@
+import argparse
+
+import pytest
+
+from tests.fixtures import FakeServer, make_mariadb_client, make_sql_database
+from tests.load import get_client, get_worker_databases, main, parse_args, parse_mix, percentile
+
+
+def test_parse_mix():
+    assert parse_mix("insert=2,get,delete=0") == {"insert": 2, "get": 1, "delete": 0}
+    assert parse_args([]).mix == {"insert": 2, "get": 6, "update": 1, "delete": 1}
+    with pytest.raises(argparse.ArgumentTypeError):
+        parse_mix("insert=1,scan=2")
+
+
+def test_percentile():
+    latencies = [0.1, 0.2, 0.3, 0.4]
+    assert percentile([], 0.5) == 0.0
+    assert percentile(latencies, 0.5) == 0.3
+    assert percentile(latencies, 0.99) == 0.4
+
+
+def test_get_client_builds_a_mariadb_client(monkeypatch):
+    make_mariadb_client(monkeypatch, FakeServer())
+    client = get_client(parse_args(["--backend", "mariadb"]))
+    assert (client.host, client.port, client.username) == ("localhost", 3306, "root")
+
+
+@pytest.mark.asyncio()
+async def test_mariadb_workers_get_their_own_connection(monkeypatch):
+    client = make_mariadb_client(monkeypatch, FakeServer())
+
+    async def get_database(name):
+        return make_sql_database(name)
+
+    client.get_database = get_database  # type: ignore
+    database = make_sql_database("planetae_load_test")
+    databases = await get_worker_databases(client, database, parse_args(["--backend", "mariadb", "--concurrency", "3"]))
+    assert databases[0] is database and len({id(handle) for handle in databases}) == 3
+    assert all(handle._executor is not None for handle in databases)
+    for handle in databases:
+        await handle.close()
+    assert await get_worker_databases(client, database, parse_args(["--concurrency", "2"])) == [database, database]
+
+
+@pytest.mark.asyncio()
+async def test_load_runs_on_memory(capsys):
+    await main(parse_args(["--duration", "0.05", "--interval", "0.02", "--concurrency", "4", "--prefill", "10"]))
+    output = capsys.readouterr().out
+    assert "ops/s" in output and "connections: not used by this backend" in output
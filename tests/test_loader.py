@@ -0,0 +1,34 @@
+import asyncio
+
+import pytest
+
+from src.planetae_db.loader import DocumentLoader
+from tests.fixtures import FakeDatabase
+
+
+@pytest.mark.asyncio()
+async def test_loader_batches_and_dedupes():
+    database = FakeDatabase(documents=[{"id": 1, "name": "a"}, {"id": 2, "name": "b"}])
+    loader = DocumentLoader(database, "people")  # type: ignore
+    results = await asyncio.gather(loader.load(1), loader.load(2), loader.load(1), loader.load(3))
+    assert results == [{"id": 1, "name": "a"}, {"id": 2, "name": "b"}, {"id": 1, "name": "a"}, None]
+    assert database.lookups == [[1, 2, 3]]
+
+
+@pytest.mark.asyncio()
+async def test_loader_respects_max_batch():
+    database = FakeDatabase(documents=[{"id": i} for i in range(5)])
+    loader = DocumentLoader(database, "people", max_batch=2)  # type: ignore
+    assert await loader.load_many(range(5)) == [{"id": i} for i in range(5)]
+    assert database.lookups == [[0, 1], [2, 3], [4]]
+
+
+@pytest.mark.asyncio()
+async def test_loader_shares_inflight_lookups():
+    database = FakeDatabase(documents=[{"id": 1}])
+    loader = DocumentLoader(database, "people")  # type: ignore
+    first = asyncio.ensure_future(loader.load(1))
+    await asyncio.sleep(0)
+    await asyncio.sleep(0)
+    assert await asyncio.gather(first, loader.load(1)) == [{"id": 1}, {"id": 1}]
+    assert database.lookups == [[1]]
@@ -0,0 +1,224 @@
+import copy
+
+import pytest
+import pytest_asyncio
+
+from src.planetae_db.explain import get_full_scans
+from src.planetae_db.memory import InMemoryClient, InMemoryDatabase
+
+
+@pytest_asyncio.fixture()
+async def database():
+    database = InMemoryDatabase(name="test")
+    await database.create_table("people", {"name": "varchar(100)", "city": "varchar(100)", "age": "int"})
+    await database.insert_documents(
+        "people",
+        [
+            {"name": "Edmilson", "city": "Recife", "age": 30},
+            {"name": "Maria", "city": "Recife", "age": 25},
+            {"name": "João", "city": "Natal", "age": None},
+        ],
+    )
+    return database
+
+
+@pytest.mark.asyncio()
+async def test_memory_auto_increment_and_description(database):
+    assert await database.get_table_description("people") == {
+        "id": "int NOT NULL AUTO_INCREMENT",
+        "name": "varchar(100)",
+        "city": "varchar(100)",
+        "age": "int",
+    }
+    assert [document["id"] for document in await database.get_all_documents("people")] == [1, 2, 3]
+    assert await database.get_document("people", {"id": 2}) == {"id": 2, "name": "Maria", "city": "Recife", "age": 25}
+
+
+@pytest.mark.asyncio()
+async def test_memory_queries_match_sql_equality(database):
+    assert await database.count_documents("people", {"city": "Recife"}) == 2
+    assert await database.get_documents("people", {"city": "Recife", "age": 25}) == [
+        {"id": 2, "name": "Maria", "city": "Recife", "age": 25}
+    ]
+    assert await database.get_documents("people", {"age": None}) == []
+    assert not await database.exists("people", {"city": "Olinda"})
+
+
+@pytest.mark.asyncio()
+async def test_memory_secondary_indexes_follow_writes(database):
+    assert await database.create_index("people", "city")
+    assert await database.get_table_indexes("people") == {"PRIMARY": ("id",), "city": ("city",)}
+    assert await database.update_document("people", {"name": "Maria"}, {"city": "Natal"})
+    assert [document["name"] for document in await database.get_documents("people", {"city": "Natal"})] == [
+        "Maria",
+        "João",
+    ]
+    assert await database.delete_document("people", {"city": "Natal"})
+    assert await database.count_documents("people") == 1
+
+
+@pytest.mark.asyncio()
+async def test_memory_failed_writes(database):
+    assert not await database.insert_document("people", {"id": 1, "name": "Copy"})
+    assert not await database.insert_document("people", {"nickname": "Ed"})
+    with pytest.raises(ValueError):
+        async with database.transaction():
+            await database.insert_document("people", {"name": "Ana"})
+            await database.insert_document("people", {"id": 1, "name": "Copy"})
+    assert await database.count_documents("people") == 3
+
+
+@pytest.mark.asyncio()
+async def test_memory_transaction_undoes_only_what_it_touched(database, monkeypatch):
+    await database.create_index("people", "city")
+    before = await database.get_all_documents("people")
+    monkeypatch.setattr(copy, "deepcopy", None)
+    with pytest.raises(ValueError):
+        async with database.transaction():
+            await database.insert_document("people", {"name": "Ana", "city": "Olinda"})
+            await database.update_document("people", {"name": "Maria"}, {"id": 9, "city": "Olinda"})
+            await database.delete_document("people", {"id": 1})
+            await database.delete_documents_chunked("people", {"city": "Natal"})
+            raise ValueError
+    assert await database.get_all_documents("people") == before
+    assert [document["name"] for document in await database.get_documents("people", {"city": "Recife"})] == [
+        "Edmilson",
+        "Maria",
+    ]
+    assert not await database.exists("people", {"city": "Olinda"})
+    assert await database.insert_document("people", {"name": "Ana"})
+    assert (await database.get_document("people", {"name": "Ana"}))["id"] == 5
+
+
+@pytest.mark.asyncio()
+async def test_memory_transaction_undoes_schema_changes(database):
+    with pytest.raises(ValueError):
+        async with database.transaction():
+            await database.add_column_to_table("people", {"nickname": "varchar(20)"})
+            await database.update_document("people", {"id": 1}, {"nickname": "Ed"})
+            await database.truncate_table("people")
+            await database.rename_table("people", "persons")
+            await database.create_table("pets", {"name": "varchar(20)"})
+            raise ValueError
+    assert await database.get_all_tables() == ("people",)
+    assert list(await database.get_table_description("people")) == ["id", "name", "city", "age"]
+    assert (await database.get_document("people", {"id": 1}))["name"] == "Edmilson"
+    assert await database.count_documents("people") == 3
+
+
+@pytest.mark.asyncio()
+async def test_memory_aggregate(database):
+    metrics = {"people": ("count", "*"), "ages": ("count", "age"), "oldest": ("max", "age")}
+    assert await database.aggregate("people", group_by=["city"], metrics=metrics) == [
+        {"city": "Recife", "people": 2, "ages": 2, "oldest": 30},
+        {"city": "Natal", "people": 1, "ages": 0, "oldest": None},
+    ]
+
+
+@pytest.mark.asyncio()
+async def test_memory_schema_changes(database):
+    assert await database.add_column_to_table("people", {"nickname": "varchar(20)"}, after="name", default="'-'")
+    assert list(await database.get_table_description("people")) == ["id", "name", "nickname", "city", "age"]
+    assert await database.rename_column("people", "nickname", {"alias": "varchar(20)"})
+    assert (await database.get_document("people", {"id": 1}))["alias"] == "-"
+    assert await database.rename_table("people", "persons")
+    assert await database.get_all_tables() == ("persons",)
+
+
+@pytest.mark.asyncio()
+async def test_memory_client():
+    client = InMemoryClient()
+    assert await client.create_database("tenant_a")
+    assert not await client.create_database("tenant_a")
+    await client.create_database("other")
+    assert await client.get_databases_names(pattern="tenant_*") == {"tenant_a"}
+    assert await client.get_database("missing") is None
+    assert await client.delete_database("tenant_a")
+    assert await client.get_databases_names() == {"other"}
+
+
+@pytest.mark.asyncio()
+async def test_memory_blobs(database):
+    await database.add_column_to_table("people", {"photo": "longblob"})
+    data = bytes(range(256)) * 10
+    assert await database.write_blob("people", {"id": 1}, "photo", memoryview(data), chunk_size=100) == len(data)
+    assert await database.read_blob("people", {"id": 1}, "photo") == data
+
+
+@pytest.mark.asyncio()
+async def test_memory_alter_table(database):
+    async with database.alter_table("people") as alter:
+        alter.add_column({"nickname": "varchar(20)"}, after="name", default="'-'").add_index("city")
+        alter.rename_column("age", {"years": "int"})
+    assert list(await database.get_table_description("people")) == ["id", "name", "nickname", "city", "years"]
+    assert await database.get_table_indexes("people") == {"PRIMARY": ("id",), "city": ("city",)}
+    alter = database.alter_table("people").drop_column("nickname").drop_column("missing")
+    assert not await alter.execute()
+    assert "nickname" in await database.get_table_description("people")
+    with pytest.raises(NotImplementedError):
+        database.alter_table("people").add_index(["name", "city"])
+
+
+@pytest.mark.asyncio()
+async def test_memory_explain(database):
+    await database.create_index("people", "city")
+    plans = [
+        await database.explain("get_document", "people", {"id": 1}),
+        await database.explain("get_documents", "people", {"city": "Recife", "age": 25}),
+        await database.explain("count_documents", "people", {"name": "Maria"}),
+    ]
+    assert [plan["query_block"]["table"] for plan in plans] == [
+        {"table_name": "people", "access_type": "const", "key": "PRIMARY", "rows": 1},
+        {"table_name": "people", "access_type": "ref", "key": "city", "rows": 2},
+        {"table_name": "people", "access_type": "ALL", "rows": 3},
+    ]
+    assert [get_full_scans(plan) for plan in plans] == [[], [], ["people"]]
+    assert await database.insert_document("people", {"name": "Ana"}, return_query=True) == (
+        "INSERT INTO people (name) VALUES (%s);",
+        ("Ana",),
+    )
+
+
+@pytest.mark.asyncio()
+async def test_memory_change_feed(database):
+    assert await database.enable_change_feed("people")
+    await database.insert_document("people", {"name": "Ana"})
+    with pytest.raises(ValueError):
+        async with database.transaction():
+            await database.delete_document("people", {"id": 1})
+            raise ValueError
+    await database.update_document("people", {"id": 4}, {"city": "Olinda"})
+    await database.delete_document("people", {"id": 4})
+    events = [event async for event in database.watch("people", after=0, follow=False)]
+    assert [(event.token, event.operation, event.key) for event in events] == [
+        (1, "insert", {"id": 4}),
+        (3, "update", {"id": 4}),
+        (4, "delete", {"id": 4}),
+    ]
+    assert events[1].document == {"id": 4, "name": "Ana", "city": "Olinda", "age": None}
+    assert await database.prune_changes("people", 3)
+    assert [event.token async for event in database.watch("people", after=0, follow=False)] == [4]
+    assert [event async for event in database.watch("people", follow=False)] == []
+
+
+@pytest.mark.asyncio()
+async def test_memory_backups(database, tmp_path):
+    path = str(tmp_path / "backup.pickle")
+    assert await database.backup_database(path)
+    await database.update_document("people", {"id": 1}, {"city": "Olinda"})
+    await database.delete_table("people")
+    assert await database.restore_backup(path)
+    assert (await database.get_document("people", {"id": 1}))["city"] == "Recife"
+
+    assert await database.backup_database(path, data_only=True)
+    await database.update_document("people", {"id": 1}, {"city": "Olinda"})
+    await database.insert_document("people", {"name": "Ana"})
+    assert await database.restore_backup(path)
+    assert [document["city"] for document in await database.get_all_documents("people")] == [
+        "Recife",
+        "Recife",
+        "Natal",
+        None,
+    ]
+    with pytest.raises(ValueError):
+        await database.backup_database(path, incremental_since="2026-01-01")
@@ -0,0 +1,64 @@
+import pytest
+
+from src.planetae_db.pipeline import Pipeline
+from tests.fixtures import FakeServer, make_mariadb_client
+
+
+async def echo_runner(statements):
+    results = []
+    for statement in statements:
+        if "fail" in statement.query:
+            results.append(ValueError(statement.query))
+        else:
+            results.append((statement.query, statement.values, statement.fetch))
+    return results
+
+
+@pytest.mark.asyncio()
+async def test_pipeline_resolves_futures_in_order():
+    async with Pipeline(echo_runner) as pipeline:
+        first = pipeline.execute("INSERT INTO test VALUES (%s);", (1,))
+        second = pipeline.fetchone("SELECT * FROM test;")
+        third = pipeline.fetchall("SELECT * FROM test;")
+        assert len(pipeline) == 3
+        assert not first.done()
+    assert await first == ("INSERT INTO test VALUES (%s);", (1,), "none")
+    assert await second == ("SELECT * FROM test;", None, "one")
+    assert await third == ("SELECT * FROM test;", None, "all")
+
+
+@pytest.mark.asyncio()
+async def test_pipeline_isolates_failing_statement():
+    async with Pipeline(echo_runner) as pipeline:
+        failing = pipeline.execute("fail")
+        working = pipeline.fetchone("SELECT 1;")
+    with pytest.raises(ValueError):
+        await failing
+    assert await working == ("SELECT 1;", None, "one")
+
+
+@pytest.mark.asyncio()
+async def test_pipeline_discarded_on_exception():
+    with pytest.raises(RuntimeError):
+        async with Pipeline(echo_runner) as pipeline:
+            future = pipeline.execute("SELECT 1;")
+            raise RuntimeError
+    assert future.cancelled()
+    assert len(pipeline) == 0
+
+
+@pytest.mark.asyncio()
+async def test_only_the_pipeline_connection_accepts_multi_statements(monkeypatch):
+    from pymysql.constants import CLIENT
+
+    server = FakeServer(rows=[(1,)])
+    client = make_mariadb_client(monkeypatch, server)
+    assert await client._fetchone("SELECT 1;") == (1,)
+    async with client.pipeline() as pipeline:
+        first = pipeline.fetchone("SELECT %s;", (1,))
+        second = pipeline.execute("DELETE FROM people;")
+    assert await first == (1,) and await second is True
+    assert [connection.client_flag for connection in server.connections] == [0, CLIENT.MULTI_STATEMENTS]
+    assert server.executed[-1] == (1, "SELECT 1;\nDELETE FROM people;", None)
+    await client.close()
+    assert all(connection.closed for connection in server.connections)
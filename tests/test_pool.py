@@ -0,0 +1,125 @@
+import asyncio
+
+import pytest
+
+from src.planetae_db.exceptions import QueryTimeoutPlanetaeBaseException
+from src.planetae_db.pool import ConnectionPool
+from tests.fixtures import FakeServer, make_mariadb_client
+
+
+def create_pool(server: FakeServer, **kwargs) -> ConnectionPool:
+    return ConnectionPool(
+        connect=server.connect,
+        ping=lambda connection: connection.ping(),
+        disconnect=lambda connection: connection.ensure_closed(),
+        is_broken=lambda e: isinstance(e, ConnectionError),
+        **kwargs,
+    )
+
+
+@pytest.mark.asyncio()
+async def test_pool_reuses_connections():
+    server = FakeServer()
+    pool = create_pool(server)
+    async with pool.acquire() as first:
+        pass
+    async with pool.acquire() as second:
+        pass
+    assert first is second
+    assert len(server.connections) == 1
+    await pool.close()
+    assert first.closed
+
+
+@pytest.mark.asyncio()
+async def test_pool_recycles_idle_connections():
+    server = FakeServer()
+    pool = create_pool(server, idle_timeout=0)
+    async with pool.acquire() as first:
+        pass
+    await asyncio.sleep(0.01)
+    async with pool.acquire() as second:
+        pass
+    assert first is not second
+    await pool.close()
+    assert first.closed
+
+
+@pytest.mark.asyncio()
+async def test_pool_pre_pings_connections():
+    server = FakeServer()
+    pool = create_pool(server, pre_ping=True)
+    async with pool.acquire() as first:
+        first.alive = False
+    async with pool.acquire() as second:
+        pass
+    assert first is not second
+    await pool.close()
+
+
+@pytest.mark.asyncio()
+async def test_pool_replaces_broken_connections_in_background():
+    server = FakeServer()
+    pool = create_pool(server, min_size=1)
+    with pytest.raises(ConnectionError):
+        async with pool.acquire():
+            raise ConnectionError
+    await asyncio.sleep(0)
+    await asyncio.sleep(0)
+    assert server.connections[0].closed
+    assert pool.idle == 1
+    assert pool.opened == 1
+    await pool.close()
+
+
+@pytest.mark.asyncio()
+async def test_pool_limits_concurrent_connections():
+    server = FakeServer()
+    pool = create_pool(server, size=2)
+
+    async def use():
+        async with pool.acquire():
+            await asyncio.sleep(0.01)
+
+    await asyncio.gather(*(use() for _ in range(6)))
+    assert len(server.connections) == 2
+    assert pool.acquisitions == 6
+    await pool.close()
+
+
+@pytest.mark.asyncio()
+async def test_query_timeout_kills_the_query_and_replaces_the_connection(monkeypatch):
+    server = FakeServer(delay=1)
+    client = make_mariadb_client(monkeypatch, server, query_timeout=0.05)
+    with pytest.raises(QueryTimeoutPlanetaeBaseException):
+        await client._execute("SELECT SLEEP(1);")
+    await asyncio.sleep(0.01)
+    assert server.killed == [0]
+    assert server.connections[0].closed and server.connections[1].closed
+    assert await client._fetchone("SELECT 1;") == (1,)
+    assert server.executed[-1][0] == 2
+    await client.close()
+
+
+@pytest.mark.asyncio()
+async def test_cancelled_query_is_killed(monkeypatch):
+    server = FakeServer(delay=1)
+    client = make_mariadb_client(monkeypatch, server)
+    task = asyncio.ensure_future(client._fetchone("SELECT SLEEP(1);"))
+    await asyncio.sleep(0.01)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    await asyncio.sleep(0.01)
+    assert server.killed == [0]
+    assert server.connections[0].closed
+    await client.close()
+
+
+@pytest.mark.asyncio()
+async def test_timeout_can_be_given_per_statement(monkeypatch):
+    server = FakeServer(delay=0.05)
+    client = make_mariadb_client(monkeypatch, server, query_timeout=0.01)
+    assert await client._fetchone("SELECT SLEEP(0.05);", timeout=1) == (1,)
+    assert server.killed == []
+    await client.close()
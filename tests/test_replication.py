@@ -0,0 +1,109 @@
+import asyncio
+
+import pytest
+
+from src.planetae_db.memory import InMemoryDatabase
+from src.planetae_db.replication import ReplicatedDatabase
+from tests.fixtures import FakeDatabase, make_sql_database
+
+
+def fake_database(name: str, lag: float | None = None) -> FakeDatabase:
+    return FakeDatabase(name, documents=[{"id": 1, "served_by": name}], lag=lag)
+
+
+@pytest.fixture()
+def primary():
+    return fake_database("primary")
+
+
+@pytest.mark.asyncio()
+async def test_reads_are_balanced_over_replicas(primary):
+    replicas = [fake_database("replica_0", lag=0), fake_database("replica_1", lag=0)]
+    database = ReplicatedDatabase(name="test", primary=primary, replicas=replicas)  # type: ignore
+    served_by = [(await database.get_document("people", {"id": 1}))["served_by"] for _ in range(4)]
+    assert served_by == ["replica_0", "replica_1", "replica_0", "replica_1"]
+
+
+@pytest.mark.asyncio()
+async def test_lagging_replicas_are_skipped(primary):
+    replicas = [fake_database("replica_0", lag=60), fake_database("replica_1", lag=1)]
+    database = ReplicatedDatabase(name="test", primary=primary, replicas=replicas, max_lag=5)  # type: ignore
+    assert (await database.get_document("people", {"id": 1}))["served_by"] == "replica_1"
+    replicas[1].lag = float("inf")
+    database.lag_check_interval = 0
+    assert (await database.get_document("people", {"id": 1}))["served_by"] == "primary"
+
+
+@pytest.mark.asyncio()
+async def test_replicas_with_unknown_lag_are_skipped(primary):
+    replicas = [fake_database("replica_0", lag=None), fake_database("replica_1", lag=0)]
+    database = ReplicatedDatabase(name="test", primary=primary, replicas=replicas, max_lag=5)  # type: ignore
+    served_by = [(await database.get_document("people", {"id": 1}))["served_by"] for _ in range(2)]
+    assert served_by == ["replica_1", "replica_1"]
+    replicas[1].lag = None
+    database.lag_check_interval = 0
+    assert (await database.get_document("people", {"id": 1}))["served_by"] == "primary"
+
+
+@pytest.mark.asyncio()
+async def test_reads_after_slow_writes_go_to_primary(primary):
+    replicas = [fake_database("replica_0", lag=0)]
+    database = ReplicatedDatabase(
+        name="test", primary=primary, replicas=replicas, read_your_writes=0.05  # type: ignore
+    )
+    insert_document = primary.insert_document
+
+    async def slow_insert_document(*args, **kwargs):
+        await asyncio.sleep(0.1)
+        return await insert_document(*args, **kwargs)
+
+    primary.insert_document = slow_insert_document  # type: ignore
+    assert await database.insert_document("people", {"id": 1})
+    assert (await database.get_document("people", {"id": 1}))["served_by"] == "primary"
+
+
+@pytest.mark.asyncio()
+async def test_reads_after_writes_go_to_primary(primary):
+    replicas = [fake_database("replica_0", lag=0)]
+    database = ReplicatedDatabase(
+        name="test", primary=primary, replicas=replicas, read_your_writes=60  # type: ignore
+    )
+    assert (await database.get_document("people", {"id": 1}))["served_by"] == "replica_0"
+    assert await database.insert_document("people", {"id": 1})
+    assert (await database.get_document("people", {"id": 1}))["served_by"] == "primary"
+
+
+@pytest.mark.asyncio()
+async def test_alter_table_runs_on_primary():
+    primary = make_sql_database()
+    database = ReplicatedDatabase(name="test", primary=primary, replicas=[fake_database("replica_0")])  # type: ignore
+    assert await database.alter_table("people").add_column({"age": "int"}).execute()
+    assert primary.cursor.executed == [("ALTER TABLE people ADD COLUMN age int, ALGORITHM=INSTANT;", None)]
+
+
+@pytest.mark.asyncio()
+async def test_iterations_are_served_by_a_replica():
+    primary, replica = InMemoryDatabase("primary"), InMemoryDatabase("replica")
+    for database, names in ((primary, ["primary"]), (replica, ["a", "b", "c"])):
+        await database.create_table("people", {"id": "int PRIMARY KEY", "name": "varchar(50)"})
+        await database.insert_documents("people", [{"id": i, "name": name} for i, name in enumerate(names)])
+    database = ReplicatedDatabase(name="test", primary=primary, replicas=[replica], max_lag=None)
+    batches = [batch async for batch in database.iter_documents("people", batch_size=2)]
+    assert [[document["name"] for document in batch] for batch in batches] == [["a", "b"], ["c"]]
+    async with database.transaction():
+        assert [batch async for batch in database.iter_documents("people")] == [[{"id": 0, "name": "primary"}]]
+
+
+@pytest.mark.asyncio()
+async def test_write_buffer_buffers_the_inserts_of_the_primary():
+    primary, replica = InMemoryDatabase("primary"), InMemoryDatabase("replica")
+    await primary.create_table("people", {"id": "int PRIMARY KEY"})
+    database = ReplicatedDatabase(name="test", primary=primary, replicas=[replica], max_lag=None)
+    async with database.write_buffer(max_rows=10, max_delay=10) as buffer:
+        assert buffer.database is primary
+        insert = asyncio.ensure_future(database.insert_document("people", {"id": 1}))
+        await asyncio.sleep(0)
+        assert len(buffer) == 1
+    assert await insert
+    assert await primary.get_all_documents("people") == [{"id": 1}]
+    assert primary._write_buffer is None
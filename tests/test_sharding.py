@@ -0,0 +1,166 @@
+from decimal import Decimal
+
+import pytest
+import pytest_asyncio
+
+from src.planetae_db.memory import InMemoryClient
+from src.planetae_db.sharding import ShardedDatabase
+from src.planetae_db.transfer import copy_table
+
+
+class FakeShard:
+    def __init__(self):
+        self.documents: list[dict] = []
+
+    async def insert_document(self, table_name, document, return_query=False):
+        self.documents.append(document)
+        return True
+
+    async def insert_documents(self, table_name, documents, chunk_size=1000):
+        self.documents.extend(documents)
+        return True
+
+    async def get_documents(self, table_name, query):
+        return [document for document in self.documents if query.items() <= document.items()]
+
+    async def get_document(self, table_name, query):
+        documents = await self.get_documents(table_name, query)
+        return documents[0] if documents else None
+
+
+class FakeClient:
+    def __init__(self):
+        self.shard = FakeShard()
+
+    async def get_database(self, name):
+        return self.shard
+
+
+@pytest.fixture()
+def clients():
+    return [FakeClient() for _ in range(3)]
+
+
+def test_range_sharding_routes_by_upper_bounds(clients):
+    database = ShardedDatabase(name="test", clients=clients, shard_key="id", ranges=[100, 200])
+    assert database.shard_index(5) == 0
+    assert database.shard_index(100) == 1
+    assert database.shard_index(199) == 1
+    assert database.shard_index(500) == 2
+
+
+def test_hash_sharding_is_stable(clients):
+    database = ShardedDatabase(name="test", clients=clients, shard_key="id")
+    assert database.shard_index("tenant") == database.shard_index("tenant")
+    assert 0 <= database.shard_index(42) < 3
+
+
+def test_hash_sharding_routes_equal_keys_together(clients):
+    database = ShardedDatabase(name="test", clients=clients, shard_key="id")
+    for key in range(20):
+        assert len({database.shard_index(value) for value in (key, float(key), Decimal(key), str(key))}) == 1
+    for value in (1.5, Decimal("0.1"), True, None, b"1", (1,)):
+        with pytest.raises(ValueError):
+            database.shard_index(value)
+
+
+def test_sharding_needs_consistent_ranges(clients):
+    with pytest.raises(ValueError):
+        ShardedDatabase(name="test", clients=clients, shard_key="id", ranges=[100])
+
+
+@pytest.mark.asyncio()
+async def test_sharded_insert_and_get(clients):
+    database = ShardedDatabase(name="test", clients=clients, shard_key="id", ranges=[100, 200])
+    assert await database.insert_document("people", {"id": 150, "name": "Edmilson"})
+    assert clients[1].shard.documents == [{"id": 150, "name": "Edmilson"}]
+    assert await database.get_document("people", {"id": 150}) == {"id": 150, "name": "Edmilson"}
+    assert await database.get_document("people", {"name": "Edmilson"}) == {"id": 150, "name": "Edmilson"}
+
+
+@pytest.mark.asyncio()
+async def test_sharded_bulk_insert_groups_per_shard(clients):
+    database = ShardedDatabase(name="test", clients=clients, shard_key="id", ranges=[100, 200])
+    assert await database.insert_documents("people", [{"id": 1}, {"id": 2}, {"id": 300}])
+    assert clients[0].shard.documents == [{"id": 1}, {"id": 2}]
+    assert clients[1].shard.documents == []
+    assert clients[2].shard.documents == [{"id": 300}]
+    assert len(await database.get_documents("people", {})) == 3
+
+
+@pytest.mark.asyncio()
+async def test_sharded_insert_without_shard_key(clients):
+    database = ShardedDatabase(name="test", clients=clients, shard_key="id")
+    with pytest.raises(ValueError):
+        await database.insert_document("people", {"name": "Edmilson"})
+
+
+class FakeAggregateClient:
+    def __init__(self, documents):
+        self.documents = documents
+
+    async def get_database(self, name):
+        return self
+
+    async def aggregate(self, table_name, query=None, group_by=(), metrics=None):
+        return self.documents
+
+
+@pytest.mark.asyncio()
+async def test_sharded_aggregate_merges_groups():
+    clients = [
+        FakeAggregateClient([{"kind": "a", "total": 10, "biggest": 7}, {"kind": "b", "total": 1, "biggest": 1}]),
+        FakeAggregateClient([{"kind": "a", "total": 5, "biggest": 9}]),
+    ]
+    database = ShardedDatabase(name="test", clients=clients, shard_key="id")  # type: ignore
+    metrics = {"total": ("sum", "amount"), "biggest": ("max", "amount")}
+    documents = await database.aggregate("sales", group_by=["kind"], metrics=metrics)
+    assert documents == [{"kind": "a", "total": 15, "biggest": 9}, {"kind": "b", "total": 1, "biggest": 1}]
+    with pytest.raises(ValueError):
+        await database.aggregate("sales", metrics={"mean": ("avg", "amount")})
+
+
+@pytest_asyncio.fixture()
+async def memory_sharded():
+    clients = [InMemoryClient(automatically_create_database=True) for _ in range(3)]
+    database = ShardedDatabase(name="test", clients=clients, shard_key="id")  # type: ignore
+    await database.create_table("people", {"id": "int PRIMARY KEY", "photo": "longblob"})
+    await database.insert_documents("people", [{"id": i, "photo": None} for i in range(1, 11)])
+    return database
+
+
+@pytest.mark.asyncio()
+async def test_iter_documents_merges_shards_in_key_order(memory_sharded):
+    batches = [batch async for batch in memory_sharded.iter_documents("people", batch_size=4)]
+    assert [[document["id"] for document in batch] for batch in batches] == [[1, 2, 3, 4], [5, 6, 7, 8], [9, 10]]
+    resumed = [batch async for batch in memory_sharded.iter_documents("people", batch_size=4, after=8)]
+    assert [[document["id"] for document in batch] for batch in resumed] == [[9, 10]]
+
+
+@pytest.mark.asyncio()
+async def test_blobs_are_routed_to_their_shard(memory_sharded):
+    assert await memory_sharded.write_blob("people", {"id": 7}, "photo", b"x" * 10, chunk_size=4) == 10
+    assert await memory_sharded.read_blob("people", {"id": 7}, "photo") == b"x" * 10
+    assert await memory_sharded.read_blob("people", {"photo": b"x" * 10}, "photo") == b"x" * 10
+    with pytest.raises(ValueError):
+        await memory_sharded.write_blob("people", {"photo": None}, "photo", b"y")
+
+
+@pytest.mark.asyncio()
+async def test_single_connection_features_are_rejected(memory_sharded):
+    with pytest.raises(NotImplementedError):
+        await memory_sharded.table("people")
+    with pytest.raises(NotImplementedError):
+        memory_sharded.alter_table("people")
+    with pytest.raises(NotImplementedError):
+        memory_sharded.watch("people")
+    with pytest.raises(NotImplementedError, match="get_shards"):
+        memory_sharded.write_buffer()
+    assert await memory_sharded.get_table_indexes("people") == {"PRIMARY": ("id",)}
+
+
+@pytest.mark.asyncio()
+async def test_copy_table_reads_every_shard(memory_sharded):
+    destination = InMemoryClient(automatically_create_database=True)["copy"]
+    assert await copy_table(memory_sharded, destination, "people", batch_size=3) == 10
+    assert [document["id"] for document in await destination.get_all_documents("people")] == list(range(1, 11))
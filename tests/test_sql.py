@@ -0,0 +1,160 @@
+import asyncio
+import io
+
+import pytest
+
+from src.planetae_db.exceptions import ChunkedOperationPlanetaeBaseException
+from tests.fixtures import make_sql_database
+
+
+@pytest.mark.asyncio()
+async def test_update_documents_groups_updates_by_shape(sql_database):
+    updates = [({"id": 1}, {"name": "a"}), ({"id": 2}, {"name": "b"}), ({"id": 3}, {"name": "c", "age": 3})]
+    assert await sql_database.update_documents("people", updates, chunk_size=1)
+    assert sql_database.cursor.executed == [
+        ("UPDATE people SET name = %s WHERE id = %s;", [("a", 1)]),
+        ("UPDATE people SET name = %s WHERE id = %s;", [("b", 2)]),
+        ("UPDATE people SET name = %s, age = %s WHERE id = %s;", [("c", 3, 3)]),
+    ]
+    assert sql_database.connection.commits == 1
+
+
+@pytest.mark.asyncio()
+async def test_delete_documents_merges_queries(sql_database):
+    queries = [{"id": 1}, {"id": 2}, {"id": 3}, {"name": "a", "age": 1}]
+    assert await sql_database.delete_documents("people", queries, chunk_size=2)
+    assert sql_database.cursor.executed == [
+        ("DELETE FROM people WHERE id IN (%s, %s);", (1, 2)),
+        ("DELETE FROM people WHERE id IN (%s);", (3,)),
+        ("DELETE FROM people WHERE (name, age) IN ((%s, %s));", ("a", 1)),
+    ]
+    assert sql_database.connection.commits == 1
+
+
+@pytest.mark.asyncio()
+async def test_batched_writes_roll_back_on_failure(sql_database):
+    sql_database.cursor.fail("age")
+    with pytest.raises(ValueError):
+        await sql_database.delete_documents("people", [{"id": 1}, {"age": 2}])
+    assert sql_database.connection.rollbacks == 1
+    assert sql_database.connection.commits == 0
+
+
+@pytest.mark.asyncio()
+async def test_count_documents_and_exists_run_on_the_server(sql_database):
+    sql_database.cursor.respond("COUNT", [(3,)])
+    sql_database.cursor.respond("EXISTS", [(0,)])
+    assert await sql_database.count_documents("people", {"name": "a", "age": 1}) == 3
+    assert await sql_database.exists("people") is False
+    assert sql_database.cursor.executed == [
+        ("SELECT COUNT(*) FROM people WHERE name = %s AND age = %s;", ("a", 1)),
+        ("SELECT EXISTS(SELECT 1 FROM people LIMIT 1);", ()),
+    ]
+
+
+@pytest.mark.asyncio()
+async def test_aggregate_groups_on_the_server(sql_database):
+    sql_database.cursor.respond("GROUP BY", [("BR", 2, 30), ("PT", 1, 10)])
+    groups = await sql_database.aggregate(
+        "orders", {"paid": True}, group_by=["country"], metrics={"orders": ("count", "*"), "total": ("sum", "amount")}
+    )
+    assert groups == [
+        {"country": "BR", "orders": 2, "total": 30},
+        {"country": "PT", "orders": 1, "total": 10},
+    ]
+    assert sql_database.cursor.executed == [
+        (
+            "SELECT country, COUNT(*) AS orders, SUM(amount) AS total FROM orders WHERE paid = %s GROUP BY country;",
+            (True,),
+        )
+    ]
+    with pytest.raises(ValueError):
+        await sql_database.aggregate("orders", metrics={"total": ("median", "amount")})
+    with pytest.raises(ValueError):
+        await sql_database.aggregate("orders", metrics={"total": ("sum", "*")})
+
+
+@pytest.mark.asyncio()
+async def test_delete_documents_chunked_walks_the_primary_key(sql_database):
+    sql_database.cursor.respond("SHOW INDEX FROM people", [("people", 0, "PRIMARY", 1, "id")])
+    sql_database.cursor.respond("SELECT id FROM people", [(1,), (2,)], [(3,)], [])
+    progress = []
+    deleted = await sql_database.delete_documents_chunked(
+        "people", {"age": 1}, chunk_size=2, progress=lambda *args: progress.append(args)
+    )
+    assert deleted == 3
+    assert progress == [(2, 2), (3, 3)]
+    assert [entry for entry in sql_database.cursor.executed if "SHOW INDEX" not in entry[0]] == [
+        ("SELECT id FROM people WHERE age = %s ORDER BY id LIMIT 2;", (1,)),
+        ("DELETE FROM people WHERE id IN (%s, %s) AND age = %s;", (1, 2, 1)),
+        ("SELECT id FROM people WHERE age = %s AND id > %s ORDER BY id LIMIT 2;", (1, 2)),
+        ("DELETE FROM people WHERE id IN (%s) AND age = %s;", (3, 1)),
+        ("SELECT id FROM people WHERE age = %s AND id > %s ORDER BY id LIMIT 2;", (1, 3)),
+    ]
+
+
+@pytest.mark.asyncio()
+async def test_chunked_runs_stop_at_the_failed_chunk(sql_database):
+    sql_database.cursor.respond("SHOW INDEX FROM people", [("people", 0, "PRIMARY", 1, "id")])
+    sql_database.cursor.respond("SELECT id FROM people", [(1,), (2,)], [(3,)], [])
+    sql_database.cursor.fail("DELETE FROM people WHERE id IN (%s);")
+    progress = []
+    with pytest.raises(ChunkedOperationPlanetaeBaseException, match="after 2, 2 documents processed"):
+        await sql_database.delete_documents_chunked(
+            "people", {}, chunk_size=2, progress=lambda *args: progress.append(args)
+        )
+    assert progress == [(2, 2)]
+    assert not any("id > %s" in query and values == (3,) for query, values in sql_database.cursor.executed)
+
+
+@pytest.mark.asyncio()
+async def test_update_documents_chunked_resumes_and_waits_for_replicas(sql_database, database):
+    sql_database.cursor.respond("SHOW INDEX FROM people", [("people", 0, "PRIMARY", 1, "id")])
+    sql_database.cursor.respond("SELECT id FROM people", [(5,)], [])
+    lags = iter([3.0, 0.5])
+
+    async def get_replication_lag():
+        return next(lags)
+
+    database.get_replication_lag = get_replication_lag
+    updated = await sql_database.update_documents_chunked(
+        "people", {}, {"name": "a"}, resume_after=4, max_lag=1, lag_source=database, throttle=0.01
+    )
+    assert updated == 1
+    assert next(lags, None) is None
+    assert [entry for entry in sql_database.cursor.executed if "SHOW INDEX" not in entry[0]] == [
+        ("SELECT id FROM people WHERE id > %s ORDER BY id LIMIT 1000;", (4,)),
+        ("UPDATE people SET name = %s WHERE id IN (%s);", ("a", 5)),
+        ("SELECT id FROM people WHERE id > %s ORDER BY id LIMIT 1000;", (5,)),
+    ]
+    sql_database.cursor.respond("SHOW INDEX FROM orders", [])
+    with pytest.raises(ValueError, match="single column primary key"):
+        await sql_database.delete_documents_chunked("orders", {})
+
+
+@pytest.mark.asyncio()
+async def test_write_blob_appends_chunks_in_its_own_transaction(sql_database):
+    await asyncio.gather(
+        sql_database.write_blob("people", {"id": 1}, "photo", io.BytesIO(b"abcde"), chunk_size=2),
+        sql_database.delete_document("people", {"id": 2}),
+    )
+    assert sql_database.cursor.executed == [
+        ("UPDATE people SET photo = '' WHERE id = %s;", (1,)),
+        ("UPDATE people SET photo = CONCAT(photo, %s) WHERE id = %s;", (b"ab", 1)),
+        ("UPDATE people SET photo = CONCAT(photo, %s) WHERE id = %s;", (b"cd", 1)),
+        ("UPDATE people SET photo = CONCAT(photo, %s) WHERE id = %s;", (b"e", 1)),
+        ("DELETE FROM people WHERE id = %s;", (2,)),
+    ]
+    assert sql_database.connection.commits == 2
+
+
+@pytest.mark.asyncio()
+async def test_read_blob_fetches_substrings(sql_database):
+    sql_database.cursor.respond("SUBSTRING", [(b"ab",)], [(b"cd",)], [(b"e",)])
+    destination = io.BytesIO()
+    assert await sql_database.read_blob("people", {"id": 1}, "photo", destination=destination, chunk_size=2) == 5
+    assert destination.getvalue() == b"abcde"
+    assert [values for _, values in sql_database.cursor.executed] == [(1, 2, 1), (3, 2, 1), (5, 2, 1)]
+    empty = make_sql_database()
+    empty.cursor.respond("SUBSTRING", [(None,)])
+    assert await empty.read_blob("people", {"id": 3}, "photo") is None
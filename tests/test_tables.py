@@ -0,0 +1,68 @@
+import pytest
+
+from src.planetae_db.table import Table
+
+
+@pytest.fixture()
+def table(database):
+    return Table(
+        database=database,  # type: ignore
+        name="people",
+        columns=("id", "name", "phone"),
+        primary_key=("id",),
+        indexes={"PRIMARY": ("id",), "phone": ("phone",)},
+    )
+
+
+def test_table_precompiles_statements(table):
+    assert table._statement("insert", ("name", "phone")) == "INSERT INTO people (name, phone) VALUES (%s, %s);"
+    assert table._statement("select", ("id",)) == "SELECT id, name, phone FROM people WHERE id = %s;"
+    assert table._statement("delete", ("id",)) == "DELETE FROM people WHERE id = %s;"
+
+
+@pytest.mark.asyncio()
+async def test_table_insert_document(table, database):
+    assert await table.insert_document({"name": "Edmilson", "phone": "123"})
+    assert database.executed == [("INSERT INTO people (name, phone) VALUES (%s, %s);", ("Edmilson", "123"))]
+
+
+@pytest.mark.asyncio()
+async def test_table_get_by_primary_key(table, database):
+    database.cursor.rows = [(1, "Edmilson", "123")]
+    assert await table.get(1) == {"id": 1, "name": "Edmilson", "phone": "123"}
+    assert database.executed == [("SELECT id, name, phone FROM people WHERE id = %s LIMIT 1;", (1,))]
+
+
+@pytest.mark.asyncio()
+async def test_table_update_document(table, database):
+    assert await table.update_document({"id": 1, "phone": "123"}, {"name": "Neto"}, limit=1)
+    assert database.executed == [
+        ("UPDATE people SET name = %s WHERE id = %s AND phone = %s LIMIT 1;", ("Neto", 1, "123"))
+    ]
+
+
+@pytest.mark.asyncio()
+async def test_table_delete_document(table, database):
+    assert await table.delete_document({"phone": "123"})
+    assert database.executed == [("DELETE FROM people WHERE phone = %s;", ("123",))]
+
+
+@pytest.mark.asyncio()
+async def test_table_without_conditions(table, database):
+    assert await table.get_all_documents() == []
+    assert await table.delete_document({})
+    assert await table.update_document({}, {"name": "Neto"})
+    assert database.queries == [
+        "SELECT id, name, phone FROM people;",
+        "DELETE FROM people;",
+        "UPDATE people SET name = %s;",
+    ]
+
+
+@pytest.mark.asyncio()
+async def test_table_reads_nothing_from_failed_statements(sql_database):
+    table = Table(database=sql_database, name="people", columns=("id", "name"), primary_key=("id",))
+    sql_database.cursor.rows = [(1, "stale")]
+    sql_database.cursor.fail("SELECT")
+    assert await table.get(1) is None
+    assert await table.get_documents({"name": "stale"}) == []
@@ -0,0 +1,49 @@
+import asyncio
+import json
+
+import pytest
+
+from src.planetae_db.tracing import Tracer, current_span, trace
+from tests.fixtures import FakeDatabase
+
+
+def test_trace_without_tracer_does_nothing():
+    with trace(None, "execute"):
+        assert current_span() is None
+
+
+@pytest.mark.asyncio()
+async def test_spans_nest_and_inherit_tags():
+    spans = []
+    database = FakeDatabase(documents=[{"id": 1}], tracer=Tracer(callback=spans.append))
+    assert await database.get_document("people", {"id": 1}) == {"id": 1}
+    execute, operation = spans
+    assert operation.name == "get_document" and operation.parent_id is None
+    assert operation.tags == {"operation": "get_document", "table": "people"}
+    assert execute.parent_id == operation.span_id and execute.trace_id == operation.trace_id
+    assert execute.tags == {"operation": "get_document", "table": "people", "statement": "SELECT"}
+    assert current_span() is None
+
+
+@pytest.mark.asyncio()
+async def test_concurrent_tasks_get_their_own_traces():
+    spans = []
+    database = FakeDatabase(documents=[{"id": 1}], tracer=Tracer(callback=spans.append))
+    await asyncio.gather(database.get_document("people", {}), database.get_document("pets", {}))
+    operations = {span.tags["table"]: span for span in spans if span.name == "get_document"}
+    for span in spans:
+        if span.name == "execute":
+            assert span.parent_id == operations[span.tags["table"]].span_id
+    assert operations["people"].trace_id != operations["pets"].trace_id
+
+
+def test_spans_are_exported_to_jsonl(tmp_path):
+    path = tmp_path / "spans.jsonl"
+    tracer = Tracer(path=str(path))
+    with pytest.raises(ValueError):
+        with tracer.span("execute", table="people"):
+            raise ValueError("boom")
+    tracer.close()
+    line = json.loads(path.read_text().strip())
+    assert line["name"] == "execute" and line["tags"] == {"table": "people"}
+    assert line["error"] == "ValueError('boom')" and line["duration"] >= 0
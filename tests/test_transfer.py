@@ -0,0 +1,101 @@
+import threading
+
+import pytest
+
+from src.planetae_db.transfer import copy_table
+from tests.fixtures import SlowCursor, make_sql_database
+
+
+class FakeSource:
+    def __init__(self, documents):
+        self.documents = documents
+
+    async def get_table_description(self, table_name):
+        return {"id": "int(11)", "name": "varchar(100)"}
+
+    async def get_table_indexes(self, table_name):
+        return {"PRIMARY": ("id",)}
+
+    async def iter_documents(self, table_name, batch_size=1000, key=None, after=None):
+        documents = [document for document in self.documents if after is None or document[key] > after]
+        for index in range(0, len(documents), batch_size):
+            yield documents[index : index + batch_size]
+
+
+class FakeDestination:
+    def __init__(self):
+        self.signatures: dict[str, dict] = {}
+        self.batches: list[list[dict]] = []
+
+    async def create_table(self, table_name, signature):
+        self.signatures[table_name] = signature
+        return True
+
+    async def insert_documents(self, table_name, documents, chunk_size=1000):
+        self.batches.append(list(documents))
+        return True
+
+
+@pytest.mark.asyncio()
+async def test_copy_table_streams_batches():
+    source = FakeSource([{"id": i, "name": str(i)} for i in range(1, 6)])
+    destination = FakeDestination()
+    progress = []
+    copied = await copy_table(
+        source, destination, "people", batch_size=2, progress=lambda count, last: progress.append((count, last))
+    )  # type: ignore
+    assert copied == 5
+    assert destination.signatures["people"] == {"id": "int(11) PRIMARY KEY", "name": "varchar(100)"}
+    assert [len(batch) for batch in destination.batches] == [2, 2, 1]
+    assert progress == [(2, 2), (4, 4), (5, 5)]
+
+
+@pytest.mark.asyncio()
+async def test_copy_table_resumes_and_transforms():
+    source = FakeSource([{"id": i, "name": str(i)} for i in range(1, 6)])
+    destination = FakeDestination()
+    copied = await copy_table(
+        source,  # type: ignore
+        destination,  # type: ignore
+        "people",
+        transform=lambda document: None if document["id"] == 4 else {**document, "name": document["name"] * 2},
+        destination_table="copies",
+        resume_after=2,
+    )
+    assert copied == 2
+    assert destination.batches == [[{"id": 3, "name": "33"}, {"id": 5, "name": "55"}]]
+    assert "copies" in destination.signatures
+
+
+@pytest.mark.asyncio()
+async def test_copy_table_overlaps_sql_reads_and_writes():
+    events: list[tuple[str, str, str]] = []
+    source, destination = make_sql_database("source"), make_sql_database("destination")
+    source.cursor = SlowCursor(0.05, name="source", events=events)  # type: ignore
+    destination.cursor = SlowCursor(0.05, name="destination", events=events)  # type: ignore
+    source.cursor.respond("SELECT * FROM people", [(1, "a"), (2, "b")], [(3, "c"), (4, "d")], [(5, "e")])
+
+    async def get_table_description(table_name):
+        return {"id": "int(11)", "name": "varchar(100)"}
+
+    async def get_table_indexes(table_name):
+        return {"PRIMARY": ("id",)}
+
+    source.get_table_description = get_table_description  # type: ignore
+    source.get_table_indexes = get_table_indexes  # type: ignore
+    assert await copy_table(source, destination, "people", batch_size=2, create=False) == 5
+    assert [values for _, values in destination.cursor.executed] == [
+        [(1, "a"), (2, "b")],
+        [(3, "c"), (4, "d")],
+        [(5, "e")],
+    ]
+    running, overlapped = set(), False
+    for name, event, _ in events:
+        if event == "start":
+            overlapped = overlapped or bool(running - {name})
+            running.add(name)
+        else:
+            running.discard(name)
+    assert overlapped
+    assert {thread for _, _, thread in events} & {threading.current_thread().name} == set()
+    assert source._executor is None and destination._executor is None